@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.tokens import token_store
+
+
+class Command(BaseCommand):
+    help = "Delete expired and revoked API tokens."
+
+    def handle(self, *args, **options):
+        purged = token_store.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {purged} expired or revoked tokens."))
@@ -1,3 +1,33 @@
+import hashlib
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+class AuthToken(models.Model):
+    """
+    An API token. Only the SHA-256 digest of the key is stored; the key itself
+    is shown to the client once, when the token is issued.
+    """
+    key_hash = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='auth_tokens')
+    created = models.DateTimeField(auto_now_add=True)
+    expires = models.DateTimeField()
+    revoked = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires'], name='authtoken_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"Token for {self.user} (expires {self.expires:%Y-%m-%d %H:%M})"
+
+    @staticmethod
+    def hash_key(key):
+        return hashlib.sha256(key.encode()).hexdigest()
 
-# Create your models here.
+    @property
+    def is_active(self):
+        return self.revoked is None and self.expires > timezone.now()
@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from .tokens import token_store
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User, dispatch_uid='accounts_forget_inactive_user_tokens')
+def forget_inactive_user_tokens(sender, instance, raw=False, **kwargs):
+    if not raw and not instance.is_active:
+        token_store.forget_user(instance)
+
+
+@receiver(pre_delete, sender=User, dispatch_uid='accounts_forget_deleted_user_tokens')
+def forget_deleted_user_tokens(sender, instance, **kwargs):
+    # pre_delete: the tokens are gone by the time post_delete runs.
+    token_store.forget_user(instance)
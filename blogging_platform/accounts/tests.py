@@ -1,3 +1,134 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+
+from .models import AuthToken
+from .tokens import token_store
+
+
+class TokenStoreTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        token_store.local.clear()
+        self.user = User.objects.create_user(username='reader', password='password123')
+
+    def test_keys_are_stored_hashed(self):
+        key = token_store.issue(self.user)
+
+        token = AuthToken.objects.get()
+        self.assertNotEqual(token.key_hash, key)
+        self.assertEqual(token.key_hash, AuthToken.hash_key(key))
+
+    def test_repeat_lookups_skip_the_database(self):
+        key = token_store.issue(self.user)
+        self.assertEqual(token_store.authenticate(key), self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(token_store.authenticate(key), self.user)
+
+        # Another worker: empty LRU, warm shared cache.
+        token_store.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(token_store.authenticate(key), self.user)
+
+    def test_unknown_expired_and_revoked_tokens_fail(self):
+        self.assertIsNone(token_store.authenticate('not-a-token'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(token_store.authenticate('not-a-token'))
+
+        expired = token_store.issue(self.user)
+        AuthToken.objects.filter(key_hash=AuthToken.hash_key(expired)).update(
+            expires=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertIsNone(token_store.authenticate(expired))
+
+        revoked = token_store.issue(self.user)
+        self.assertEqual(token_store.authenticate(revoked), self.user)
+        token_store.revoke(revoked)
+        self.assertIsNone(token_store.authenticate(revoked))
+
+    def test_deactivating_the_user_drops_cached_tokens(self):
+        key = token_store.issue(self.user)
+        token_store.authenticate(key)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(token_store.authenticate(key))
+
+    def test_lru_is_bounded(self):
+        original = token_store.local.size
+        token_store.local.size = 2
+        self.addCleanup(setattr, token_store.local, 'size', original)
+
+        for _ in range(3):
+            token_store.authenticate(token_store.issue(self.user))
+
+        self.assertEqual(len(token_store.local), 2)
+
+    def test_rotation_is_shared_by_concurrent_refreshes(self):
+        key = token_store.issue(self.user)
+
+        new_key = token_store.rotate(key)
+        with self.assertNumQueries(0):
+            self.assertEqual(token_store.rotate(key), new_key)
+
+        self.assertEqual(AuthToken.objects.count(), 2)
+        self.assertEqual(token_store.authenticate(new_key), self.user)
+        # The old token keeps working through the grace period.
+        self.assertEqual(token_store.authenticate(key), self.user)
+        old = AuthToken.objects.get(key_hash=AuthToken.hash_key(key))
+        self.assertLessEqual(old.expires, timezone.now() + timedelta(seconds=token_store.rotation_grace))
+
+
+class TokenEndpointTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        token_store.local.clear()
+        self.user = User.objects.create_user(username='writer', password='password123')
+        self.other = User.objects.create_user(username='other', password='password123')
+
+    def login(self):
+        response = self.client.post(
+            '/accounts/login/', json.dumps({'username': 'writer', 'password': 'password123'}),
+            content_type='application/json',
+        )
+        self.client.logout()  # exercise the token, not the session
+        return response.json()['token']
+
+    def test_token_authenticates_its_own_user(self):
+        token = self.login()
+        response = self.client.post(
+            '/api/posts/', {'title': 'Mine', 'content': 'Body'},
+            HTTP_AUTHORIZATION=f'Token {token}',
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['author'], 'writer')
+
+    def test_invalid_token_is_rejected_for_writes_only(self):
+        self.assertEqual(self.client.post(
+            '/api/posts/', {'title': 'Nope', 'content': 'Body'}, HTTP_AUTHORIZATION='Token bogus',
+        ).status_code, 401)
+        self.assertEqual(self.client.get('/api/tags/', HTTP_AUTHORIZATION='Token bogus').status_code, 200)
+
+    def test_refresh_rotates_and_logout_revokes(self):
+        token = self.login()
+        response = self.client.post('/accounts/token/refresh/', HTTP_AUTHORIZATION=f'Token {token}')
+        self.assertEqual(response.status_code, 200)
+        new_token = response.json()['token']
+        self.assertNotEqual(new_token, token)
+
+        self.client.post('/accounts/logout/', HTTP_AUTHORIZATION=f'Token {new_token}')
+        self.assertIsNone(token_store.authenticate(new_token))
+
+    def test_refresh_requires_a_token_or_session(self):
+        response = self.client.post('/accounts/token/refresh/', HTTP_AUTHORIZATION='Token bogus')
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 401)
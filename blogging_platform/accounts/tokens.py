@@ -0,0 +1,220 @@
+"""
+Token store with a two-level lookup cache.
+
+Authenticating a token checks, in order, a bounded in-process LRU, the shared
+Django cache and finally the database, so the common case is a dictionary
+hit. Entries in the LRU are trusted for ``LOCAL_TTL`` seconds before being
+re-read from the shared cache, which bounds how long another process may keep
+accepting a token after it is revoked. Unknown keys are cached too, briefly,
+so a client retrying a bad token doesn't hit the database every time.
+"""
+import copy
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AuthToken
+
+# Cached in place of (user, expires) for keys that don't authenticate.
+INVALID = (None, 0.0)
+
+
+def parse_authorization(header):
+    """Return the token from ``Token <key>``, ``Bearer <key>`` or a bare key."""
+    parts = header.split()
+    if len(parts) == 2 and parts[0].lower() in ('token', 'bearer'):
+        return parts[1]
+    if len(parts) == 1:
+        return parts[0]
+    return None
+
+
+class LRUCache:
+
+    def __init__(self, size):
+        self.size = size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TokenStore:
+
+    def __init__(self, ttl=7 * 24 * 3600, cache_alias='default', cache_ttl=300, local_size=10000,
+                 local_ttl=30, invalid_ttl=30, rotation_grace=60, key_prefix='accounts:token'):
+        self.ttl = ttl
+        self.cache_alias = cache_alias
+        self.cache_ttl = cache_ttl
+        self.local_ttl = local_ttl
+        self.invalid_ttl = invalid_ttl
+        self.rotation_grace = rotation_grace
+        self.key_prefix = key_prefix
+        self.local = LRUCache(local_size)
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def cache_key(self, digest, kind='entry'):
+        return f'{self.key_prefix}:{kind}:{digest}'
+
+    def issue(self, user):
+        """Create a token for ``user`` and return its key."""
+        key = secrets.token_hex(32)
+        AuthToken.objects.create(
+            user=user, key_hash=AuthToken.hash_key(key),
+            expires=timezone.now() + timedelta(seconds=self.ttl),
+        )
+        return key
+
+    def authenticate(self, key):
+        """Return the user ``key`` belongs to, or None if it's unknown, expired or revoked."""
+        digest = AuthToken.hash_key(key)
+        now = time.time()
+
+        local = self.local.get(digest)
+        if local is not None and now - local[1] < self.local_ttl:
+            entry = local[0]
+        else:
+            entry = self.cache.get(self.cache_key(digest))
+            if entry is None:
+                entry = self._load(digest)
+                timeout = self.invalid_ttl if entry is INVALID else min(self.cache_ttl, entry[1] - now)
+                self.cache.set(self.cache_key(digest), entry, max(int(timeout), 1))
+            self.local.set(digest, (entry, now))
+
+        user, expires = entry
+        if user is None or expires <= now:
+            return None
+        # Requests must not share (and mutate) one cached instance.
+        return copy.copy(user)
+
+    def _load(self, digest):
+        token = (
+            AuthToken.objects.select_related('user')
+            .filter(key_hash=digest, revoked__isnull=True, expires__gt=timezone.now(), user__is_active=True)
+            .first()
+        )
+        if token is None:
+            return INVALID
+        return (token.user, token.expires.timestamp())
+
+    def forget(self, digests):
+        """Drop cached entries so the next lookup re-reads the database."""
+        digests = list(digests)
+        self.cache.delete_many([self.cache_key(digest) for digest in digests])
+        for digest in digests:
+            self.local.delete(digest)
+
+    def revoke(self, key):
+        digest = AuthToken.hash_key(key)
+        AuthToken.objects.filter(key_hash=digest, revoked__isnull=True).update(revoked=timezone.now())
+        self.forget([digest])
+
+    def forget_user(self, user):
+        self.forget(AuthToken.objects.filter(user=user).values_list('key_hash', flat=True))
+
+    def rotate(self, key):
+        """
+        Replace ``key`` with a new token and return the new key, or None if
+        ``key`` isn't active.
+
+        Concurrent refreshes of one token (several tabs, retried requests)
+        share a single rotation: the first caller writes the new token and
+        publishes its key in the shared cache for ``rotation_grace`` seconds,
+        the others wait for and return that key. The old token keeps working
+        for the same grace period so in-flight requests don't fail.
+        """
+        digest = AuthToken.hash_key(key)
+        result_key = self.cache_key(digest, 'rotated')
+        rotated = self.cache.get(result_key)
+        if rotated is not None:
+            return rotated
+
+        if not self.cache.add(self.cache_key(digest, 'rotating'), 1, self.rotation_grace):
+            return self._wait_for_rotation(result_key)
+
+        try:
+            new_key = secrets.token_hex(32)
+            with transaction.atomic():
+                token = (
+                    AuthToken.objects.select_for_update()
+                    .filter(key_hash=digest, revoked__isnull=True, expires__gt=timezone.now())
+                    .first()
+                )
+                if token is None:
+                    return None
+                now = timezone.now()
+                AuthToken.objects.create(
+                    user_id=token.user_id, key_hash=AuthToken.hash_key(new_key),
+                    expires=now + timedelta(seconds=self.ttl),
+                )
+                token.expires = min(token.expires, now + timedelta(seconds=self.rotation_grace))
+                token.save(update_fields=['expires'])
+            self.cache.set(result_key, new_key, self.rotation_grace)
+        finally:
+            self.cache.delete(self.cache_key(digest, 'rotating'))
+        self.forget([digest])
+        return new_key
+
+    def _wait_for_rotation(self, result_key, timeout=2.0, interval=0.05):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            rotated = self.cache.get(result_key)
+            if rotated is not None:
+                return rotated
+            time.sleep(interval)
+        return None
+
+    def purge_expired(self):
+        """Delete expired and revoked tokens; return how many were removed."""
+        deleted, _ = AuthToken.objects.filter(expires__lte=timezone.now()).delete()
+        revoked, _ = AuthToken.objects.filter(revoked__isnull=False).delete()
+        return deleted + revoked
+
+
+def _build_store():
+    config = getattr(settings, 'ACCOUNTS_TOKEN_STORE', {})
+    return TokenStore(
+        ttl=config.get('TTL', 7 * 24 * 3600),
+        cache_alias=config.get('CACHE_ALIAS', 'default'),
+        cache_ttl=config.get('CACHE_TTL', 300),
+        local_size=config.get('LOCAL_CACHE_SIZE', 10000),
+        local_ttl=config.get('LOCAL_TTL', 30),
+        invalid_ttl=config.get('INVALID_TTL', 30),
+        rotation_grace=config.get('ROTATION_GRACE', 60),
+    )
+
+
+token_store = _build_store()
@@ -5,18 +5,14 @@ from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 import json
+import logging
 from django.contrib.auth.models import User
-import uuid
-import hashlib
+from .tokens import parse_authorization, token_store
+
+logger = logging.getLogger(__name__)
 
 def generate_token(user):
-    user_id_str = str(user.id)
-    unique_id = str(uuid.uuid4())
-    timestamp = str(uuid.uuid1().time)
-    token_seed = f"{user_id_str}-{unique_id}-{timestamp}"
-    token = hashlib.sha256(token_seed.encode()).hexdigest()
-    
-    return token
+    return token_store.issue(user)
 
 @csrf_exempt
 def register(request):
@@ -28,8 +24,6 @@ def register(request):
                 password1 = data.get('password1', '')
                 password2 = data.get('password2', '')
 
-                print(f"Register request: username={username}, content_type={request.content_type}")
-
                 if password1 != password2:
                     return JsonResponse({'error': 'Passwords do not match'}, status=400)
 
@@ -55,7 +49,7 @@ def register(request):
                     }
                 }
                 
-                print(f"User registered successfully: {username}")
+                logger.info("User %s registered", user.pk)
                 return JsonResponse(response_data)
 
             else:
@@ -71,7 +65,7 @@ def register(request):
                 else:
                     return JsonResponse({'error': 'Invalid form data'}, status=400)
         except Exception as e:
-            print(f"Registration error: {str(e)}")
+            logger.exception("Registration failed")
             return JsonResponse({'error': str(e)}, status=400)
     else:
         form = UserCreationForm()
@@ -87,7 +81,6 @@ def login_view(request):
                 username = data.get('username', '')
                 password = data.get('password', '')
 
-                print(f"Login attempt: username={username}, content_type={request.content_type}")
                 user = authenticate(request, username=username, password=password, backend='django.contrib.auth.backends.ModelBackend')
                 
                 if user is not None:
@@ -105,10 +98,10 @@ def login_view(request):
                         }
                     }
                     
-                    print(f"Login successful for: {username}")
+                    logger.info("User %s logged in", user.pk)
                     return JsonResponse(response_data)
                 else:
-                    print(f"Login failed for: {username}")
+                    logger.info("Failed login attempt")
                     return JsonResponse({'error': 'Invalid username or password'}, status=400)
 
             else:
@@ -123,12 +116,15 @@ def login_view(request):
                     messages.error(request, 'Invalid username or password.')
                     return JsonResponse({'error': 'Invalid username or password'}, status=400)
         except Exception as e:
-            print(f"Login error: {str(e)}")
+            logger.exception("Login failed")
             return JsonResponse({'error': str(e)}, status=400)
     return render(request, 'accounts/login.html')
 
 @csrf_exempt
 def logout_view(request):
+    token = parse_authorization(request.META.get('HTTP_AUTHORIZATION', ''))
+    if token:
+        token_store.revoke(token)
     logout(request)
     if request.content_type == 'application/json':
         return JsonResponse({'success': 'You have been logged out.'})
@@ -140,16 +136,26 @@ def token_refresh(request):
     if request.method != 'POST':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
         
-    if not request.user.is_authenticated:
-        return JsonResponse({'error': 'Authentication required'}, status=401)
+    current = parse_authorization(request.META.get('HTTP_AUTHORIZATION', ''))
+    user = token_store.authenticate(current) if current else None
+    if user is not None:
+        token = token_store.rotate(current)
+    elif request.user.is_authenticated:
+        # Session-only clients get their first token.
+        user = request.user
+        token = generate_token(user)
+    else:
+        token = None
 
-    token = generate_token(request.user)
+    if token is None:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
 
     return JsonResponse({
         'token': token,
         'user': {
-            'id': request.user.id,
-            'username': request.user.username,
-            'is_staff': request.user.is_staff
+            'id': user.id,
+            'username': user.username,
+            'is_staff': user.is_staff
         }
-    })  
+    })
+
@@ -1,10 +1,11 @@
 from django.contrib import admin
-from .models import Post, Category, Tag, Comment
+from .models import AuthorStats, Post, Category, Tag, Comment, Task
 
 # Register models
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'category', 'status', 'published_date', 'views')
+    list_display = ('title', 'author', 'category', 'status', 'published_date', 'views',
+                    'like_count', 'comment_count')
     list_filter = ('status', 'category', 'tags')
     search_fields = ('title', 'content', 'author__username')
     prepopulated_fields = {'slug': ('title',)}
@@ -24,3 +25,18 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ('__str__', 'author', 'created_date', 'is_approved')
     list_filter = ('is_approved', 'created_date')
     search_fields = ('content', 'author__username', 'post__title')
+
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = ('author', 'post_count', 'published_count', 'draft_count', 'view_count',
+                    'like_count', 'comment_count')
+    search_fields = ('author__username',)
+    readonly_fields = ('author', 'post_count', 'published_count', 'draft_count', 'view_count',
+                       'like_count', 'comment_count')
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'key', 'status', 'attempts', 'run_after', 'created_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'key')
+    readonly_fields = ('claimed_by', 'claimed_at', 'last_error', 'created_at')
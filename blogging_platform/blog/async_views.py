@@ -0,0 +1,146 @@
+"""
+Async read path for the API, used by the ASGI profile
+(blogging_platform/settings_asgi.py).
+
+Served over ASGI, a sync DRF view runs from start to finish in a worker
+thread. ``async_read_view`` wraps a router-built viewset view so that GET and
+HEAD requests for its ``list`` and ``retrieve`` actions are answered on the
+event loop by the viewset's async counterparts, ``alist`` and ``aretrieve``.
+Those use the same querysets, filters, pagination, serializers, response
+cache and conditional validators as the sync actions, but load data through
+the async ORM and render JSON in the loop, so a request only occupies a
+thread while one of its queries runs.
+
+Everything else (writes, other actions, the browsable API and ``?page=``
+pagination) goes to the sync view unchanged.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.urls import URLPattern, URLResolver
+from rest_framework.renderers import JSONRenderer
+
+from .pagination import KeysetPagination
+
+
+class AsyncReadMixin:
+    """
+    Async support for a viewset's read actions. The viewset defines an
+    ``a<action>`` coroutine for each action in ``async_actions``; the helpers
+    below are the async versions of the GenericAPIView methods they need.
+    """
+
+    async_actions = ('list', 'retrieve')
+
+    async def adispatch(self, request, *args, **kwargs):
+        """
+        ``dispatch`` for the async actions. Returns ``None`` if the request
+        has to be served by the sync view instead.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.aauthenticate(request)
+            self.initial(request, *args, **kwargs)
+            if not self.serves_async(request):
+                return None
+            response = await getattr(self, f'a{self.action}')(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        return render_in_loop(self.finalize_response(request, response, *args, **kwargs))
+
+    async def aauthenticate(self, request):
+        # Tokens and sessions are looked up in the database. Without either
+        # the request is anonymous, which DRF settles without a query.
+        if 'HTTP_AUTHORIZATION' in request.META or settings.SESSION_COOKIE_NAME in request.COOKIES:
+            await sync_to_async(lambda: request.user)()
+
+    def serves_async(self, request):
+        if not isinstance(request.accepted_renderer, JSONRenderer):
+            return False  # the browsable API renders forms from the database
+        paginator = self.paginator
+        return not (self.action == 'list' and isinstance(paginator, KeysetPagination)
+                    and paginator.page_query_param in request.query_params)
+
+    def filters_need_database(self, request):
+        # A filter set validates model choices (e.g. ?author=) against the database.
+        filterset_class = getattr(self, 'filterset_class', None)
+        return filterset_class is not None and any(
+            name in request.query_params for name in filterset_class.base_filters
+        )
+
+    async def afilter_queryset(self, queryset):
+        if self.filters_need_database(self.request):
+            return await sync_to_async(self.filter_queryset)(queryset)
+        return self.filter_queryset(queryset)
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            instance = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    async def apaginate_queryset(self, queryset):
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+
+def render_in_loop(response):
+    """
+    Render a DRF response on the event loop. Django would render one returned
+    unrendered in a worker thread.
+    """
+    if not isinstance(response, SimpleTemplateResponse):
+        return response
+    response.render()
+    return HttpResponse(response.content, status=response.status_code, headers=response.headers)
+
+
+def async_read_view(view):
+    """Wrap a viewset view from ``as_view()`` so its reads are served by the async actions."""
+    sync_view = sync_to_async(view)
+    actions = dict(view.actions)
+    actions.setdefault('head', actions.get('get'))
+
+    @wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if actions.get(request.method.lower()) in view.cls.async_actions:
+            viewset = view.cls(**view.initkwargs)
+            viewset.action_map = actions
+            response = await viewset.adispatch(request, *args, **kwargs)
+            if response is not None:
+                return response
+        return await sync_view(request, *args, **kwargs)
+
+    return async_view
+
+
+def async_read_patterns(patterns):
+    """Copy ``patterns``, wrapping the views of viewsets with async actions in ``async_read_view``."""
+    copied = []
+    for entry in patterns:
+        if isinstance(entry, URLResolver):
+            entry = URLResolver(entry.pattern, async_read_patterns(entry.url_patterns),
+                                entry.default_kwargs, entry.app_name, entry.namespace)
+        elif isinstance(entry, URLPattern) and _has_async_actions(entry.callback):
+            entry = URLPattern(entry.pattern, async_read_view(entry.callback), entry.default_args, entry.name)
+        copied.append(entry)
+    return copied
+
+
+def _has_async_actions(view):
+    view_class = getattr(view, 'cls', None)
+    return (isinstance(view_class, type) and issubclass(view_class, AsyncReadMixin)
+            and any(action in view_class.async_actions for action in (getattr(view, 'actions', None) or {}).values()))
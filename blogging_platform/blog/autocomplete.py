@@ -0,0 +1,193 @@
+"""
+Tag autocomplete from an in-process prefix index.
+
+Each worker keeps every tag's name, slug and post count in memory, with the
+casefolded names in a sorted list. The tags starting with a prefix are a
+contiguous run of that list, found by binary search; the most used of them
+are returned. The best ``MAX_LIMIT`` tags of each prefix asked for are
+memoized and kept in order as counts change, so repeated prefixes (as
+typed) are a dictionary hit.
+
+The index is loaded from the database on first use (one query) and kept
+current by the signals in blog.signals, once the writes commit: tag saves
+and deletes, and post/tag links added or removed. Changes the signals can't
+describe exactly (bulk inserts, ``clear()``, tags created by
+``bulk_create``) mark it for a reload.
+Every change also replaces a generation token in the shared cache. Other
+processes compare theirs with it at most every ``REFRESH_INTERVAL`` seconds
+and reload when it differs (this needs a cache shared between processes).
+"""
+import bisect
+import heapq
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count
+
+from .cache import response_cache
+
+INDEX_GENERATION = 'blog.tag_index'
+
+# Memoized completions kept before the memo is emptied.
+MEMO_SIZE = 10000
+
+
+def autocomplete_options():
+    config = getattr(settings, 'BLOG_TAG_AUTOCOMPLETE', {})
+    return {
+        'refresh_interval': config.get('REFRESH_INTERVAL', 30),
+        'max_limit': config.get('MAX_LIMIT', 50),
+    }
+
+
+def fold(name):
+    return name.casefold()
+
+
+class TagIndex:
+
+    def __init__(self, refresh_interval=30, max_results=50):
+        self.refresh_interval = refresh_interval
+        self.max_results = max_results
+        self._lock = threading.Lock()
+        self._names = []  # sorted (folded name, tag id)
+        self._tags = {}  # tag id: [name, slug, post count, folded name]
+        self._memo = {}  # folded prefix: ids of its best max_results tags, best first
+        self._loaded = False
+        self._generation = None
+        self._last_check = 0.0
+
+    def complete(self, prefix, limit=10):
+        """The ``limit`` most used tags whose name starts with ``prefix``, case-insensitively."""
+        self._ensure_current()
+        prefix = fold(prefix)
+        with self._lock:
+            best = self._memo.get(prefix)
+            if best is None:
+                if len(self._memo) >= MEMO_SIZE:
+                    self._memo.clear()
+                best = self._memo[prefix] = self._best(prefix)
+            tags = self._tags
+            return [
+                {'id': tag_id, 'name': tags[tag_id][0], 'slug': tags[tag_id][1], 'post_count': tags[tag_id][2]}
+                for tag_id in best[:limit]
+            ]
+
+    def _rank(self, tag_id):
+        entry = self._tags[tag_id]
+        return -entry[2], entry[3], tag_id
+
+    def _best(self, prefix):
+        start = bisect.bisect_left(self._names, (prefix,))
+        # Every name starting with the prefix sorts before the prefix with its last character bumped.
+        end = bisect.bisect_left(self._names, (prefix[:-1] + chr(ord(prefix[-1]) + 1),)) if prefix else None
+        return heapq.nsmallest(self.max_results, (tag_id for _, tag_id in self._names[start:end]), key=self._rank)
+
+    # A memoized list holds either every tag with its prefix or, when full,
+    # the best of them. A tag whose rank rises can be placed in the lists of
+    # its prefixes; one that falls or goes may leave a full list without
+    # knowing its successor, so that list is dropped and recomputed on use.
+
+    def _enter(self, tag_id):
+        folded = self._tags[tag_id][3]
+        for end in range(len(folded) + 1):
+            best = self._memo.get(folded[:end])
+            if best is None:
+                continue
+            if tag_id not in best:
+                if len(best) >= self.max_results and self._rank(tag_id) >= self._rank(best[-1]):
+                    continue
+                best.append(tag_id)
+            best.sort(key=self._rank)
+            del best[self.max_results:]
+
+    def _leave(self, tag_id, folded):
+        for end in range(len(folded) + 1):
+            best = self._memo.get(folded[:end])
+            if best is None or tag_id not in best:
+                continue
+            if len(best) >= self.max_results:
+                del self._memo[folded[:end]]
+            else:
+                best.remove(tag_id)
+
+    def _ensure_current(self):
+        now = time.monotonic()
+        if self._loaded and now - self._last_check < self.refresh_interval:
+            return
+        generation = response_cache.generations([INDEX_GENERATION])[0]
+        self._last_check = now
+        if not self._loaded or generation != self._generation:
+            self.load(generation)
+
+    def load(self, generation=None):
+        from .models import Tag
+
+        rows = Tag.objects.annotate(post_count=Count('posts')).values_list('pk', 'name', 'slug', 'post_count')
+        tags = {pk: [name, slug, count, fold(name)] for pk, name, slug, count in rows}
+        names = sorted((entry[3], pk) for pk, entry in tags.items())
+        with self._lock:
+            self._tags, self._names, self._memo = tags, names, {}
+            self._generation = generation or response_cache.generations([INDEX_GENERATION])[0]
+            self._loaded = True
+            self._last_check = time.monotonic()
+
+    def tag_saved(self, tag):
+        with self._lock:
+            if self._loaded:
+                entry = self._tags.get(tag.pk)
+                if entry is not None:
+                    self._leave(tag.pk, entry[3])
+                    self._names.remove((entry[3], tag.pk))
+                    entry[:2], entry[3] = [tag.name, tag.slug], fold(tag.name)
+                else:
+                    self._tags[tag.pk] = [tag.name, tag.slug, 0, fold(tag.name)]
+                bisect.insort(self._names, (fold(tag.name), tag.pk))
+                self._enter(tag.pk)
+            self._changed()
+
+    def tag_deleted(self, tag_id):
+        with self._lock:
+            if self._loaded and tag_id in self._tags:
+                folded = self._tags[tag_id][3]
+                self._leave(tag_id, folded)
+                self._names.remove((folded, tag_id))
+                del self._tags[tag_id]
+            self._changed()
+
+    def adjust(self, counts):
+        """Add ``{tag id: change}`` to the tags' post counts."""
+        with self._lock:
+            if not all(tag_id in self._tags for tag_id in counts):
+                # Tags created without a signal (bulk_create): read them all again.
+                self._loaded = False
+            elif self._loaded:
+                for tag_id, change in counts.items():
+                    if change < 0:
+                        self._leave(tag_id, self._tags[tag_id][3])
+                    self._tags[tag_id][2] += change
+                    self._enter(tag_id)
+            self._changed()
+
+    def invalidate(self):
+        """Reload on next use, here and in other processes."""
+        with self._lock:
+            self._loaded = False
+            self._changed()
+
+    def _changed(self):
+        key = response_cache.generation_key(INDEX_GENERATION)
+        if response_cache.cache.get(key) != self._generation:
+            self._loaded = False  # another process changed it since we loaded
+        self._generation = response_cache.new_generation()
+        # This process already has the change.
+        response_cache.cache.set(key, self._generation, None)
+
+
+def _build_index():
+    options = autocomplete_options()
+    return TagIndex(refresh_interval=options['refresh_interval'], max_results=options['max_limit'])
+
+
+tag_index = _build_index()
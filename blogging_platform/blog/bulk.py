@@ -0,0 +1,359 @@
+"""
+Bulk import and export of posts as NDJSON (one JSON object per line).
+
+Rows are imported in chunks. Each chunk costs a fixed number of queries
+whatever its size: one lookup each for authors, categories, tags and slugs
+already in use, ``bulk_create`` for new tags and posts, and one
+``executemany`` each for post/tag links and explicit publication dates.
+Invalid rows are reported with their line number and skipped; the other rows
+of the chunk are still imported. Bulk inserts don't send model signals, so
+the search index, the authors' stats, the related posts, the tag
+autocomplete index and the response cache are updated here explicitly, as
+each chunk is written: the index in the chunk's transaction, the caches once
+it commits.
+
+A row looks like::
+
+    {"title": "...", "content": "...", "excerpt": "...", "slug": "...",
+     "status": "published", "category": "news", "tags": ["django", "orm"],
+     "published_date": "2024-05-01T09:30:00Z", "author": "alice"}
+
+Only ``title`` and ``content`` are required. ``category`` is matched by slug
+or name and created if missing; ``tags`` may also be a comma-separated string.
+``export_posts`` writes rows in the same format, so exports re-import as is.
+"""
+import json
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator, validate_slug
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from . import search
+from .autocomplete import tag_index
+from .cache import response_cache
+from .content import derive_or_estimate, is_large, schedule_update
+from .counters import adjust_author_stats
+from .models import Category, Post, Tag
+from .related import update_related_posts
+from .slugs import allocate_slugs
+from .tags import parse_tag_names, resolve_tags
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Error details kept in a report; the count of failed rows is always exact.
+MAX_REPORTED_ERRORS = 1000
+
+STATUSES = {value for value, _ in Post.STATUS_CHOICES}
+REQUIRED = 'This field is required.'
+
+
+class ImportReport:
+
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.post_ids = []
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {'created': self.created, 'failed': self.failed, 'errors': self.errors}
+
+
+def _max_length(model, field):
+    return model._meta.get_field(field).max_length
+
+
+def _string(row, name, errors, required=False, max_length=None, default=''):
+    value = row.get(name)
+    if value is None or value == '':
+        if required:
+            errors[name] = [REQUIRED]
+        return default
+    if not isinstance(value, str):
+        errors[name] = ['Not a valid string.']
+        return default
+    if max_length is not None and len(value) > max_length:
+        errors[name] = [f'Ensure this field has no more than {max_length} characters.']
+    return value
+
+
+def clean_row(row):
+    """Validate one decoded row; return ``(values, errors)``."""
+    errors = {}
+    values = {
+        'title': _string(row, 'title', errors, required=True, max_length=_max_length(Post, 'title')),
+        'content': _string(row, 'content', errors, required=True),
+        'excerpt': _string(row, 'excerpt', errors),
+        'featured_image': _string(row, 'featured_image', errors, max_length=_max_length(Post, 'featured_image')),
+        'slug': _string(row, 'slug', errors, max_length=_max_length(Post, 'slug')),
+        'status': _string(row, 'status', errors, default='draft'),
+        'category': _string(row, 'category', errors, max_length=_max_length(Category, 'name')),
+        'author': _string(row, 'author', errors),
+    }
+    if values['title'] and not values['title'].strip():
+        errors['title'] = ['This field may not be blank.']
+    if values['status'] not in STATUSES:
+        errors['status'] = [f'"{values["status"]}" is not a valid choice.']
+    for name, validator in (('slug', validate_slug), ('featured_image', URLValidator())):
+        if values[name] and name not in errors:
+            try:
+                validator(values[name])
+            except ValidationError as e:
+                errors[name] = list(e.messages)
+
+    tags = row.get('tags', [])
+    if not isinstance(tags, (list, str)) or not all(isinstance(tag, str) for tag in tags):
+        errors['tags'] = ['Expected a list of tag names.']
+        tags = []
+    tags = parse_tag_names(tags)
+    if any(len(tag) > _max_length(Tag, 'name') for tag in tags):
+        errors['tags'] = [f'Tag names have at most {_max_length(Tag, "name")} characters.']
+    values['tags'] = tags
+
+    published = row.get('published_date')
+    values['published_date'] = None
+    if published:
+        parsed = parse_datetime(published) if isinstance(published, str) else None
+        if parsed is None:
+            errors['published_date'] = ['Expected an ISO 8601 date and time.']
+        else:
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed, timezone.get_default_timezone())
+            values['published_date'] = parsed
+
+    read_time = row.get('read_time')
+    if read_time is not None and (not isinstance(read_time, int) or isinstance(read_time, bool) or read_time < 0):
+        errors['read_time'] = ['Expected a non-negative integer.']
+        read_time = None
+    values['read_time'] = read_time
+    return values, errors
+
+
+def parse_rows(rows):
+    """
+    Yield ``(line, values, errors)`` for NDJSON lines (str or bytes) or
+    already-decoded dicts. Blank lines are skipped but still counted.
+    """
+    for line, row in enumerate(rows, 1):
+        if isinstance(row, (bytes, str)):
+            try:
+                text = row.decode('utf-8') if isinstance(row, bytes) else row
+                if not text.strip():
+                    continue
+                row = json.loads(text)
+            except ValueError as e:
+                yield line, None, {'non_field_errors': [f'Invalid JSON: {e}']}
+                continue
+        if not isinstance(row, dict):
+            yield line, None, {'non_field_errors': ['Expected a JSON object.']}
+            continue
+        values, errors = clean_row(row)
+        yield line, values, errors
+
+
+def resolve_categories(values):
+    """Return ``{slug or name: category}``, creating categories for unknown names."""
+    values = set(values)
+    if not values:
+        return {}
+    found = {}
+    for category in Category.objects.filter(Q(slug__in=values) | Q(name__in=values)):
+        found.setdefault(category.slug, category)
+        found.setdefault(category.name, category)
+    missing = sorted(values - set(found))
+    if missing:
+        slugs = allocate_slugs(Category, [slugify(name) for name in missing])
+        created = Category.objects.bulk_create(
+            [Category(name=name, slug=slug) for name, slug in zip(missing, slugs)]
+        )
+        found.update((category.name, category) for category in created)
+    return found
+
+
+def _new_post(values, **fields):
+    # The derived fields Post.save would fill in; bulk_create bypasses it.
+    derived = derive_or_estimate(values['content'])
+    return Post(
+        title=values['title'], content=values['content'], excerpt=values['excerpt'] or derived.excerpt,
+        featured_image=values['featured_image'], status=values['status'],
+        plain_text=derived.plain_text, word_count=derived.word_count,
+        read_time=values['read_time'] or derived.read_time, **fields,
+    )
+
+
+def _accept_chunk(chunk, author, use_row_authors, report):
+    """
+    Report the rows of ``chunk`` with an unknown author or a slug in use;
+    return ``(accepted rows, {author id: username})``.
+    """
+    usernames = {values['author'] for _, values in chunk if use_row_authors and values['author']}
+    authors = dict(User.objects.filter(username__in=usernames).values_list('username', 'pk')) if usernames else {}
+
+    rows = []
+    for line, values in chunk:
+        if use_row_authors and values['author']:
+            author_id = authors.get(values['author'])
+            if author_id is None:
+                report.add_error(line, {'author': [f'Unknown user "{values["author"]}".']})
+                continue
+        elif author is not None:
+            author_id = author.pk
+        else:
+            report.add_error(line, {'author': [REQUIRED]})
+            continue
+        rows.append((line, values, author_id))
+    usernames = {author_id: username for username, author_id in authors.items()}
+    if author is not None:
+        usernames[author.pk] = author.username
+
+    explicit = [values['slug'] for _, values, _ in rows if values['slug']]
+    taken = set(Post.objects.filter(slug__in=explicit).values_list('slug', flat=True)) if explicit else set()
+    seen = set()
+    accepted = []
+    for line, values, author_id in rows:
+        slug = values['slug']
+        if slug and (slug in taken or slug in seen):
+            report.add_error(line, {'slug': ['post with this slug already exists.']})
+            continue
+        if slug:
+            seen.add(slug)
+        accepted.append((line, values, author_id))
+    return accepted, usernames
+
+
+def _invalidate_imported():
+    for model in (Post, Tag, Category):
+        response_cache.invalidate(model)
+    tag_index.invalidate()
+
+
+def _import_chunk(accepted, usernames, report):
+    if not accepted:
+        return
+    seen = {values['slug'] for _, values, _ in accepted if values['slug']}
+
+    with transaction.atomic():
+        categories = resolve_categories(values['category'] for _, values, _ in accepted if values['category'])
+        tag_ids = resolve_tags(name for _, values, _ in accepted for name in values['tags'])
+        auto_slugs = iter(allocate_slugs(
+            Post, [slugify(values['title']) for _, values, _ in accepted if not values['slug']], reserved=seen,
+        ))
+        posts = [
+            _new_post(values, slug=values['slug'] or next(auto_slugs), author_id=author_id,
+                      category=categories.get(values['category']))
+            for _, values, author_id in accepted
+        ]
+        Post.objects.bulk_create(posts)
+        by_author = defaultdict(list)
+        for post in posts:
+            by_author[post.author_id].append(post)
+            if is_large(post.content):
+                schedule_update(post.pk)
+        for author_id, authored in by_author.items():
+            adjust_author_stats(author_id, authored)
+
+        # published_date is auto_now_add, so explicit dates are written afterwards.
+        adapt = connection.ops.adapt_datetimefield_value
+        dated = [(adapt(values['published_date']), post.pk)
+                 for post, (_, values, _) in zip(posts, accepted) if values['published_date']]
+        # The post/tag links are plain id pairs; building a through model
+        # instance for each one would cost more than the insert itself.
+        links = [
+            (post.pk, tag_ids[name])
+            for post, (_, values, _) in zip(posts, accepted) for name in values['tags']
+        ]
+        with connection.cursor() as cursor:
+            if dated:
+                cursor.executemany(
+                    f"UPDATE {Post._meta.db_table} SET published_date = %s WHERE id = %s", dated,
+                )
+            if links:
+                cursor.executemany(
+                    f"INSERT INTO {Post.tags.through._meta.db_table} (post_id, tag_id) VALUES (%s, %s)", links,
+                )
+        related = [post.pk for post, (_, values, _) in zip(posts, accepted)
+                   if post.status == 'published' and (post.category_id or values['tags'])]
+        if related:
+            update_related_posts.enqueue(related)
+
+        # Index from the rows in hand rather than reading the new posts back.
+        search.index_documents((
+            (post.pk, post.title, post.excerpt, post.plain_text, search.meta_text(
+                usernames[author_id], post.category.name if post.category else '', values['tags'],
+            ))
+            for post, (_, values, author_id) in zip(posts, accepted)
+        ), replace=False)
+        transaction.on_commit(_invalidate_imported)
+
+    report.created += len(posts)
+    report.post_ids.extend(post.pk for post in posts)
+
+
+def import_posts(rows, author=None, use_row_authors=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Import posts from NDJSON lines or decoded dicts and return an ImportReport.
+
+    Posts belong to ``author`` unless ``use_row_authors`` is set and the row
+    names one by username.
+    """
+    report = ImportReport()
+
+    def flush(chunk):
+        accepted, usernames = _accept_chunk(chunk, author, use_row_authors, report)
+        try:
+            _import_chunk(accepted, usernames, report)
+        except IntegrityError:
+            # Lost a race for a slug or similar: retry row by row to isolate it.
+            # The rows were checked once already; only their insert is retried.
+            for row in accepted:
+                try:
+                    _import_chunk([row], usernames, report)
+                except IntegrityError as e:
+                    report.add_error(row[0], {'non_field_errors': [str(e)]})
+
+    chunk = []
+    for line, values, errors in parse_rows(rows):
+        if errors:
+            report.add_error(line, errors)
+            continue
+        chunk.append((line, values))
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+    return report
+
+
+def export_row(post):
+    return {
+        'title': post.title,
+        'slug': post.slug,
+        'content': post.content,
+        'excerpt': post.excerpt,
+        'featured_image': post.featured_image,
+        'status': post.status,
+        'author': post.author.username,
+        'category': post.category.slug if post.category else '',
+        'tags': [tag.name for tag in post.tags.all()],
+        'published_date': post.published_date.isoformat(),
+        'read_time': post.read_time,
+    }
+
+
+def export_posts(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield NDJSON lines for the posts in ``queryset``, in primary key order."""
+    queryset = queryset.select_related('author', 'category').prefetch_related('tags').order_by('pk')
+    for post in queryset.iterator(chunk_size=chunk_size):
+        yield json.dumps(export_row(post), ensure_ascii=False) + '\n'
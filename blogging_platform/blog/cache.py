@@ -0,0 +1,167 @@
+"""
+Response cache for anonymous read endpoints.
+
+Cached responses are keyed on the endpoint, host, path, normalized query
+string and authentication state, plus a "generation" token for every model
+the endpoint depends on. Saving or deleting one of those models (see
+blog.signals) replaces its generation once the transaction commits, so
+every key built from the old one stops matching and the stale entries
+simply age out of the cache.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+
+class ResponseCache:
+
+    def __init__(self, alias='default', timeout=300, key_prefix='blog:response'):
+        self.alias = alias
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+        self._lock = threading.Lock()
+        self._hits = Counter()
+        self._misses = Counter()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def generation_key(self, model):
+        label = model if isinstance(model, str) else model._meta.label_lower
+        return f'{self.key_prefix}:generation:{label}'
+
+    @staticmethod
+    def new_generation():
+        # The timestamp lets conditional requests derive Last-Modified from it.
+        return f'{time.time():.6f}:{uuid.uuid4().hex}'
+
+    @staticmethod
+    def generation_time(token):
+        try:
+            return float(token.split(':', 1)[0])
+        except (AttributeError, ValueError):
+            return None
+
+    def invalidate(self, model):
+        self.cache.set(self.generation_key(model), self.new_generation(), None)
+
+    def generations(self, models):
+        keys = [self.generation_key(model) for model in models]
+        found = self.cache.get_many(keys)
+        missing = {key: self.new_generation() for key in keys if key not in found}
+        if missing:
+            # add() so concurrent first requests agree on one token.
+            for key, token in missing.items():
+                self.cache.add(key, token, None)
+            found.update(self.cache.get_many(list(missing)))
+        return [found.get(key, '') for key in keys]
+
+    def is_cacheable(self, request):
+        return request.method == 'GET' and not request.user.is_authenticated
+
+    def key_for(self, request, endpoint, models):
+        query = sorted(
+            (name, value)
+            for name, values in request.query_params.lists()
+            for value in values
+        )
+        auth_state = 'authenticated' if request.user.is_authenticated else 'anonymous'
+        parts = [request.get_host(), request.path, repr(query), auth_state, *self.generations(models)]
+        digest = hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+        return f'{self.key_prefix}:{endpoint}:{digest}'
+
+    def get(self, key, endpoint):
+        data = self.cache.get(key)
+        with self._lock:
+            (self._misses if data is None else self._hits)[endpoint] += 1
+        return data
+
+    def set(self, key, data):
+        self.cache.set(key, data, self.timeout)
+
+    def stats(self):
+        with self._lock:
+            endpoints = sorted(set(self._hits) | set(self._misses))
+            per_endpoint = {
+                endpoint: {'hits': self._hits[endpoint], 'misses': self._misses[endpoint]}
+                for endpoint in endpoints
+            }
+            hits, misses = sum(self._hits.values()), sum(self._misses.values())
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else None,
+            'endpoints': per_endpoint,
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self._hits.clear()
+            self._misses.clear()
+
+
+def _build_cache():
+    config = getattr(settings, 'BLOG_RESPONSE_CACHE', {})
+    return ResponseCache(
+        alias=config.get('CACHE_ALIAS', 'default'),
+        timeout=config.get('TIMEOUT', 300),
+        key_prefix=config.get('KEY_PREFIX', 'blog:response'),
+    )
+
+
+response_cache = _build_cache()
+
+
+def cached_response(*models):
+    """
+    Cache a viewset action's successful responses to anonymous GET requests
+    until one of ``models`` changes. Responses carry ``X-Cache: HIT|MISS``.
+    Works on sync and ``async`` actions; both share the cached entries.
+    """
+    def decorator(method):
+        # An async action (``alist``) shares its entries with the sync one (``list``).
+        endpoint_name = method.__name__.removeprefix('a') if iscoroutinefunction(method) else method.__name__
+
+        def lookup(self, request):
+            endpoint = f'{type(self).__name__}.{endpoint_name}'
+            key = response_cache.key_for(request, endpoint, models)
+            data = response_cache.get(key, endpoint)
+            return key, (None if data is None else Response(data, headers={'X-Cache': 'HIT'}))
+
+        def store(key, response):
+            if response.status_code == 200:
+                response_cache.set(key, response.data)
+                response['X-Cache'] = 'MISS'
+            return response
+
+        if iscoroutinefunction(method):
+            @wraps(method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                if not response_cache.is_cacheable(request):
+                    return await method(self, request, *args, **kwargs)
+                key, cached = lookup(self, request)
+                if cached is not None:
+                    return cached
+                return store(key, await method(self, request, *args, **kwargs))
+            return async_wrapper
+
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not response_cache.is_cacheable(request):
+                return method(self, request, *args, **kwargs)
+            key, cached = lookup(self, request)
+            if cached is not None:
+                return cached
+            return store(key, method(self, request, *args, **kwargs))
+        return wrapper
+    return decorator
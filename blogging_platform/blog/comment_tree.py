@@ -0,0 +1,135 @@
+"""
+Loads comment threads in a single query and links them into trees in memory.
+
+The comments under a set of roots are selected with a recursive CTE, which
+also enforces ``max_depth`` (reply levels below the roots) in the database,
+then every comment is attached to its parent in one pass over the rows. Each
+loaded comment gets ``tree_replies`` and ``reply_count``, which
+CommentSerializer renders instead of querying.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models.expressions import RawSQL
+
+from .models import Comment
+
+
+def comment_tree_options(request=None):
+    """Depth and per-level limits from settings, overridable per request."""
+    config = getattr(settings, 'BLOG_COMMENT_TREE', {})
+    options = {
+        'max_depth': config.get('MAX_DEPTH'),
+        'per_level_limit': config.get('PER_LEVEL_LIMIT'),
+    }
+    if request is not None:
+        for name in options:
+            try:
+                value = int(request.query_params[name])
+            except (AttributeError, KeyError, ValueError):
+                continue
+            if value >= 0:
+                options[name] = value
+    return options
+
+
+def _thread_ids(anchor, params, max_depth):
+    table = Comment._meta.db_table
+    depth_limit = ''
+    if max_depth is not None:
+        depth_limit = 'WHERE tree.depth < %s'
+        params = [*params, max_depth]
+    return RawSQL(
+        f"WITH RECURSIVE tree (id, depth) AS ("
+        f"SELECT id, 0 FROM {table} WHERE {anchor} "
+        f"UNION ALL "
+        f"SELECT child.id, tree.depth + 1 FROM {table} child "
+        f"INNER JOIN tree ON child.parent_id = tree.id {depth_limit}"
+        f") SELECT id FROM tree",
+        params,
+    )
+
+
+def _threads(anchor, params, max_depth):
+    return (
+        Comment.objects.filter(pk__in=_thread_ids(anchor, params, max_depth))
+        .select_related('author')
+        .order_by('-created_date', '-id')
+    )
+
+
+def _link(comments, per_level_limit):
+    """Attach every comment to its parent; return comments without a loaded parent."""
+    by_id = {comment.pk: comment for comment in comments}
+    children = defaultdict(list)
+    roots = []
+    for comment in comments:
+        if comment.parent_id in by_id:
+            children[comment.parent_id].append(comment)
+        else:
+            roots.append(comment)
+    for comment in comments:
+        replies = children.get(comment.pk, [])
+        comment.reply_count = len(replies)
+        comment.tree_replies = replies[:per_level_limit] if per_level_limit is not None else replies
+    return roots
+
+
+def _post_threads(posts, max_depth):
+    post_ids = [post.pk for post in posts]
+    anchor = f"parent_id IS NULL AND post_id IN ({', '.join(['%s'] * len(post_ids))})"
+    return _threads(anchor, post_ids, max_depth)
+
+
+def _attach_post_trees(posts, comments, per_level_limit):
+    roots_by_post = defaultdict(list)
+    for root in _link(comments, per_level_limit):
+        roots_by_post[root.post_id].append(root)
+    for post in posts:
+        roots = roots_by_post.get(post.pk, [])
+        post.comment_tree = roots[:per_level_limit] if per_level_limit is not None else roots
+
+
+def load_post_comment_trees(posts, max_depth=None, per_level_limit=None):
+    """Set ``comment_tree`` on each post to its top-level comments with nested replies."""
+    posts = [post for post in posts if not hasattr(post, 'comment_tree')]
+    if posts:
+        _attach_post_trees(posts, list(_post_threads(posts, max_depth)), per_level_limit)
+
+
+async def aload_post_comment_trees(posts, max_depth=None, per_level_limit=None):
+    """``load_post_comment_trees`` with the async ORM."""
+    posts = [post for post in posts if not hasattr(post, 'comment_tree')]
+    if posts:
+        comments = [comment async for comment in _post_threads(posts, max_depth)]
+        _attach_post_trees(posts, comments, per_level_limit)
+
+
+def _reply_threads(comments, max_depth):
+    ids = [comment.pk for comment in comments]
+    anchor = f"id IN ({', '.join(['%s'] * len(ids))})"
+    return _threads(anchor, ids, max_depth)
+
+
+def _attach_reply_trees(comments, loaded, per_level_limit):
+    loaded = {comment.pk: comment for comment in loaded}
+    _link(list(loaded.values()), per_level_limit)
+    for comment in comments:
+        match = loaded.get(comment.pk)
+        comment.reply_count = match.reply_count if match else 0
+        comment.tree_replies = match.tree_replies if match else []
+
+
+def load_reply_trees(comments, max_depth=None, per_level_limit=None):
+    """Set ``tree_replies`` on each comment to its nested replies."""
+    comments = [comment for comment in comments if not hasattr(comment, 'tree_replies')]
+    if comments:
+        _attach_reply_trees(comments, list(_reply_threads(comments, max_depth)), per_level_limit)
+
+
+async def aload_reply_trees(comments, max_depth=None, per_level_limit=None):
+    """``load_reply_trees`` with the async ORM."""
+    comments = [comment for comment in comments if not hasattr(comment, 'tree_replies')]
+    if comments:
+        loaded = [comment async for comment in _reply_threads(comments, max_depth)]
+        _attach_reply_trees(comments, loaded, per_level_limit)
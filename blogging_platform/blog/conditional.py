@@ -0,0 +1,93 @@
+"""
+HTTP conditional requests (ETag / Last-Modified / 304) for viewset actions.
+
+Each decorated action names a "validators" method on the viewset that
+returns the state its representation depends on, as a list of values for
+the ETag plus a Last-Modified timestamp, using at most one cheap query.
+When the client's If-None-Match / If-Modified-Since still match, the view
+answers 304 without building or serializing the queryset.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(request, parts, weak=False):
+    payload = '\n'.join([request.get_full_path(), *(repr(part) for part in parts)])
+    etag = '"%s"' % hashlib.sha256(payload.encode()).hexdigest()[:40]
+    return f'W/{etag}' if weak else etag
+
+
+def evaluate(request, found, weak=False):
+    """
+    Turn a validators result into ``(etag, last_modified, not_modified)``,
+    where ``not_modified`` is the 304 (or 412) response to send, if any.
+    """
+    parts, last_modified = found
+    etag = make_etag(request, parts, weak)
+    last_modified = int(last_modified) if last_modified is not None else None
+    return etag, last_modified, get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def add_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def conditional(validators, on_not_modified=None, weak=False):
+    """
+    ``validators`` and ``on_not_modified`` are names of viewset methods taking
+    the action's arguments. The first returns ``(etag_parts, last_modified)``
+    or ``None`` to skip validation (e.g. when the object doesn't exist); the
+    second runs when a 304 is sent. On an ``async`` action both must be
+    coroutines too. ``weak`` sends a weak ETag, for representations that
+    include state the validators don't cover but that doesn't change their
+    meaning.
+    """
+    def decorator(method):
+        if iscoroutinefunction(method):
+            @wraps(method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await method(self, request, *args, **kwargs)
+
+                found = await getattr(self, validators)(request, *args, **kwargs)
+                if found is None:
+                    return await method(self, request, *args, **kwargs)
+                etag, last_modified, not_modified = evaluate(request, found, weak)
+                if not_modified is not None:
+                    if not_modified.status_code == 304 and on_not_modified:
+                        await getattr(self, on_not_modified)(request, *args, **kwargs)
+                    response = not_modified
+                else:
+                    response = await method(self, request, *args, **kwargs)
+                    if response.status_code != 200:
+                        return response
+                return add_validators(response, etag, last_modified)
+            return async_wrapper
+
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return method(self, request, *args, **kwargs)
+
+            found = getattr(self, validators)(request, *args, **kwargs)
+            if found is None:
+                return method(self, request, *args, **kwargs)
+            etag, last_modified, not_modified = evaluate(request, found, weak)
+            if not_modified is not None:
+                if not_modified.status_code == 304 and on_not_modified:
+                    getattr(self, on_not_modified)(request, *args, **kwargs)
+                response = not_modified
+            else:
+                response = method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return add_validators(response, etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,130 @@
+"""
+Values derived from a post's content, computed when the post is saved and
+stored with it: the plain text (markup stripped, whitespace collapsed), its
+word count, the read time and an excerpt. Listings read ``excerpt`` and
+``read_time`` and search indexes ``plain_text``, so neither touches
+``content``.
+
+Stripping markup is the expensive step, about 0.5 µs per character. For
+bodies above ``BACKGROUND_THRESHOLD`` characters, save() stores an estimate
+from the raw content and an excerpt from its first part. ``schedule_update``
+then queues the ``update_post`` task (see blog.tasks), which fills in the
+plain text and exact counts once ``manage.py run_worker`` picks it up, or
+right away when ``BLOG_TASKS['EAGER']`` is set.
+"""
+import html
+from collections import namedtuple
+
+from django.conf import settings
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+from .tasks import task
+
+# The excerpt never needs more than the start of the body.
+EXCERPT_SOURCE_CHARS = 8000
+
+Derivatives = namedtuple('Derivatives', ['plain_text', 'word_count', 'read_time', 'excerpt'])
+
+
+def content_options():
+    config = getattr(settings, 'BLOG_CONTENT', {})
+    return {
+        'words_per_minute': config.get('WORDS_PER_MINUTE', 200),
+        'excerpt_words': config.get('EXCERPT_WORDS', 40),
+        'background_threshold': config.get('BACKGROUND_THRESHOLD', 100_000),
+    }
+
+
+def to_plain_text(content):
+    if '<' in content or '&' in content:
+        content = html.unescape(strip_tags(content))
+    return ' '.join(content.split())
+
+
+def read_time(word_count):
+    return max(1, round(word_count / content_options()['words_per_minute']))
+
+
+def make_excerpt(plain_text):
+    return Truncator(plain_text).words(content_options()['excerpt_words'])
+
+
+def _head(content):
+    head = content[:EXCERPT_SOURCE_CHARS]
+    # Don't leave half a tag at the cut.
+    if head.rfind('<') > head.rfind('>'):
+        head = head[:head.rfind('<')]
+    return head
+
+
+def excerpt_of(content):
+    return make_excerpt(to_plain_text(_head(content)))
+
+
+def derive(content):
+    """All derivatives of ``content``."""
+    text = to_plain_text(content)
+    words = len(text.split())
+    return Derivatives(text, words, read_time(words), excerpt_of(content))
+
+
+def estimate(content):
+    """
+    Cheap stand-ins for a very large body: counts from the raw content, and
+    the excerpt (which is exact) from its start. ``plain_text`` is left empty.
+    """
+    words = len(content.split())
+    return Derivatives('', words, read_time(words), excerpt_of(content))
+
+
+def is_large(content):
+    return len(content) > content_options()['background_threshold']
+
+
+def derive_or_estimate(content):
+    return estimate(content) if is_large(content) else derive(content)
+
+
+def apply_derivatives(post):
+    """
+    Refresh the derived fields of ``post`` if its content changed since it
+    was loaded. Return the names of the fields set. The excerpt is only
+    replaced while it is empty or still the one generated from the previous
+    content, never when the author wrote it.
+    """
+    loaded = post.__dict__.get('_loaded_content')
+    if post.pk is not None and loaded is not None and post.content == loaded:
+        return []
+    derived = derive_or_estimate(post.content)
+    post.plain_text, post.word_count, post.read_time = derived.plain_text, derived.word_count, derived.read_time
+    fields = ['plain_text', 'word_count', 'read_time']
+    if not post.excerpt.strip() or (loaded is not None and post.excerpt == excerpt_of(loaded)):
+        post.excerpt = derived.excerpt
+        fields.append('excerpt')
+    return fields
+
+
+@task
+def update_post(post_id):
+    """Store the exact derivatives of a saved post's current content."""
+    from . import search
+    from .cache import response_cache
+    from .models import Post
+
+    content = Post.objects.filter(pk=post_id).values_list('content', flat=True).first()
+    if content is None:
+        return
+    derived = derive(content)
+    # Matching on content skips the write if the post was edited meanwhile;
+    # that save queued its own update.
+    updated = Post.objects.filter(pk=post_id, content=content).update(
+        plain_text=derived.plain_text, word_count=derived.word_count, read_time=derived.read_time,
+    )
+    if updated:
+        search.index_posts([post_id])
+        response_cache.invalidate(Post)
+
+
+def schedule_update(post_id):
+    update_post.enqueue(post_id, key=f'content:{post_id}')
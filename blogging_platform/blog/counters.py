@@ -0,0 +1,330 @@
+import atexit
+import logging
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .cache import response_cache
+from .tasks import task, task_options
+
+logger = logging.getLogger(__name__)
+
+FLUSH_REQUEST_KEY = 'blog:view-counter:flush-requested'
+
+# Set by apply_view_counts once a queued batch is written; see ViewCounter.pending.
+APPLIED_BATCH_KEY = 'blog:view-counter:applied:{}'
+APPLIED_BATCH_TIMEOUT = 24 * 60 * 60
+
+# Changes on every flush. Post list ETags and cached post lists include it,
+# so a cached list never shows older view counts than its ETag stands for.
+VIEWS_GENERATION = 'blog.post.views'
+
+# Rows per UPDATE when writing view counts.
+VIEW_UPDATE_BATCH = 500
+
+AUTHOR_STAT_FIELDS = ['post_count', 'published_count', 'draft_count', 'view_count', 'like_count', 'comment_count']
+STATUS_COUNT_FIELDS = {'published': 'published_count', 'draft': 'draft_count'}
+
+
+class ViewCounter:
+    """
+    Buffers post view increments in memory and writes them back as batched
+    ``UPDATE ... SET views = views + n`` statements, so reading a post does
+    not write its row.
+
+    Each worker process owns its buffer. It is flushed when the oldest pending
+    view is older than ``flush_interval`` seconds, when more than
+    ``max_pending`` posts are buffered, when the process exits, or when
+    another process requests it through ``request_flush`` (this needs a cache
+    shared between processes). Flushes triggered by a view hand the counts to
+    the task queue rather than writing them in the request; until the task
+    has written them they still count as pending here, so the views shown
+    don't drop back while the worker catches up.
+    """
+
+    def __init__(self, flush_interval=10, max_pending=1000, request_check_interval=1):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.request_check_interval = request_check_interval
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._queued = {}  # batch id: counts handed to the task queue, not yet written
+        self._oldest = None
+        self._last_request_check = time.monotonic()
+        self._last_flush_request = time.time()
+
+    def increment(self, post_id, amount=1):
+        if self._record(post_id, amount):
+            self.flush(defer=True)
+
+    async def aincrement(self, post_id, amount=1):
+        """``increment`` for async views; only a due flush leaves the event loop."""
+        if self._record(post_id, amount):
+            await sync_to_async(self.flush)(defer=True)
+
+    def _record(self, post_id, amount):
+        """Buffer the views and return whether a flush is due."""
+        with self._lock:
+            self._pending[post_id] += amount
+            now = time.monotonic()
+            if self._oldest is None:
+                self._oldest = now
+            due = (now - self._oldest >= self.flush_interval
+                   or len(self._pending) >= self.max_pending)
+            check_requests = now - self._last_request_check >= self.request_check_interval
+            if check_requests:
+                self._last_request_check = now
+
+        if not due and check_requests:
+            due = self._flush_requested()
+        return due
+
+    def pending(self, post_id):
+        """Views of the post not in its row yet: buffered, or queued and not yet applied."""
+        self._forget_applied()
+        with self._lock:
+            return self._pending.get(post_id, 0) + sum(counts.get(post_id, 0) for counts in self._queued.values())
+
+    def _forget_applied(self):
+        with self._lock:
+            batches = list(self._queued)
+        if not batches:
+            return
+        applied = cache.get_many([APPLIED_BATCH_KEY.format(batch) for batch in batches])
+        if applied:
+            with self._lock:
+                for batch in batches:
+                    if APPLIED_BATCH_KEY.format(batch) in applied:
+                        self._queued.pop(batch, None)
+
+    def flush(self, defer=False):
+        """
+        Write all buffered views to the database, or queue them for the task
+        worker with ``defer``, and return how many there were.
+        """
+        # Eager tasks run inline: the counts are written before this returns.
+        defer = defer and not task_options()['eager']
+        batch_id = uuid.uuid4().hex if defer else None
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._oldest = None
+            if pending and defer:
+                self._queued[batch_id] = pending
+        if not pending:
+            return 0
+
+        try:
+            if defer:
+                apply_view_counts.enqueue(
+                    {str(post_id): amount for post_id, amount in pending.items()}, batch_id=batch_id,
+                )
+            else:
+                apply_view_counts(pending)
+        except Exception:
+            logger.exception("Failed to flush %d buffered post views", sum(pending.values()))
+            with self._lock:
+                self._queued.pop(batch_id, None)
+                self._pending.update(pending)
+                if self._oldest is None:
+                    self._oldest = time.monotonic()
+            return 0
+        return sum(pending.values())
+
+    def request_flush(self):
+        """Ask every process sharing the cache to flush on its next view."""
+        cache.set(FLUSH_REQUEST_KEY, time.time(), None)
+
+    def _flush_requested(self):
+        requested_at = cache.get(FLUSH_REQUEST_KEY)
+        if requested_at is None or requested_at <= self._last_flush_request:
+            return False
+        self._last_flush_request = requested_at
+        return True
+
+
+def _add_by_amount(model, field, counts):
+    # One UPDATE per distinct increment keeps the statement count low:
+    # most posts are viewed once or twice between flushes.
+    by_amount = defaultdict(list)
+    for pk, amount in counts.items():
+        by_amount[amount].append(pk)
+    for amount, pks in by_amount.items():
+        for start in range(0, len(pks), VIEW_UPDATE_BATCH):
+            model.objects.filter(pk__in=pks[start:start + VIEW_UPDATE_BATCH]).update(**{field: F(field) + amount})
+
+
+@task
+def apply_view_counts(counts, batch_id=None):
+    """
+    Add ``{post id: views}`` to the posts' view counts and their authors'
+    totals. ``batch_id`` identifies counts queued by a ViewCounter, which stops
+    showing them as pending once this has committed.
+    """
+    from .models import AuthorStats, Post
+
+    counts = {int(post_id): amount for post_id, amount in counts.items()}
+    with transaction.atomic():
+        _add_by_amount(Post, 'views', counts)
+        by_author = Counter()
+        post_ids = list(counts)
+        for start in range(0, len(post_ids), VIEW_UPDATE_BATCH):
+            batch = post_ids[start:start + VIEW_UPDATE_BATCH]
+            for post_id, author_id in Post.objects.filter(pk__in=batch).values_list('pk', 'author_id'):
+                by_author[author_id] += counts[post_id]
+        _add_by_amount(AuthorStats, 'view_count', by_author)
+    response_cache.invalidate(VIEWS_GENERATION)
+    if batch_id is not None:
+        transaction.on_commit(lambda: cache.set(APPLIED_BATCH_KEY.format(batch_id), True, APPLIED_BATCH_TIMEOUT))
+
+
+def _deltas(fields):
+    return {
+        field: Greatest(F(field) + delta, Value(0))
+        for field, delta in fields.items() if delta
+    }
+
+
+def adjust_post_counters(post_id, likes=0, comments=0):
+    """
+    Apply like/comment deltas to a post's denormalized counters and to its
+    author's totals, in one UPDATE each.
+    """
+    from .models import AuthorStats, Post
+
+    changes = _deltas({'like_count': likes, 'comment_count': comments})
+    if changes:
+        Post.objects.filter(pk=post_id).update(**changes)
+        AuthorStats.objects.filter(author__posts=post_id).update(**changes)
+
+
+def toggle_like(post, user):
+    """
+    Like ``post`` as ``user``, or take back the like if there is one; return
+    whether the post is now liked. The counters move by the link rows
+    actually deleted or inserted, so concurrent toggles can't miscount.
+    """
+    from .models import Post
+
+    through = Post.likes.through
+    with transaction.atomic():
+        deleted, _ = through.objects.filter(post_id=post.pk, user_id=user.pk).delete()
+        if deleted:
+            liked, change = False, -1
+        else:
+            try:
+                with transaction.atomic():
+                    through.objects.create(post_id=post.pk, user_id=user.pk)
+                liked, change = True, 1
+            except IntegrityError:
+                # A concurrent request inserted the same like since the delete.
+                liked, change = True, 0
+        if change:
+            adjust_post_counters(post.pk, likes=change)
+    if change:
+        # The through table was written directly, without m2m_changed.
+        response_cache.invalidate(Post)
+    return liked
+
+
+def adjust_author_stats(author_id, posts=None, sign=1):
+    """
+    Add (or with ``sign=-1``, remove) ``posts`` and their counters to an
+    author's totals in one UPDATE. Authors whose totals haven't been built
+    yet are skipped: their first read counts everything.
+    """
+    from .models import AuthorStats
+
+    fields = Counter()
+    for post in posts:
+        fields['post_count'] += sign
+        if post.status in STATUS_COUNT_FIELDS:
+            fields[STATUS_COUNT_FIELDS[post.status]] += sign
+        fields['view_count'] += sign * post.views
+        fields['like_count'] += sign * post.like_count
+        fields['comment_count'] += sign * post.comment_count
+    changes = _deltas(fields)
+    if changes:
+        AuthorStats.objects.filter(pk=author_id).update(**changes)
+
+
+def recount_author_stats(author_ids=None):
+    """
+    Rebuild authors' totals from the posts table (everyone's without
+    ``author_ids``) and return the number of authors written.
+    """
+    from .models import AuthorStats, Post
+
+    posts = Post.objects.all() if author_ids is None else Post.objects.filter(author__in=author_ids)
+    totals = posts.order_by().values('author').annotate(
+        post_count=Count('pk'),
+        published_count=Count('pk', filter=Q(status='published')),
+        draft_count=Count('pk', filter=Q(status='draft')),
+        view_count=Coalesce(Sum('views'), 0),
+        like_count=Coalesce(Sum('like_count'), 0),
+        comment_count=Coalesce(Sum('comment_count'), 0),
+    )
+    rows = {row['author']: AuthorStats(author_id=row.pop('author'), **row) for row in totals}
+    for author_id in author_ids or ():
+        rows.setdefault(author_id, AuthorStats(author_id=author_id))
+
+    with transaction.atomic():
+        AuthorStats.objects.bulk_create(
+            rows.values(), batch_size=1000,
+            update_conflicts=True, unique_fields=['author'], update_fields=AUTHOR_STAT_FIELDS,
+        )
+        if author_ids is None:
+            # Authors who no longer have any posts.
+            AuthorStats.objects.exclude(pk__in=Post.objects.values('author')).update(**{field: 0 for field in AUTHOR_STAT_FIELDS})
+    return len(rows)
+
+
+def get_author_stats(author):
+    """``author``'s AuthorStats row, built from their posts on first use."""
+    from .models import AuthorStats
+
+    stats = AuthorStats.objects.filter(pk=author.pk).first()
+    if stats is None:
+        recount_author_stats([author.pk])
+        stats = AuthorStats.objects.get(pk=author.pk)
+    stats.author = author
+    return stats
+
+
+def _count_subquery(queryset):
+    counted = queryset.order_by().values('post').annotate(total=Count('*')).values('total')
+    return Coalesce(Subquery(counted), Value(0))
+
+
+def recount_post_counters(queryset=None):
+    """
+    Recompute ``like_count`` and ``comment_count`` from the source tables
+    with a single correlated UPDATE and return the number of posts touched.
+    """
+    from .models import Comment, Post
+
+    if queryset is None:
+        queryset = Post.objects.all()
+    return queryset.update(
+        like_count=_count_subquery(Post.likes.through.objects.filter(post=OuterRef('pk'))),
+        comment_count=_count_subquery(Comment.objects.filter(post=OuterRef('pk'))),
+    )
+
+
+def _build_counter():
+    config = getattr(settings, 'BLOG_VIEW_COUNTER', {})
+    return ViewCounter(
+        flush_interval=config.get('FLUSH_INTERVAL', 10),
+        max_pending=config.get('MAX_PENDING', 1000),
+    )
+
+
+view_counter = _build_counter()
+atexit.register(view_counter.flush)
@@ -0,0 +1,69 @@
+"""
+Facet counts for a filtered post list: how many of the matching posts have
+each status, category, tag and read-time bucket.
+
+The matching posts are taken as a subquery of the filtered queryset, so
+filters that join (e.g. ``?tags=``) don't count a post twice. ``post_facets``
+then costs three queries whatever the filters: one aggregate for the total,
+the statuses and the read-time buckets, one ``GROUP BY`` over categories and
+one over the post/tag links.
+"""
+from django.conf import settings
+from django.db.models import Count, Q
+
+
+def facet_options():
+    config = getattr(settings, 'BLOG_FACETS', {})
+    return {
+        'read_time_buckets': config.get('READ_TIME_BUCKETS', [5, 10, 20]),
+        'max_tags': config.get('MAX_TAGS', 50),
+    }
+
+
+def read_time_buckets(edges):
+    """``(min, max)`` read times of the buckets split at ``edges``; ``max`` is None for the last."""
+    bounds = [0, *edges]
+    return [(low, high - 1) for low, high in zip(bounds, bounds[1:])] + [(bounds[-1], None)]
+
+
+def _in_bucket(low, high):
+    condition = Q(read_time__gte=low)
+    if high is not None:
+        condition &= Q(read_time__lte=high)
+    return condition
+
+
+def post_facets(queryset):
+    """Facet counts over the posts of ``queryset``."""
+    from .models import Category, Post, Tag
+
+    options = facet_options()
+    buckets = read_time_buckets(options['read_time_buckets'])
+    matching = Post.objects.filter(pk__in=queryset.order_by().values('pk'))
+
+    counts = matching.aggregate(
+        total=Count('pk'),
+        **{f'status_{value}': Count('pk', filter=Q(status=value)) for value, _ in Post.STATUS_CHOICES},
+        **{f'read_time_{n}': Count('pk', filter=_in_bucket(*bucket)) for n, bucket in enumerate(buckets)},
+    )
+    categories = (
+        Category.objects.filter(posts__in=matching)
+        .values('id', 'name', 'slug').annotate(count=Count('posts')).order_by('-count', 'name')
+    )
+    tags = (
+        Tag.objects.filter(posts__in=matching)
+        .values('id', 'name', 'slug').annotate(count=Count('posts')).order_by('-count', 'name')[:options['max_tags']]
+    )
+    return {
+        'count': counts['total'],
+        'status': [
+            {'value': value, 'label': label, 'count': counts[f'status_{value}']}
+            for value, label in Post.STATUS_CHOICES
+        ],
+        'categories': list(categories),
+        'tags': list(tags),
+        'read_time': [
+            {'min_read_time': low, 'max_read_time': high, 'count': counts[f'read_time_{n}']}
+            for n, (low, high) in enumerate(buckets)
+        ],
+    }
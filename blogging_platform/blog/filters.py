@@ -1,6 +1,7 @@
 import django_filters
-from django.db.models import Q
-from .models import Post
+from rest_framework import filters
+from .models import Category, Post, Tag
+from .search import get_search_backend
 
 class PostFilter(django_filters.FilterSet):
     search = django_filters.CharFilter(method='filter_search')
@@ -10,16 +11,11 @@ class PostFilter(django_filters.FilterSet):
     status = django_filters.ChoiceFilter(choices=Post.STATUS_CHOICES)
     min_read_time = django_filters.NumberFilter(field_name='read_time', lookup_expr='gte')
     max_read_time = django_filters.NumberFilter(field_name='read_time', lookup_expr='lte')
+    min_likes = django_filters.NumberFilter(field_name='like_count', lookup_expr='gte')
+    min_comments = django_filters.NumberFilter(field_name='comment_count', lookup_expr='gte')
     
     def filter_search(self, queryset, name, value):
-        return queryset.filter(
-            Q(title__icontains=value) | 
-            Q(content__icontains=value) |
-            Q(excerpt__icontains=value) |
-            Q(author__username__icontains=value) |
-            Q(category__name__icontains=value) |
-            Q(tags__name__icontains=value)
-        ).distinct()
+        return get_search_backend().search(queryset, value)
     
     class Meta:
         model = Post
@@ -29,4 +25,25 @@ class PostFilter(django_filters.FilterSet):
             'published_date': ['exact'],
             'status': ['exact'],
             'read_time': ['exact', 'lte', 'gte'],
-        } 
\ No newline at end of file
+        } 
+
+class NamePrefixFilter(django_filters.FilterSet):
+    prefix = django_filters.CharFilter(field_name='name', lookup_expr='istartswith')
+
+class CategoryFilter(NamePrefixFilter):
+    class Meta:
+        model = Category
+        fields = []
+
+class TagFilter(NamePrefixFilter):
+    class Meta:
+        model = Tag
+        fields = []
+
+class PostOrderingFilter(filters.OrderingFilter):
+    """Orders search results by relevance unless the client asks otherwise."""
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', '-published_date']
+        return super().get_ordering(request, queryset, view)
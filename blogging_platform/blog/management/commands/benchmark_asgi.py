@@ -0,0 +1,208 @@
+import asyncio
+import io
+import itertools
+import logging
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+
+from blog.cache import response_cache
+from blog.models import Category, Comment, Post
+
+# mode: (handler, URLconf)
+MODES = {
+    'wsgi': ('wsgi', 'blogging_platform.urls'),
+    'asgi': ('asgi', 'blogging_platform.urls'),
+    'asgi-async': ('asgi', 'blogging_platform.urls_asgi'),
+}
+
+
+def wsgi_get(handler, path):
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET', 'SCRIPT_NAME': '', 'PATH_INFO': path, 'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost', 'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+        'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+    }
+    statuses = []
+    response = handler(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        b''.join(response)
+    finally:
+        response.close()
+    return int(statuses[0].split()[0])
+
+
+async def asgi_get(handler, path):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '',
+        'query_string': query.encode(), 'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+    body_sent = False
+    status = None
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The client never disconnects; Django cancels this wait once it has responded.
+        await asyncio.Future()
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await handler(scope, receive, send)
+    return status
+
+
+@contextmanager
+def quiet():
+    logging.disable(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+@contextmanager
+def database_latency(milliseconds):
+    """Delay every query, as the round trip to a database server would."""
+    def delay(execute, sql, params, many, context):
+        time.sleep(milliseconds / 1000)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        # A thread's connection object is reused when it reconnects.
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(install)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+
+
+@contextmanager
+def response_cache_disabled():
+    response_cache.is_cacheable = lambda request: False
+    try:
+        yield
+    finally:
+        del response_cache.is_cacheable
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and latency of the read API under concurrent clients, served "
+        "by Django's WSGI handler on a thread pool (as by a threaded WSGI server), by its "
+        "ASGI handler with the sync views, and by the ASGI handler with the async read "
+        "views of settings_asgi. Requests are made in-process, without sockets or a "
+        "server, so this compares the request paths rather than servers. Detail requests "
+        "count views; run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paths', nargs='+',
+                            help="Paths to request in turn (default: post, comment and category reads).")
+        parser.add_argument('--requests', type=int, default=2000, help="Measured requests per mode.")
+        parser.add_argument('--concurrency', type=int, default=64, help="Clients sending requests at once.")
+        parser.add_argument('--threads', type=int, default=8, help="Worker threads of the WSGI server.")
+        parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+        parser.add_argument('--cached', action='store_true',
+                            help="Let list responses come from the response cache.")
+        parser.add_argument('--db-latency', type=float, default=0,
+                            help="Milliseconds added to every query, to stand in for a database server.")
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or self.default_paths()
+        results = {}
+        with quiet(), override_settings(DEBUG=False, ALLOWED_HOSTS=['localhost']), \
+                database_latency(options['db_latency']):
+            with nullcontext() if options['cached'] else response_cache_disabled():
+                for mode in options['modes']:
+                    handler_type, urlconf = MODES[mode]
+                    with override_settings(ROOT_URLCONF=urlconf):
+                        results[mode] = asyncio.run(self.run(handler_type, paths, options))
+
+        self.stdout.write(
+            f"{len(paths)} paths, {options['requests']} requests, concurrency {options['concurrency']}, "
+            f"{options['threads']} WSGI threads, {options['db_latency']:g} ms added per query"
+        )
+        self.stdout.write(f"{'mode':<12}{'req/s':>10}{'p50 (ms)':>12}{'p99 (ms)':>12}{'errors':>8}")
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<12}{result['rate']:>10.1f}{result['p50']:>12.1f}{result['p99']:>12.1f}{result['errors']:>8}"
+            )
+
+    def default_paths(self):
+        post = Post.objects.filter(status='published').order_by('-published_date').first()
+        if post is None:
+            raise CommandError("No published posts; seed some with benchmark_queries --seed --posts 10000.")
+        paths = ['/api/posts/', f'/api/posts/{post.slug}/', '/api/categories/']
+        comment_post = Comment.objects.filter(parent=None).values_list('post_id', flat=True).first()
+        if comment_post is not None:
+            paths.append(f'/api/comments/?post={comment_post}')
+        category = Category.objects.values_list('slug', flat=True).first()
+        if category is not None:
+            paths.append(f'/api/categories/{category}/')
+        return paths
+
+    async def run(self, handler_type, paths, options):
+        if handler_type == 'wsgi':
+            handler = WSGIHandler()
+            pool = ThreadPoolExecutor(options['threads'])
+            loop = asyncio.get_running_loop()
+
+            def get(path):
+                return loop.run_in_executor(pool, wsgi_get, handler, path)
+        else:
+            handler = ASGIHandler()
+
+            def get(path):
+                return asgi_get(handler, path)
+
+        for path in paths:  # warm up imports, URL resolution and connections
+            await get(path)
+
+        sequence = itertools.count()
+        latencies = []
+        errors = 0
+
+        async def client():
+            nonlocal errors
+            while (n := next(sequence)) < options['requests']:
+                start = time.perf_counter()
+                status = await get(paths[n % len(paths)])
+                latencies.append((time.perf_counter() - start) * 1000)
+                errors += status != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(options['concurrency'])))
+        elapsed = time.perf_counter() - start
+        if handler_type == 'wsgi':
+            pool.shutdown()
+
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            'rate': len(latencies) / elapsed,
+            'p50': percentiles[49],
+            'p99': percentiles[98],
+            'errors': errors,
+        }
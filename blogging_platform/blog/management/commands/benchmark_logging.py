@@ -0,0 +1,77 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from blog.log import NonBlockingHandler, RequestIdFilter, SamplingFilter
+
+LOGGERS = ('django', 'blog', 'accounts')
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure requests/sec of an API endpoint, served in-process through the full "
+        "middleware stack, with logging off, with synchronous unsampled DEBUG logging "
+        "(the old setup) and with the sampled non-blocking pipeline. Log output goes to "
+        "os.devnull, so this measures the cost of producing records, not of a terminal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/posts/')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--access-log-rate', type=float, default=0.1,
+                            help="Sampling rate of blog.requests in pipeline mode.")
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST='localhost')
+        client.get(options['path'])  # warm up caches and connections
+
+        results = {}
+        with open(os.devnull, 'w') as devnull:
+            for mode in ('off', 'synchronous', 'pipeline'):
+                with self.logging_mode(mode, devnull, options['access_log_rate']):
+                    results[mode] = self.run(client, options['path'], options['requests'])
+
+        baseline = results['off']
+        self.stdout.write(f"{'mode':<14}{'req/s':>12}{'vs off':>10}")
+        for mode, rate in results.items():
+            self.stdout.write(f"{mode:<14}{rate:>12.1f}{rate / baseline:>10.0%}")
+
+    def run(self, client, path, count):
+        start = time.perf_counter()
+        for _ in range(count):
+            client.get(path)
+        return count / (time.perf_counter() - start)
+
+    @contextmanager
+    def logging_mode(self, mode, stream, access_log_rate):
+        loggers = [logging.getLogger(name) for name in LOGGERS]
+        saved = [(logger, logger.handlers[:], logger.level) for logger in loggers]
+        handler = None
+        if mode == 'off':
+            logging.disable(logging.CRITICAL)
+        else:
+            if mode == 'synchronous':
+                handler = logging.StreamHandler(stream)
+                level = logging.DEBUG
+            else:
+                handler = NonBlockingHandler(stream)
+                handler.addFilter(SamplingFilter({'blog.requests': access_log_rate}))
+                level = logging.INFO
+            handler.addFilter(RequestIdFilter())
+            handler.setFormatter(logging.Formatter('{levelname} {asctime} {request_id} {name} {message}', style='{'))
+            for logger in loggers:
+                logger.handlers = [handler]
+                logger.setLevel(level)
+        try:
+            yield
+        finally:
+            logging.disable(logging.NOTSET)
+            if handler is not None:
+                handler.close()
+            for logger, handlers, level in saved:
+                logger.handlers = handlers
+                logger.setLevel(level)
@@ -0,0 +1,151 @@
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post
+
+SEED_PREFIX = 'bench-'
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Let bulk_create store the dates we generate instead of now()."""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field, _, _ in saved:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare query plans and latencies of the API's hot queries with and "
+        "without the blog indexes. Use --seed to generate synthetic posts first; "
+        "run it against a scratch database, not production data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true', help="Insert synthetic posts before measuring.")
+        parser.add_argument('--posts', type=int, default=1_000_000, help="Number of posts to seed.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per query.")
+        parser.add_argument('--no-plans', action='store_true', help="Only print latencies.")
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['posts'], options['batch_size'])
+
+        post = Post.objects.filter(
+            pk__in=Comment.objects.filter(parent__isnull=True).values('post_id')[:1]
+        ).first() or Post.objects.first()
+        if post is None:
+            raise CommandError("No posts to query; run with --seed.")
+        middle = Post.objects.order_by('-published_date', '-id')[Post.objects.count() // 2]
+
+        queries = {
+            'GET /api/posts/': Post.objects.order_by('-published_date', '-id')[:10],
+            'GET /api/posts/?cursor= (middle)': Post.objects.filter(
+                published_date__lt=middle.published_date
+            ).order_by('-published_date', '-id')[:10],
+            'GET /api/posts/?status=published': Post.objects.filter(
+                status='published'
+            ).order_by('-published_date', '-id')[:10],
+            'GET /api/posts/drafts/': Post.objects.filter(
+                author_id=post.author_id, status='draft'
+            ).order_by('-published_date', '-id')[:10],
+            'GET /api/posts/?min_read_time=5&max_read_time=6': Post.objects.filter(
+                read_time__gte=5, read_time__lte=6
+            ).order_by('read_time', 'id')[:10],
+            'GET /api/comments/?post=': Comment.objects.filter(
+                parent__isnull=True, post_id=post.pk
+            ).order_by('-created_date', '-id')[:10],
+        }
+        indexes = [(Post, index) for index in Post._meta.indexes]
+        indexes += [(Comment, index) for index in Comment._meta.indexes]
+
+        self.set_indexes(indexes, present=False)
+        try:
+            before = self.measure(queries, options)
+        finally:
+            self.set_indexes(indexes, present=True)
+        after = self.measure(queries, options)
+
+        self.stdout.write(f"\n{'query':<52}{'before (ms)':>14}{'after (ms)':>14}")
+        for name in queries:
+            self.stdout.write(f"{name:<52}{before[name]['ms']:>14.3f}{after[name]['ms']:>14.3f}")
+            if not options['no_plans']:
+                self.stdout.write(f"  before: {before[name]['plan']}")
+                self.stdout.write(f"  after:  {after[name]['plan']}")
+
+    def measure(self, queries, options):
+        results = {}
+        for name, queryset in queries.items():
+            list(queryset.all())  # warm the page cache
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - start) * 1000)
+            plan = '' if options['no_plans'] else ' | '.join(queryset.explain().splitlines())
+            results[name] = {'ms': statistics.median(timings), 'plan': plan}
+        return results
+
+    def set_indexes(self, indexes, present):
+        existing = {}
+        with connection.cursor() as cursor:
+            for model in {model for model, _ in indexes}:
+                existing[model] = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                if present and index.name not in existing[model]:
+                    editor.add_index(model, index)
+                elif not present and index.name in existing[model]:
+                    editor.remove_index(model, index)
+
+    def seed(self, count, batch_size):
+        rng = random.Random(42)
+        authors = [
+            User.objects.get_or_create(username=f'{SEED_PREFIX}author-{i}')[0] for i in range(100)
+        ]
+        categories = [
+            Category.objects.get_or_create(name=f'Bench {i}', slug=f'{SEED_PREFIX}category-{i}')[0]
+            for i in range(20)
+        ]
+        start = Post.objects.count()
+        now = timezone.now()
+        post_dates = [Post._meta.get_field(name) for name in ('published_date', 'updated_date', 'created_date')]
+        comment_dates = [Comment._meta.get_field('created_date')]
+
+        with explicit_dates(*post_dates, *comment_dates):
+            for offset in range(0, count, batch_size):
+                posts = []
+                for n in range(start + offset, start + min(offset + batch_size, count)):
+                    published = now - timedelta(minutes=n)
+                    posts.append(Post(
+                        title=f'Benchmark post {n}', slug=f'{SEED_PREFIX}post-{n}',
+                        content='lorem ipsum ' * 50, author=rng.choice(authors),
+                        category=rng.choice(categories),
+                        status='draft' if rng.random() < 0.1 else 'published',
+                        read_time=rng.randint(1, 20), views=rng.randint(0, 5000),
+                        published_date=published, updated_date=published, created_date=published,
+                    ))
+                with transaction.atomic():
+                    posts = Post.objects.bulk_create(posts)
+                    comments = [
+                        Comment(post=post, author=rng.choice(authors), content='Benchmark comment',
+                                created_date=post.published_date + timedelta(seconds=i))
+                        for post in posts[::10] for i in range(3)
+                    ]
+                    Comment.objects.bulk_create(comments)
+                self.stdout.write(f"Seeded {offset + len(posts)}/{count} posts", ending='\r')
+        self.stdout.write('')
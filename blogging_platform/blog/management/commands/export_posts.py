@@ -0,0 +1,36 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from blog.bulk import export_posts
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Export posts as NDJSON, in the format import_posts reads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help="File to write ('-' for stdout).")
+        parser.add_argument('--author', help="Only posts by this username.")
+        parser.add_argument('--status', choices=[value for value, _ in Post.STATUS_CHOICES])
+
+    def handle(self, *args, **options):
+        posts = Post.objects.all()
+        if options['author']:
+            posts = posts.filter(author__username=options['author'])
+        if options['status']:
+            posts = posts.filter(status=options['status'])
+
+        if options['output'] == '-':
+            count = self.write(posts, sys.stdout)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                count = self.write(posts, output)
+        self.stderr.write(self.style.SUCCESS(f"Exported {count} posts."))
+
+    def write(self, posts, output):
+        count = 0
+        for line in export_posts(posts):
+            output.write(line)
+            count += 1
+        return count
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from blog.counters import view_counter
+
+
+class Command(BaseCommand):
+    help = "Flush buffered post view counts to the database."
+
+    def handle(self, *args, **options):
+        flushed = view_counter.flush()
+        # Workers hold their own buffers; ask them to flush on their next view.
+        view_counter.request_flush()
+        self.stdout.write(self.style.SUCCESS(
+            f"Flushed {flushed} buffered views and requested a flush from running workers."
+        ))
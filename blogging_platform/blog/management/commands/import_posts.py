@@ -0,0 +1,46 @@
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.bulk import DEFAULT_CHUNK_SIZE, import_posts
+
+
+class Command(BaseCommand):
+    help = (
+        "Import posts from an NDJSON file (one JSON object per line, '-' for stdin). "
+        "Rows name their author by username; --author sets it for rows that don't."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--author', help="Username of the default author.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        author = None
+        if options['author']:
+            try:
+                author = User.objects.get(username=options['author'])
+            except User.DoesNotExist:
+                raise CommandError(f"Unknown user: {options['author']}")
+
+        start = time.perf_counter()
+        if options['path'] == '-':
+            report = import_posts(sys.stdin, author=author, use_row_authors=True,
+                                  chunk_size=options['chunk_size'])
+        else:
+            with open(options['path'], encoding='utf-8') as rows:
+                report = import_posts(rows, author=author, use_row_authors=True,
+                                      chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - start
+
+        for error in report.errors:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        if report.failed > len(report.errors):
+            self.stderr.write(f"... and {report.failed - len(report.errors)} more failed rows")
+        rate = report.created / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report.created} posts ({report.failed} failed) in {elapsed:.2f}s, {rate:.0f} posts/s."
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import response_cache
+from blog.models import Post
+from blog.related import rebuild_related_posts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the related posts of every published post. Lists are kept up to date as "
+        "posts change, but one a post left is a post short until this runs."
+    )
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_related_posts()
+        response_cache.invalidate(Post)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the related posts of {rebuilt} posts."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import response_cache
+from blog.models import Post
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for posts."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.install()
+        indexed = backend.rebuild()
+        response_cache.invalidate(Post)
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} posts with {type(backend).__name__}."
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import response_cache
+from blog.counters import recount_author_stats, recount_post_counters
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized like and comment counters on posts, then the authors' totals."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help="Number of posts updated per statement (0 updates every post at once).",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if not batch_size:
+            updated = recount_post_counters()
+        else:
+            updated = 0
+            last_id = 0
+            while True:
+                ids = list(
+                    Post.objects.filter(pk__gt=last_id).order_by('pk')
+                    .values_list('pk', flat=True)[:batch_size]
+                )
+                if not ids:
+                    break
+                updated += recount_post_counters(Post.objects.filter(pk__gte=ids[0], pk__lte=ids[-1]))
+                last_id = ids[-1]
+        authors = recount_author_stats()
+        response_cache.invalidate(Post)
+        self.stdout.write(self.style.SUCCESS(
+            f"Recounted likes and comments for {updated} posts and the totals of {authors} authors."
+        ))
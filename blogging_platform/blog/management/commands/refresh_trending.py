@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from blog.trending import refresh
+
+
+class Command(BaseCommand):
+    help = (
+        "Rescore the posts with views, likes or comments since the last run and rewrite "
+        "their trending entries. Schedule it every few minutes (e.g. from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help="Rescore every published post and drop stale scores.")
+
+    def handle(self, *args, **options):
+        scored = refresh(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f"Rescored {scored} posts."))
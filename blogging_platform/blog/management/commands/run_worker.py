@@ -0,0 +1,31 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from blog.tasks import Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks until interrupted (SIGINT/SIGTERM finish the current batch first)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Run the tasks that are due now, then exit.")
+        parser.add_argument('--batch-size', type=int, default=10,
+                            help="Tasks claimed at a time.")
+        parser.add_argument('--poll-interval', type=float,
+                            help="Seconds between checks of an empty queue (default: BLOG_TASKS).")
+
+    def handle(self, *args, **options):
+        worker = Worker(batch_size=options['batch_size'], poll_interval=options['poll_interval'])
+        if options['once']:
+            worker.requeue_expired()
+            worker.run_pending()
+        else:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *args: worker.stop())
+            self.stdout.write("Worker started; waiting for tasks.")
+            worker.run()
+        self.stdout.write(self.style.SUCCESS(
+            f"Ran {worker.completed + worker.failed} tasks: {worker.completed} succeeded, {worker.failed} failed."
+        ))
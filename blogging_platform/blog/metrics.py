@@ -0,0 +1,163 @@
+"""
+Per-request performance metrics.
+
+PerformanceMiddleware (blog.middleware) measures every request's wall time,
+SQL query count and time, time spent in serializers and response size, and
+records them here in histograms labelled by view and action. The registry is
+per process; ``render`` produces the Prometheus text exposition format.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'serializing')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+
+_current = contextvars.ContextVar('request_stats', default=None)
+
+
+def current_stats():
+    return _current.get()
+
+
+@contextmanager
+def collect():
+    """Collect RequestStats for the code run inside the block."""
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+class QueryTimer:
+    """
+    ``connection.execute_wrapper`` that counts and times queries into the
+    RequestStats being collected, if any. It is installed on every connection
+    as it opens (see ``install_query_timer``) rather than per request, so it
+    also sees the queries the async ORM runs in worker threads, which inherit
+    the request's context.
+    """
+
+    def __call__(self, execute, sql, params, many, context):
+        stats = _current.get()
+        if stats is None:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats.queries += 1
+            stats.db_time += time.perf_counter() - start
+
+
+query_timer = QueryTimer()
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """``connection_created`` receiver; see BlogConfig.ready."""
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+@contextmanager
+def timed_serialization():
+    """Add the block's duration to the request's serializer time (outermost call only)."""
+    stats = _current.get()
+    if stats is None or stats.serializing:
+        yield
+        return
+    stats.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serializer_time += time.perf_counter() - start
+        stats.serializing = False
+
+
+class Histogram:
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, label, value):
+        series = self._series.get(label)
+        if series is None:
+            series = self._series[label] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self, label_name):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for label, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_name}="{label}"}} {total}')
+            lines.append(f'{self.name}_count{{{label_name}="{label}"}} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {
+                'duration': Histogram('blog_request_duration_seconds', "Wall time per request.", DURATION_BUCKETS),
+                'db_time': Histogram('blog_db_duration_seconds', "Time spent in SQL queries per request.",
+                                     DURATION_BUCKETS),
+                'queries': Histogram('blog_db_queries', "SQL queries per request.", QUERY_BUCKETS),
+                'serializer_time': Histogram('blog_serializer_duration_seconds',
+                                             "Time spent in serializers per request.", DURATION_BUCKETS),
+                'response_size': Histogram('blog_response_size_bytes', "Response body size.", SIZE_BUCKETS),
+            }
+            self.over_budget = {}
+
+    def observe(self, view, duration, stats, response_size, over_budget=False):
+        with self._lock:
+            self.histograms['duration'].observe(view, duration)
+            self.histograms['db_time'].observe(view, stats.db_time)
+            self.histograms['queries'].observe(view, stats.queries)
+            self.histograms['serializer_time'].observe(view, stats.serializer_time)
+            if response_size is not None:
+                self.histograms['response_size'].observe(view, response_size)
+            if over_budget:
+                self.over_budget[view] = self.over_budget.get(view, 0) + 1
+
+    def render(self):
+        with self._lock:
+            lines = []
+            for histogram in self.histograms.values():
+                lines.extend(histogram.render('view'))
+            lines.append('# HELP blog_query_budget_exceeded_total Requests that ran more queries than the budget.')
+            lines.append('# TYPE blog_query_budget_exceeded_total counter')
+            for view, count in sorted(self.over_budget.items()):
+                lines.append(f'blog_query_budget_exceeded_total{{view="{view}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
@@ -1,22 +1,148 @@
 import logging
+import re
+import time
+import uuid
 
-logger = logging.getLogger(__name__)
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, empty
+
+from .log import request_id_var
+from .metrics import collect, metrics
+
+logger = logging.getLogger('blog.requests')
+performance_logger = logging.getLogger('blog.performance')
+
+# Accept a caller's id (e.g. from a load balancer) only if it looks like one.
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+class RequestIdMiddleware:
+    """
+    Tags every log record emitted while handling a request with its id, taken
+    from the ``X-Request-ID`` header or generated, and echoes it back in the
+    response. Each API request also produces one structured access record on
+    the ``blog.requests`` logger, which is usually sampled.
+    """
+
+    sync_capable = True
+    async_capable = True
+    header = 'HTTP_X_REQUEST_ID'
 
-class AuthDebugMiddleware:
-    
     def __init__(self, get_response):
         self.get_response = get_response
-        
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
     def __call__(self, request):
-        if request.path.startswith('/api/'):
-            auth_header = request.META.get('HTTP_AUTHORIZATION', 'None')
-            logger.info(f"Auth Debug - Path: {request.path}, Method: {request.method}")
-            logger.info(f"Auth Debug - Auth Header: {auth_header[:10]}...")
-            logger.info(f"Auth Debug - Is authenticated: {request.user.is_authenticated}")
-            
-            if request.user.is_authenticated:
-                logger.info(f"Auth Debug - User: {request.user.username}")
-        
-        response = self.get_response(request)
-
-        return response 
\ No newline at end of file
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token, start = self.start(request)
+        try:
+            return self.finish(request, self.get_response(request), start)
+        finally:
+            request_id_var.reset(token)
+
+    async def __acall__(self, request):
+        token, start = self.start(request)
+        try:
+            return self.finish(request, await self.get_response(request), start)
+        finally:
+            request_id_var.reset(token)
+
+    def start(self, request):
+        request_id = request.META.get(self.header, '')
+        if not REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+        return request_id_var.set(request_id), time.perf_counter()
+
+    def finish(self, request, response, start):
+        if request.path.startswith('/api/') and logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "%s %s %s", request.method, request.path, response.status_code,
+                extra={
+                    'method': request.method,
+                    'path': request.path,
+                    'status': response.status_code,
+                    'duration_ms': round((time.perf_counter() - start) * 1000, 2),
+                    'user_id': self.user_id(request),
+                },
+            )
+        response['X-Request-ID'] = request.request_id
+        return response
+
+    @staticmethod
+    def user_id(request):
+        user = getattr(request, 'user', None)
+        # Don't load the user just to log it (and async code can't).
+        if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+            return None
+        return getattr(user, 'pk', None)
+
+
+class PerformanceMiddleware:
+    """
+    Measures wall time, SQL query count and time, serializer time and response
+    size of every request and records them per view and action in
+    ``blog.metrics.metrics`` (exposed at ``/api/metrics/``). Timings are also
+    sent in a ``Server-Timing`` header. Requests running more queries than
+    ``BLOG_PERFORMANCE['QUERY_BUDGET']`` are logged and flagged with an
+    ``X-Query-Budget-Exceeded`` header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = getattr(settings, 'BLOG_PERFORMANCE', {})
+        self.query_budget = config.get('QUERY_BUDGET')
+        self.server_timing = config.get('SERVER_TIMING', True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with collect() as stats:
+            response = self.get_response(request)
+        return self.record(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with collect() as stats:
+            response = await self.get_response(request)
+        return self.record(request, response, stats, time.perf_counter() - start)
+
+    def record(self, request, response, stats, duration):
+        view = self.view_name(request)
+        size = None if response.streaming else len(response.content)
+        over_budget = self.query_budget is not None and stats.queries > self.query_budget
+        metrics.observe(view, duration, stats, size, over_budget)
+
+        if over_budget:
+            performance_logger.warning(
+                "%s ran %d queries (budget %d)", view, stats.queries, self.query_budget,
+                extra={'view': view, 'queries': stats.queries, 'path': request.path},
+            )
+            response['X-Query-Budget-Exceeded'] = f'{stats.queries}/{self.query_budget}'
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'app;dur={duration * 1000:.1f}, '
+                f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+                f'serialize;dur={stats.serializer_time * 1000:.1f}'
+            )
+        return response
+
+    @staticmethod
+    def view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unresolved'
+        view_class = getattr(match.func, 'cls', None)
+        if view_class is None:
+            return getattr(match.func, '__name__', 'unknown')
+        action = (getattr(match.func, 'actions', None) or {}).get(request.method.lower())
+        return f'{view_class.__name__}.{action or request.method.lower()}'
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:33
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    Comment = apps.get_model("blog", "Comment")
+
+    def count_of(queryset):
+        counted = (
+            queryset.order_by().values("post").annotate(total=Count("*")).values("total")
+        )
+        return Coalesce(Subquery(counted), Value(0))
+
+    Post.objects.update(
+        like_count=count_of(Post.likes.through.objects.filter(post=OuterRef("pk"))),
+        comment_count=count_of(Comment.objects.filter(post=OuterRef("pk"))),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0002_alter_category_options_category_description_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="like_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+import warnings
+
+from django.db import OperationalError, migrations
+
+
+def install_search_index(apps, schema_editor):
+    from blog.search import get_search_backend
+
+    backend = get_search_backend(schema_editor.connection)
+    try:
+        backend.install()
+    except OperationalError as e:
+        # SQLite compiled without FTS5: search falls back to icontains.
+        if "no such module: fts5" not in str(e):
+            raise
+        warnings.warn(f"Full-text search index not installed: {e}", RuntimeWarning)
+        return
+    # Filled by 0007_post_content_derivatives: rebuild() reads Post.plain_text,
+    # which doesn't exist yet at this point.
+
+
+def uninstall_search_index(apps, schema_editor):
+    from blog.search import get_search_backend
+
+    get_search_backend(schema_editor.connection).uninstall()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0003_post_like_count_post_comment_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0005_post_comment_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["updated_date"], name="post_updated_idx"),
+        ),
+    ]
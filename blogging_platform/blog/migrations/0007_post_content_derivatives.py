@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:36
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def backfill_derivatives(apps, schema_editor):
+    from blog.content import derive
+    from blog.search import get_search_backend
+
+    Post = apps.get_model("blog", "Post")
+    fields = ["plain_text", "word_count", "read_time", "excerpt"]
+    last_pk = 0
+    while True:
+        batch = list(
+            Post.objects.filter(pk__gt=last_pk).only("content", "excerpt", "read_time").order_by("pk")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for post in batch:
+            # Large bodies are processed here too, not deferred.
+            derived = derive(post.content)
+            post.plain_text, post.word_count, post.read_time = derived.plain_text, derived.word_count, derived.read_time
+            if not post.excerpt.strip():
+                post.excerpt = derived.excerpt
+        Post.objects.bulk_update(batch, fields)
+        last_pk = batch[-1].pk
+
+    # The index now holds plain_text instead of the raw content.
+    backend = get_search_backend(schema_editor.connection)
+    if backend.is_installed():
+        backend.rebuild()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0006_post_updated_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="plain_text",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="word_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_derivatives, migrations.RunPython.noop),
+    ]
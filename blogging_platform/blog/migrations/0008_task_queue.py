@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0007_post_content_derivatives"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Task",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=200)),
+                ("args", models.JSONField(default=list)),
+                ("kwargs", models.JSONField(default=dict)),
+                ("key", models.CharField(blank=True, help_text="Idempotency key", max_length=200, null=True)),
+                ("status", models.CharField(choices=[("queued", "Queued"), ("running", "Running"), ("failed", "Failed")], default="queued", max_length=10)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("max_attempts", models.PositiveIntegerField(default=5)),
+                ("run_after", models.DateTimeField(default=django.utils.timezone.now)),
+                ("claimed_by", models.CharField(blank=True, max_length=32)),
+                ("claimed_at", models.DateTimeField(blank=True, null=True)),
+                ("last_error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["status", "run_after"], name="task_due_idx")],
+                "constraints": [models.UniqueConstraint(condition=models.Q(("status", "queued")), fields=("key",), name="task_queued_key_uniq")],
+            },
+        ),
+    ]
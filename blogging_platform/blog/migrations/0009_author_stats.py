@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("blog", "0008_task_queue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthorStats",
+            fields=[
+                ("author", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="post_stats", serialize=False, to=settings.AUTH_USER_MODEL)),
+                ("post_count", models.PositiveIntegerField(default=0)),
+                ("published_count", models.PositiveIntegerField(default=0)),
+                ("draft_count", models.PositiveIntegerField(default=0)),
+                ("view_count", models.PositiveBigIntegerField(default=0)),
+                ("like_count", models.PositiveIntegerField(default=0)),
+                ("comment_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "Author stats",
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0009_author_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostTrend",
+            fields=[
+                ("post", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="trend", serialize=False, to="blog.post")),
+                ("score", models.FloatField()),
+                ("views_seen", models.PositiveIntegerField(default=0)),
+                ("likes_seen", models.PositiveIntegerField(default=0)),
+                ("comments_seen", models.PositiveIntegerField(default=0)),
+                ("refreshed_at", models.DateTimeField()),
+            ],
+            options={
+                "indexes": [models.Index(fields=["refreshed_at"], name="trend_refreshed_idx")],
+            },
+        ),
+        migrations.CreateModel(
+            name="TrendingEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("scope", models.CharField(choices=[("all", "All posts"), ("category", "Category"), ("tag", "Tag")], max_length=10)),
+                ("scope_id", models.PositiveIntegerField(default=0, help_text="Category or tag id; 0 for all posts")),
+                ("score", models.FloatField()),
+                ("post", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="trending_entries", to="blog.post")),
+            ],
+            options={
+                "verbose_name_plural": "Trending entries",
+                "indexes": [models.Index(fields=["scope", "scope_id", "-score"], name="trending_top_idx")],
+                "constraints": [models.UniqueConstraint(fields=("scope", "scope_id", "post"), name="trending_entry_uniq")],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0010_trending"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedPost",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("score", models.FloatField()),
+                ("post", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="related_entries", to="blog.post")),
+                ("related", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="related_to_entries", to="blog.post")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["post", "-score"], name="related_top_idx")],
+                "constraints": [models.UniqueConstraint(fields=("post", "related"), name="related_post_uniq")],
+            },
+        ),
+    ]
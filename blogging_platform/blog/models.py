@@ -1,6 +1,11 @@
+from functools import partial
+
 from django.db import models
 from django.contrib.auth.models import User
-from django.utils.text import slugify
+from django.utils import timezone
+
+from .content import apply_derivatives, is_large, schedule_update
+from .slugs import save_with_unique_slug
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -8,9 +13,7 @@ class Category(models.Model):
     description = models.TextField(blank=True)
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        save_with_unique_slug(self, self.name, partial(super().save, *args, **kwargs))
 
     def __str__(self):
         return self.name
@@ -23,9 +26,7 @@ class Tag(models.Model):
     slug = models.SlugField(unique=True, blank=True)
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        save_with_unique_slug(self, self.name, partial(super().save, *args, **kwargs))
 
     def __str__(self):
         return self.name
@@ -49,26 +50,56 @@ class Post(models.Model):
     tags = models.ManyToManyField(Tag, blank=True, related_name='posts')
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
     read_time = models.PositiveIntegerField(default=0, help_text="Estimated read time in minutes")
+    # Derived from content on save; see blog.content.
+    word_count = models.PositiveIntegerField(default=0)
+    plain_text = models.TextField(blank=True, editable=False)
     views = models.PositiveIntegerField(default=0)
     likes = models.ManyToManyField(User, blank=True, related_name='liked_posts')
+    # Denormalized from the likes and comments tables; see blog.counters.
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Default listing order and its keyset tiebreaker.
+            models.Index(fields=['-published_date', '-id'], name='post_published_idx'),
+            # An author's drafts/published posts, newest first.
+            models.Index(fields=['author', 'status', '-published_date', '-id'], name='post_author_status_idx'),
+            models.Index(fields=['status', '-published_date', '-id'], name='post_status_published_idx'),
+            models.Index(fields=['read_time'], name='post_read_time_idx'),
+            # max(updated_date) probe behind the listing ETag.
+            models.Index(fields=['updated_date'], name='post_updated_idx'),
+        ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets save() skip reprocessing content that didn't change.
+        instance._loaded_content = instance.__dict__.get('content')
+        # Lets the author stats follow status and author changes; see blog.signals.
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_author_id = instance.__dict__.get('author_id')
+        # Lets the related posts follow category changes.
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
-        
-        # Calculate read time if not provided
-        if not self.read_time:
-            word_count = len(self.content.split())
-            self.read_time = max(1, round(word_count / 200))  # Assuming 200 words per minute
-            
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        content_saved = update_fields is None or 'content' in update_fields
+        derived_fields = apply_derivatives(self) if content_saved else []
+        if derived_fields and update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *derived_fields}
+
+        save_with_unique_slug(self, self.title, partial(super().save, *args, **kwargs))
+
+        if content_saved:
+            if derived_fields and is_large(self.content):
+                # Only estimates were stored; see blog.content.
+                schedule_update(self.pk)
+            self._loaded_content = self.content
 
     def __str__(self):
         return self.title
-        
-    @property
-    def like_count(self):
-        return self.likes.count()
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
@@ -80,6 +111,14 @@ class Comment(models.Model):
     
     class Meta:
         ordering = ['-created_date']
+        indexes = [
+            # Top-level comments of a post, newest first (CommentViewSet).
+            models.Index(
+                fields=['post', '-created_date', '-id'],
+                condition=models.Q(parent__isnull=True),
+                name='comment_top_level_idx',
+            ),
+        ]
     
     def __str__(self):
         return f'Comment by {self.author.username} on {self.post.title}'
@@ -87,3 +126,125 @@ class Comment(models.Model):
     @property
     def is_reply(self):
         return self.parent is not None
+
+class AuthorStats(models.Model):
+    """
+    Totals over an author's posts, for their dashboard. Kept current by
+    blog.counters as posts, likes, comments and views change; built from the
+    posts table on first read.
+    """
+    author = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='post_stats')
+    post_count = models.PositiveIntegerField(default=0)
+    published_count = models.PositiveIntegerField(default=0)
+    draft_count = models.PositiveIntegerField(default=0)
+    view_count = models.PositiveBigIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'Author stats'
+
+    def __str__(self):
+        return f'Stats for {self.author}'
+
+class PostTrend(models.Model):
+    """
+    A published post's decayed activity score and the counters it was last
+    computed from; see blog.trending.
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='trend')
+    score = models.FloatField()
+    views_seen = models.PositiveIntegerField(default=0)
+    likes_seen = models.PositiveIntegerField(default=0)
+    comments_seen = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['refreshed_at'], name='trend_refreshed_idx'),
+        ]
+
+class TrendingEntry(models.Model):
+    """A post's place in one trending list: all posts, a category or a tag."""
+    ALL = 'all'
+    CATEGORY = 'category'
+    TAG = 'tag'
+    SCOPE_CHOICES = [
+        (ALL, 'All posts'),
+        (CATEGORY, 'Category'),
+        (TAG, 'Tag'),
+    ]
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    scope_id = models.PositiveIntegerField(default=0, help_text="Category or tag id; 0 for all posts")
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='trending_entries')
+    score = models.FloatField()
+
+    class Meta:
+        verbose_name_plural = 'Trending entries'
+        indexes = [
+            # Top-K of one list.
+            models.Index(fields=['scope', 'scope_id', '-score'], name='trending_top_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'scope_id', 'post'], name='trending_entry_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.post} in {self.scope} {self.scope_id}'
+
+class RelatedPost(models.Model):
+    """One of the posts most similar to ``post``; see blog.related."""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_to_entries')
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            # Top-N of one post's list.
+            models.Index(fields=['post', '-score'], name='related_top_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'related'], name='related_post_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.related} for {self.post}'
+
+class Task(models.Model):
+    """A queued call of a task function; see blog.tasks."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    key = models.CharField(max_length=200, null=True, blank=True, help_text="Idempotency key")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # The worker's next due tasks.
+            models.Index(fields=['status', 'run_after'], name='task_due_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'], condition=models.Q(status='queued'), name='task_queued_key_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
@@ -0,0 +1,201 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over the view's ordering plus the primary key.
+
+    Each page is fetched with ``WHERE (ordering columns) < (last row's values)``
+    instead of ``OFFSET``, so deep pages cost the same as the first one. The
+    cursor is opaque to clients and records the ordering it was issued for,
+    which lets it work with any of the view's ``ordering_fields``.
+
+    The total ``count`` is included by default for compatibility; clients
+    that don't need it pass ``count=false`` to skip the ``COUNT(*)``, and a
+    view that already knows the total sets it as ``paginated_count``. Requests
+    that still use ``?page=`` are served by page-number pagination.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_query_param = 'page'
+    ordering = ('-pk',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_number_paginator = None
+        if self.page_query_param in request.query_params:
+            self.page_number_paginator = self.get_page_number_paginator()
+            return self.page_number_paginator.paginate_queryset(queryset, request, view)
+
+        cursor = self.start_page(queryset, request, view)
+        self.count = getattr(view, 'paginated_count', None)
+        if self.count is None and self.include_count(request):
+            self.count = queryset.count()
+        return self.end_page(list(self.page_queryset(queryset, cursor)), cursor)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` with the async ORM. ``?page=`` requests aren't supported."""
+        self.request = request
+        self.page_number_paginator = None
+        cursor = self.start_page(queryset, request, view)
+        self.count = getattr(view, 'paginated_count', None)
+        if self.count is None and self.include_count(request):
+            self.count = await queryset.acount()
+        return self.end_page([row async for row in self.page_queryset(queryset, cursor)], cursor)
+
+    def start_page(self, queryset, request, view):
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        return self.decode_cursor(request)
+
+    def page_queryset(self, queryset, cursor):
+        reverse = bool(cursor and cursor['reverse'])
+        if cursor:
+            queryset = queryset.filter(self.keyset_filter(cursor['values'], reverse))
+        ordering = [self.flip(field) for field in self.ordering] if reverse else self.ordering
+        return queryset.order_by(*ordering)[:self.page_size + 1]
+
+    def end_page(self, rows, cursor):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if cursor and cursor['reverse']:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_paginated_response(data)
+
+        payload = {}
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_page_number_paginator(self):
+        paginator = PageNumberPagination()
+        paginator.page_size = self.get_page_size(self.request)
+        paginator.page_query_param = self.page_query_param
+        return paginator
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def include_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() not in ('false', '0', 'no')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        if view is not None:
+            for backend in getattr(view, 'filter_backends', []):
+                if issubclass(backend, OrderingFilter):
+                    ordering = backend().get_ordering(request, queryset, view)
+                    break
+        ordering = [field.replace('pk', 'id') if field.lstrip('-') == 'pk' else field
+                    for field in (ordering or self.ordering)]
+        # The primary key makes every position unique, so no row is skipped or repeated.
+        if not any(field.lstrip('-') == 'id' for field in ordering):
+            ordering.append('-id' if ordering[-1].startswith('-') else 'id')
+        return ordering
+
+    @staticmethod
+    def flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def keyset_filter(self, values, reverse):
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            step = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[index]})
+            for previous, value in zip(self.ordering[:index], values):
+                step &= Q(**{previous.lstrip('-'): value})
+            condition |= step
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if cursor['o'] != self.ordering or len(cursor['v']) != len(self.ordering):
+                raise ValueError
+            values = [self.to_python(field, value) for field, value in zip(self.ordering, cursor['v'])]
+            return {'values': values, 'reverse': bool(cursor.get('r'))}
+        except (TypeError, ValueError, KeyError, binascii.Error, UnicodeEncodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        values = [self.to_json(getattr(row, field.lstrip('-'))) for field in self.ordering]
+        cursor = {'o': self.ordering, 'v': values}
+        if reverse:
+            cursor['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor, separators=(',', ':')).encode()).decode('ascii')
+        return replace_query_param(remove_query_param(self.base_url, self.page_query_param),
+                                   self.cursor_query_param, encoded)
+
+    def to_python(self, field, value):
+        try:
+            model_field = self.model._meta.get_field(field.lstrip('-'))
+        except FieldDoesNotExist:
+            return value  # an annotation such as search_rank
+        return model_field.to_python(value)
+
+    @staticmethod
+    def to_json(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class PostPagination(KeysetPagination):
+    ordering = ('-published_date', '-id')
+
+
+class CommentPagination(KeysetPagination):
+    ordering = ('-created_date', '-id')
+
+
+class TaxonomyPagination(KeysetPagination):
+    ordering = ('name', 'id')
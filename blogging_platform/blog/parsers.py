@@ -0,0 +1,15 @@
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Newline-delimited JSON. Returns the request body as an iterator of lines,
+    so rows can be processed as they are read; decoding each line is left to
+    the view (see blog.bulk.parse_rows).
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter(())
+        return iter(stream)
@@ -0,0 +1,185 @@
+"""
+Related posts: for each published post, the ``MAX_RELATED`` published posts
+most similar to it, precomputed in ``RelatedPost`` so a post's list is read
+as the top rows of one index.
+
+Two posts are similar by the Jaccard index of their tags (shared tags over
+tags of either) plus ``CATEGORY_WEIGHT`` when they are in the same category.
+Candidates are the posts sharing a tag, and the ``CATEGORY_CANDIDATES``
+latest posts of the category, so an untagged post still gets a list.
+
+``update_related_posts`` runs (as a task, see blog.signals) when a post's
+tags, category or status change. It recomputes that post's list and, since
+similarity is symmetric, its place in the lists of its candidates: a
+candidate's list takes it in if it beats the list's lowest score, dropping
+that one. A post that stops being similar leaves the lists it was in, which
+are then a post short until ``rebuild_related_posts`` recomputes them.
+
+Both bump ``RELATED_GENERATION`` once their writes commit: the lists change
+after the post saves that invalidated the cached responses already.
+"""
+import heapq
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min, Q, Window
+from django.db.models.functions import RowNumber
+
+from .cache import response_cache
+from .tasks import task
+
+RELATED_GENERATION = 'blog.related'
+
+REBUILD_BATCH = 500
+
+
+def related_options():
+    config = getattr(settings, 'BLOG_RELATED', {})
+    return {
+        'max_related': config.get('MAX_RELATED', 20),
+        'category_weight': config.get('CATEGORY_WEIGHT', 0.25),
+        'category_candidates': config.get('CATEGORY_CANDIDATES', 50),
+    }
+
+
+def similarity(tags, other_tags, shared, same_category, category_weight):
+    """Tag Jaccard index of two posts from their tag counts, plus the category bonus."""
+    union = tags + other_tags - shared
+    return (shared / union if union else 0.0) + (category_weight if same_category else 0.0)
+
+
+def _scores(post_id, tag_ids, category_id, options):
+    """``{candidate id: similarity}`` for the published posts similar to a post."""
+    from .models import Post
+
+    through = Post.tags.through
+    candidates = Q(pk__in=through.objects.filter(tag_id__in=tag_ids).values('post_id'))
+    if category_id is not None:
+        latest = (Post.objects.filter(status='published', category_id=category_id).exclude(pk=post_id)
+                  .order_by('-published_date', '-id').values_list('pk', flat=True)[:options['category_candidates']])
+        candidates |= Q(pk__in=list(latest))
+    rows = (
+        Post.objects.filter(candidates, status='published').exclude(pk=post_id)
+        .annotate(tag_count=Count('tags', distinct=True),
+                  shared=Count('tags', filter=Q(tags__in=tag_ids), distinct=True))
+        .values_list('pk', 'category_id', 'tag_count', 'shared')
+    )
+    return {
+        pk: similarity(len(tag_ids), tag_count, shared,
+                       category_id is not None and other_category == category_id, options['category_weight'])
+        for pk, other_category, tag_count, shared in rows
+    }
+
+
+def _top(scores, limit):
+    return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+
+
+@task
+def update_related_posts(post_ids):
+    """Recompute the related posts of ``post_ids`` and their place in their candidates' lists."""
+    from .models import Post, RelatedPost
+
+    options = related_options()
+    limit = options['max_related']
+    posts = dict(
+        (pk, category_id) for pk, category_id in
+        Post.objects.filter(pk__in=post_ids, status='published').values_list('pk', 'category_id')
+    )
+    tags = defaultdict(list)
+    for post_id, tag_id in Post.tags.through.objects.filter(post_id__in=posts).values_list('post_id', 'tag_id'):
+        tags[post_id].append(tag_id)
+
+    for post_id in post_ids:
+        scores = _scores(post_id, tags[post_id], posts[post_id], options) if post_id in posts else {}
+        with transaction.atomic():
+            RelatedPost.objects.filter(Q(post_id=post_id) | Q(related_id=post_id)).delete()
+            RelatedPost.objects.bulk_create(
+                RelatedPost(post_id=post_id, related_id=related_id, score=score)
+                for related_id, score in _top(scores, limit)
+            )
+            candidates = list(scores)
+            for start in range(0, len(candidates), REBUILD_BATCH):
+                _offer(post_id, {pk: scores[pk] for pk in candidates[start:start + REBUILD_BATCH]}, limit)
+    transaction.on_commit(_invalidate_related)
+
+
+def _invalidate_related():
+    response_cache.invalidate(RELATED_GENERATION)
+
+
+def _offer(post_id, scores, limit):
+    """Add ``post_id`` to the lists of the posts in ``scores`` it makes the top ``limit`` of."""
+    from .models import RelatedPost
+
+    lists = {
+        pk: (size, lowest) for pk, size, lowest in
+        RelatedPost.objects.filter(post_id__in=scores).values('post_id')
+        .annotate(size=Count('pk'), lowest=Min('score')).values_list('post_id', 'size', 'lowest')
+    }
+    added, full = [], []
+    for pk, score in scores.items():
+        size, lowest = lists.get(pk, (0, None))
+        if size < limit:
+            added.append(pk)
+        elif score > lowest:
+            added.append(pk)
+            full.append(pk)
+    RelatedPost.objects.bulk_create(
+        RelatedPost(post_id=pk, related_id=post_id, score=scores[pk]) for pk in added
+    )
+    if full:
+        _trim(full, limit)
+
+
+def _trim(post_ids, limit):
+    from .models import RelatedPost
+
+    overflow = (
+        RelatedPost.objects.filter(post_id__in=post_ids)
+        .annotate(rank=Window(RowNumber(), partition_by=[F('post_id')],
+                              order_by=[F('score').desc(), F('related_id').desc()]))
+        .filter(rank__gt=limit).values_list('pk', flat=True)
+    )
+    RelatedPost.objects.filter(pk__in=list(overflow)).delete()
+
+
+def rebuild_related_posts():
+    """Recompute every published post's related posts. Returns the number of posts."""
+    from .models import Post, RelatedPost
+
+    options = related_options()
+    last_id = 0
+    rebuilt = 0
+    RelatedPost.objects.exclude(post__status='published').delete()
+    while True:
+        batch = list(
+            Post.objects.filter(status='published', pk__gt=last_id).order_by('pk')
+            .values_list('pk', 'category_id')[:REBUILD_BATCH]
+        )
+        if not batch:
+            transaction.on_commit(_invalidate_related)
+            return rebuilt
+        tags = defaultdict(list)
+        for post_id, tag_id in (Post.tags.through.objects.filter(post_id__in=[pk for pk, _ in batch])
+                                .values_list('post_id', 'tag_id')):
+            tags[post_id].append(tag_id)
+        rows = [
+            RelatedPost(post_id=post_id, related_id=related_id, score=score)
+            for post_id, category_id in batch
+            for related_id, score in _top(_scores(post_id, tags[post_id], category_id, options),
+                                          options['max_related'])
+        ]
+        with transaction.atomic():
+            RelatedPost.objects.filter(post_id__in=[pk for pk, _ in batch]).delete()
+            RelatedPost.objects.bulk_create(rows)
+        rebuilt += len(batch)
+        last_id = batch[-1][0]
+
+
+def related_posts(queryset, slug, limit):
+    """The ``limit`` posts most related to the published post ``slug``, from ``queryset``, in one query."""
+    return queryset.filter(
+        status='published', related_to_entries__post__slug=slug, related_to_entries__post__status='published',
+    ).order_by('-related_to_entries__score', '-pk')[:limit]
@@ -0,0 +1,326 @@
+"""
+Full-text search over posts.
+
+Each database gets the inverted index it supports natively: an FTS5 virtual
+table on SQLite and a table of weighted ``tsvector`` documents with a GIN
+index on PostgreSQL. Other databases, or SQLite builds without FTS5, fall back to the
+``icontains`` lookups PostFilter used before.
+
+A backend's ``search`` filters a Post queryset down to the matching rows and
+annotates them with ``search_rank`` (higher is better) and ``search_snippet``
+(an excerpt with the matched terms wrapped in ``<mark>``). Posts are indexed
+by their ``plain_text`` (see blog.content), so markup is never matched.
+"""
+import re
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .tasks import task
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+# Rows are written in batches to stay under the SQLite parameter limit.
+INDEX_BATCH_SIZE = 200
+
+
+class FallbackSearchBackend:
+    """Unindexed substring search for databases without a native engine."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        pass
+
+    def uninstall(self):
+        pass
+
+    def is_installed(self):
+        return True
+
+    def index_posts(self, post_ids):
+        pass
+
+    def index_documents(self, documents, replace=True):
+        pass
+
+    def remove_posts(self, post_ids):
+        pass
+
+    def rebuild(self):
+        return 0
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(plain_text__icontains=query) |
+            Q(excerpt__icontains=query) |
+            Q(author__username__icontains=query) |
+            Q(category__name__icontains=query) |
+            Q(tags__name__icontains=query)
+        ).distinct()
+
+
+class SQLiteSearchBackend(FallbackSearchBackend):
+    table = 'blog_post_fts'
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+                "USING fts5(title, excerpt, content, meta, tokenize='porter unicode61')"
+            )
+        _installed_cache.pop(self.connection.alias, None)
+
+    def uninstall(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+        _installed_cache.pop(self.connection.alias, None)
+
+    def is_installed(self):
+        alias = self.connection.alias
+        if alias not in _installed_cache:
+            _installed_cache[alias] = self.table in self.connection.introspection.table_names()
+        return _installed_cache[alias]
+
+    def index_posts(self, post_ids):
+        if not self.is_installed():
+            return
+        post_ids = list(post_ids)
+        # One transaction: in autocommit mode every inserted row would be synced on its own.
+        with transaction.atomic(using=self.connection.alias):
+            for start in range(0, len(post_ids), INDEX_BATCH_SIZE):
+                self.index_documents(_documents(post_ids[start:start + INDEX_BATCH_SIZE]))
+
+    def index_documents(self, documents, replace=True):
+        """
+        Index ``(id, title, excerpt, plain text, meta)`` tuples. ``replace=False``
+        skips removing previous entries, for posts known to be new.
+        """
+        if not self.is_installed():
+            return
+        documents = list(documents)
+        with transaction.atomic(using=self.connection.alias), self.connection.cursor() as cursor:
+            for start in range(0, len(documents), INDEX_BATCH_SIZE):
+                batch = documents[start:start + INDEX_BATCH_SIZE]
+                if replace:
+                    cursor.execute(
+                        f"DELETE FROM {self.table} WHERE rowid IN ({', '.join(['%s'] * len(batch))})",
+                        [document[0] for document in batch],
+                    )
+                cursor.executemany(
+                    f"INSERT INTO {self.table} (rowid, title, excerpt, content, meta) "
+                    "VALUES (%s, %s, %s, %s, %s)",
+                    batch,
+                )
+
+    def remove_posts(self, post_ids):
+        if not self.is_installed():
+            return
+        post_ids = list(post_ids)
+        for start in range(0, len(post_ids), INDEX_BATCH_SIZE):
+            batch = post_ids[start:start + INDEX_BATCH_SIZE]
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {self.table} WHERE rowid IN ({', '.join(['%s'] * len(batch))})",
+                    batch,
+                )
+
+    def rebuild(self):
+        if not self.is_installed():
+            return 0
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, excerpt, content, meta) "
+                "SELECT p.id, p.title, p.excerpt, p.plain_text, "
+                "u.username || ' ' || COALESCE(c.name, '') || ' ' || COALESCE(("
+                "  SELECT group_concat(t.name, ' ') FROM blog_tag t"
+                "  INNER JOIN blog_post_tags pt ON pt.tag_id = t.id WHERE pt.post_id = p.id"
+                "), '') "
+                "FROM blog_post p "
+                "INNER JOIN auth_user u ON u.id = p.author_id "
+                "LEFT OUTER JOIN blog_category c ON c.id = p.category_id"
+            )
+            return cursor.rowcount
+
+    def search(self, queryset, query):
+        if not self.is_installed():
+            return super().search(queryset, query)
+
+        expression = _fts5_query(query)
+        if expression is None:
+            return queryset.none()
+
+        table = queryset.model._meta.db_table
+        # bm25() is lower-is-better; the weights favour title, then excerpt and meta.
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [expression])
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({self.table}, 10.0, 4.0, 1.0, 2.0) FROM {self.table} "
+                f"WHERE {self.table} MATCH %s AND rowid = {table}.id",
+                [expression],
+            ),
+            search_snippet=RawSQL(
+                f"SELECT snippet({self.table}, -1, %s, %s, '…', 24) FROM {self.table} "
+                f"WHERE {self.table} MATCH %s AND rowid = {table}.id",
+                [HIGHLIGHT_START, HIGHLIGHT_END, expression],
+            ),
+        )
+
+
+class PostgresSearchBackend(FallbackSearchBackend):
+    table = 'blog_post_search'
+    config = 'english'
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "post_id bigint PRIMARY KEY REFERENCES blog_post (id) "
+                "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+                "document tsvector NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_document_gin "
+                f"ON {self.table} USING GIN (document)"
+            )
+
+    def uninstall(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def _document_sql(self):
+        return (
+            f"setweight(to_tsvector('{self.config}', %s), 'A') || "
+            f"setweight(to_tsvector('{self.config}', %s), 'B') || "
+            f"setweight(to_tsvector('{self.config}', %s), 'B') || "
+            f"setweight(to_tsvector('{self.config}', %s), 'D')"
+        )
+
+    def index_posts(self, post_ids):
+        post_ids = list(post_ids)
+        with transaction.atomic(using=self.connection.alias):
+            for start in range(0, len(post_ids), INDEX_BATCH_SIZE):
+                self.index_documents(_documents(post_ids[start:start + INDEX_BATCH_SIZE]))
+
+    def index_documents(self, documents, replace=True):
+        rows = [(pk, title, excerpt, meta, content) for pk, title, excerpt, content, meta in documents]
+        with transaction.atomic(using=self.connection.alias), self.connection.cursor() as cursor:
+            for start in range(0, len(rows), INDEX_BATCH_SIZE):
+                cursor.executemany(
+                    f"INSERT INTO {self.table} (post_id, document) "
+                    f"VALUES (%s, {self._document_sql()}) "
+                    "ON CONFLICT (post_id) DO UPDATE SET document = EXCLUDED.document",
+                    rows[start:start + INDEX_BATCH_SIZE],
+                )
+
+    def remove_posts(self, post_ids):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE post_id = ANY(%s)", [list(post_ids)])
+
+    def rebuild(self):
+        config = self.config
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (post_id, document) "
+                "SELECT p.id, "
+                f"setweight(to_tsvector('{config}', p.title), 'A') || "
+                f"setweight(to_tsvector('{config}', p.excerpt), 'B') || "
+                f"setweight(to_tsvector('{config}', u.username || ' ' || COALESCE(c.name, '') || ' ' || "
+                "COALESCE((SELECT string_agg(t.name, ' ') FROM blog_tag t "
+                "INNER JOIN blog_post_tags pt ON pt.tag_id = t.id WHERE pt.post_id = p.id), '')), 'B') || "
+                f"setweight(to_tsvector('{config}', p.plain_text), 'D') "
+                "FROM blog_post p "
+                "INNER JOIN auth_user u ON u.id = p.author_id "
+                "LEFT OUTER JOIN blog_category c ON c.id = p.category_id"
+            )
+            return cursor.rowcount
+
+    def search(self, queryset, query):
+        table = queryset.model._meta.db_table
+        tsquery = f"websearch_to_tsquery('{self.config}', %s)"
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT post_id FROM {self.table} WHERE document @@ {tsquery}", [query])
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT ts_rank_cd(document, {tsquery}) FROM {self.table} WHERE post_id = {table}.id",
+                [query],
+            ),
+            search_snippet=RawSQL(
+                f"ts_headline('{self.config}', {table}.plain_text, {tsquery}, %s)",
+                [query, f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords=35, MinWords=15'],
+            ),
+        )
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+_installed_cache = {}
+
+
+def get_search_backend(connection=None):
+    if connection is None:
+        from .models import Post
+        connection = connections[router.db_for_read(Post)]
+    return BACKENDS.get(connection.vendor, FallbackSearchBackend)(connection)
+
+
+def _fts5_query(query):
+    """Turn free text into an FTS5 expression: every word must match as a prefix."""
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return None
+    return ' '.join('"%s"*' % term for term in terms)
+
+
+def _documents(post_ids):
+    from .models import Post
+    posts = (
+        Post.objects.filter(pk__in=post_ids)
+        .select_related('author', 'category')
+        .prefetch_related('tags')
+        .defer('content')
+    )
+    return [
+        (post.pk, post.title, post.excerpt, post.plain_text, meta_text(
+            post.author.username, post.category.name if post.category else '',
+            [tag.name for tag in post.tags.all()],
+        ))
+        for post in posts
+    ]
+
+
+def meta_text(username, category_name, tag_names):
+    """The searchable text that isn't part of the post itself."""
+    return ' '.join(part for part in (username, category_name, *tag_names) if part)
+
+
+def index_posts(post_ids):
+    get_search_backend().index_posts(post_ids)
+
+
+@task
+def index_posts_of(relation, pk):
+    """Reindex the posts of a category (``relation='category'``) or a tag (``'tags'``)."""
+    from .cache import response_cache
+    from .models import Post
+
+    index_posts(list(Post.objects.filter(**{relation: pk}).values_list('pk', flat=True)))
+    response_cache.invalidate(Post)
+
+
+def remove_posts(post_ids):
+    get_search_backend().remove_posts(post_ids)
+
+
+def index_documents(documents, replace=True):
+    get_search_backend().index_documents(documents, replace=replace)
@@ -1,50 +1,191 @@
 from rest_framework import serializers
-from .models import Post, Category, Tag, Comment
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import ManyRelatedField, RelatedField
+from .models import AuthorStats, Post, Category, Tag, Comment
 from django.contrib.auth.models import User
-from django.utils.text import slugify
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.db.models.manager import BaseManager
+from .comment_tree import comment_tree_options, load_post_comment_trees, load_reply_trees
+from .metrics import timed_serialization
+from .tags import parse_tag_names, resolve_tags, set_post_tags
+import logging
+
+logger = logging.getLogger(__name__)
+
+class EagerLoadingMixin:
+    """
+    Builds the select_related/prefetch_related calls a queryset needs from the
+    serializer's declared fields, so serializing a page of objects costs a
+    fixed number of queries instead of one or more per object.
+    """
+    # Hints for fields whose data can't be inferred from their source (method
+    # fields, model properties), keyed by serializer field name.
+    eager_prefetch = {}
+    eager_annotations = {}
+
+    def setup_eager_loading(self, queryset, extra_columns=None):
+        """
+        Add the joins and prefetches the fields need. When ``extra_columns`` is
+        given, also restrict the SELECT with ``.only()`` to the columns the
+        fields read plus those (e.g. what the view filters or orders on).
+        """
+        model = queryset.model
+        select_related = []
+        prefetch_related = {}
+        columns = {model._meta.pk.name}
+
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if name in self.eager_annotations:
+                queryset = queryset.annotate(**self.eager_annotations[name])
+                continue
+            if name in self.eager_prefetch:
+                lookup = self.eager_prefetch[name]
+                prefetch_related[getattr(lookup, 'prefetch_to', lookup)] = lookup
+                continue
+            if not field.source_attrs:
+                continue
+
+            try:
+                model_field = model._meta.get_field(field.source_attrs[0])
+            except FieldDoesNotExist:
+                continue
+            if model_field.concrete and not model_field.many_to_many:
+                columns.add(model_field.name)
+            if not model_field.is_relation:
+                continue
+
+            lookup = model_field.name
+            if model_field.many_to_one or model_field.one_to_one:
+                # A bare primary key is read from the local column.
+                if (len(field.source_attrs) == 1 and isinstance(field, RelatedField)
+                        and field.use_pk_only_optimization()):
+                    continue
+                if lookup not in select_related:
+                    select_related.append(lookup)
+            elif isinstance(field, serializers.ListSerializer) and isinstance(field.child, EagerLoadingMixin):
+                related_queryset = model_field.related_model._default_manager.all()
+                prefetch_related[lookup] = Prefetch(
+                    lookup, queryset=field.child.setup_eager_loading(related_queryset)
+                )
+            elif isinstance(field, (serializers.ListSerializer, ManyRelatedField)):
+                prefetch_related.setdefault(lookup, lookup)
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related.values())
+        if extra_columns is not None:
+            queryset = queryset.only(*columns.union(extra_columns))
+        return queryset
+
+class SparseFieldsetMixin:
+    """
+    Lets read requests choose fields: ``?fields=a,b`` returns only those, and
+    ``?expand=a,b`` adds fields from ``Meta.expandable_fields``, which are
+    left out by default.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return fields
+
+        requested = self._param_names(request, 'fields')
+        if requested:
+            selected = {name: field for name, field in fields.items() if name in requested}
+            return selected or fields
+
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+        expanded = self._param_names(request, 'expand')
+        return {
+            name: field for name, field in fields.items()
+            if name not in expandable or name in expanded
+        }
+
+    @staticmethod
+    def _param_names(request, param):
+        value = request.query_params.get(param, '')
+        return {name.strip() for name in value.split(',') if name.strip()}
+
+class TimedRepresentationMixin:
+    """Counts time spent rendering into the request's serializer time (see blog.metrics)."""
+
+    def to_representation(self, instance):
+        with timed_serialization():
+            return super().to_representation(instance)
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name']
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    # Annotated by the view; left out of responses to writes.
+    post_count = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = Tag
-        fields = ['id', 'name', 'slug']
+        fields = ['id', 'name', 'slug', 'post_count']
+
+class CategorySerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    # Annotated by the view; left out of responses to writes.
+    post_count = serializers.IntegerField(read_only=True)
 
-class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = ['id', 'name', 'slug', 'description']
+        fields = ['id', 'name', 'slug', 'description', 'post_count']
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentListSerializer(TimedRepresentationMixin, serializers.ListSerializer):
+    def to_representation(self, data):
+        comments = list(data.all() if isinstance(data, BaseManager) else data)
+        if 'replies' in self.child.fields:
+            # One query for the threads under the whole page; nested lists are already loaded.
+            load_reply_trees(comments, **comment_tree_options(self.context.get('request')))
+        return super().to_representation(comments)
+
+class CommentSerializer(TimedRepresentationMixin, EagerLoadingMixin, serializers.ModelSerializer):
     author_detail = UserSerializer(source='author', read_only=True)
     replies = serializers.SerializerMethodField()
+    reply_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Comment
         fields = ['id', 'post', 'author', 'author_detail', 'parent', 'content', 
-                 'created_date', 'is_approved', 'replies']
+                 'created_date', 'is_approved', 'replies', 'reply_count']
         read_only_fields = ['author', 'is_approved']
+        list_serializer_class = CommentListSerializer
     
     def get_replies(self, obj):
-        if obj.parent is None:  # Only get replies for top-level comments
-            replies = Comment.objects.filter(parent=obj)
-            return CommentSerializer(replies, many=True).data
-        return []
+        if not hasattr(obj, 'tree_replies'):
+            load_reply_trees([obj], **comment_tree_options(self.context.get('request')))
+        return CommentSerializer(obj.tree_replies, many=True, context=self.context).data
+
+    def get_reply_count(self, obj):
+        # Direct replies, including any cut off by per_level_limit.
+        return getattr(obj, 'reply_count', None)
     
     def create(self, validated_data):
         validated_data['author'] = self.context['request'].user
         return super().create(validated_data)
 
-class PostSerializer(serializers.ModelSerializer):
+class PostListSerializer(TimedRepresentationMixin, serializers.ListSerializer):
+    def to_representation(self, data):
+        posts = list(data.all() if isinstance(data, BaseManager) else data)
+        if 'comments' in self.child.fields:
+            # Every post's comment threads in one query instead of one per post.
+            load_post_comment_trees(posts, **comment_tree_options(self.context.get('request')))
+        return super().to_representation(posts)
+
+class PostSerializer(TimedRepresentationMixin, SparseFieldsetMixin, EagerLoadingMixin, serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source='author.username')
     author_detail = UserSerializer(source='author', read_only=True)
     category_detail = CategorySerializer(source='category', read_only=True)
     tags_detail = TagSerializer(source='tags', many=True, read_only=True)
-    like_count = serializers.ReadOnlyField()
-    comments = CommentSerializer(many=True, read_only=True)
+    comments = serializers.SerializerMethodField()
     tags = serializers.PrimaryKeyRelatedField(queryset=Tag.objects.all(), many=True, required=False)
     tag_names = serializers.CharField(write_only=True, required=False, allow_blank=True)
     
@@ -53,39 +194,37 @@ class PostSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'slug', 'content', 'excerpt', 'featured_image', 
                  'author', 'author_detail', 'category', 'category_detail', 
                  'tags', 'tags_detail', 'tag_names', 'published_date', 'updated_date', 
-                 'created_date', 'status', 'read_time', 'views', 'like_count', 'comments']
-        read_only_fields = ['slug', 'read_time', 'views', 'like_count']
+                 'created_date', 'status', 'read_time', 'word_count', 'views', 'like_count', 'comment_count',
+                 'comments']
+        read_only_fields = ['slug', 'read_time', 'word_count', 'views', 'like_count', 'comment_count']
+        list_serializer_class = PostListSerializer
+
+    def get_comments(self, obj):
+        if not hasattr(obj, 'comment_tree'):
+            load_post_comment_trees([obj], **comment_tree_options(self.context.get('request')))
+        return CommentSerializer(obj.comment_tree, many=True, context=self.context).data
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Present when the post was found through the search index.
+        if hasattr(instance, 'search_rank'):
+            data['search_rank'] = instance.search_rank
+            data['search_snippet'] = getattr(instance, 'search_snippet', None)
+        return data
         
     def create(self, validated_data):
         try:
-            print(f"Validated data: {validated_data}")
-
             tag_names = validated_data.pop('tag_names', '')
             tags_data = validated_data.pop('tags', [])
 
             if 'category' in validated_data and validated_data['category'] is None:
                 validated_data.pop('category')
-                print("Category was None and removed from validated data.")
 
             post = Post.objects.create(**validated_data)
-
-            for tag in tags_data:
-                post.tags.add(tag)
-                print(f"Added tag with ID: {tag.id}")
-
-            if tag_names:
-                tag_list = [name.strip() for name in tag_names.split(',') if name.strip()]
-                for tag_name in tag_list:
-                    tag, created = Tag.objects.get_or_create(
-                        name=tag_name,
-                        defaults={'slug': slugify(tag_name)}
-                    )
-                    post.tags.add(tag)
-                    print(f"Added tag with name: {tag_name}")
-            
+            set_post_tags(post, self._tag_ids(tags_data, tag_names), existing=())
             return post
-        except Exception as e:
-            print(f"Error in PostSerializer.create: {str(e)}")
+        except Exception:
+            logger.exception("Error in PostSerializer.create")
             raise
         
     def update(self, instance, validated_data):
@@ -95,22 +234,30 @@ class PostSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
-        if tags_data is not None:
-            instance.tags.clear()
-            for tag in tags_data:
-                instance.tags.add(tag)
-
-        if tag_names:
-            if tags_data is None:
-                instance.tags.clear()
-                
-            tag_list = [name.strip() for name in tag_names.split(',') if name.strip()]
-            for tag_name in tag_list:
-                tag, created = Tag.objects.get_or_create(
-                    name=tag_name,
-                    defaults={'slug': slugify(tag_name)}
-                )
-                instance.tags.add(tag)
+        # tag_names on its own replaces the tags; with tags it adds to them.
+        if tags_data is not None or tag_names:
+            set_post_tags(instance, self._tag_ids(tags_data or [], tag_names))
                 
         instance.save()
         return instance
+
+    @staticmethod
+    def _tag_ids(tags, tag_names):
+        ids = [tag.pk for tag in tags]
+        names = parse_tag_names(tag_names) if tag_names else []
+        ids.extend(resolve_tags(names).values())
+        return ids
+
+class PostSummarySerializer(PostSerializer):
+    """Feed representation of a post: no body or comments unless expanded."""
+
+    class Meta(PostSerializer.Meta):
+        expandable_fields = ['content', 'author_detail', 'created_date', 'comments']
+
+class AuthorStatsSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    author = serializers.ReadOnlyField(source='author.username')
+
+    class Meta:
+        model = AuthorStats
+        fields = ['author', 'post_count', 'published_count', 'draft_count', 'view_count',
+                  'like_count', 'comment_count']
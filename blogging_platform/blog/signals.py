@@ -0,0 +1,148 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import counters, related, search
+from .autocomplete import tag_index
+from .cache import response_cache
+from .models import Category, Comment, Post, Tag
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_posts([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    search.remove_posts([instance.pk])
+
+
+def relate_posts(post_ids):
+    post_ids = sorted(post_ids)
+    key = f'related:{post_ids[0]}' if len(post_ids) == 1 else None
+    related.update_related_posts.enqueue(post_ids, key=key)
+
+
+# Registered before count_saved_post, which resets _loaded_status.
+@receiver(post_save, sender=Post)
+def relate_saved_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        changed = instance.status == 'published' and instance.category_id is not None
+    else:
+        loaded = (instance.__dict__.get('_loaded_status'), instance.__dict__.get('_loaded_category_id'))
+        changed = loaded[0] is not None and loaded != (instance.status, instance.category_id)
+    if changed:
+        relate_posts([instance.pk])
+    instance._loaded_category_id = instance.category_id
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    loaded = (instance.__dict__.get('_loaded_status'), instance.__dict__.get('_loaded_author_id'))
+    if created:
+        counters.adjust_author_stats(instance.author_id, [instance])
+    elif loaded[0] is not None and loaded != (instance.status, instance.author_id):
+        # Moved to another status or author: take it out under its old values.
+        previous = Post(status=loaded[0], views=instance.views, like_count=instance.like_count,
+                        comment_count=instance.comment_count)
+        counters.adjust_author_stats(loaded[1], [previous], sign=-1)
+        counters.adjust_author_stats(instance.author_id, [instance])
+    instance._loaded_status, instance._loaded_author_id = instance.status, instance.author_id
+
+
+@receiver(post_delete, sender=Post)
+def uncount_deleted_post(sender, instance, **kwargs):
+    counters.adjust_author_stats(instance.author_id, [instance], sign=-1)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def reindex_retagged_posts(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # clear() doesn't report which posts lost the tag, so note them first.
+        instance._cleared_post_ids = list(instance.posts.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        post_ids = [instance.pk]
+    elif action == 'post_clear':
+        post_ids = instance.__dict__.pop('_cleared_post_ids', [])
+    else:
+        post_ids = pk_set or []
+    if post_ids:
+        search.index_posts(post_ids)
+        relate_posts(post_ids)
+
+
+# The tag index changes once the write commits: a rolled back write must not
+# change it, nor let other processes reload it before the rows are visible.
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def count_tag_uses(sender, instance, action, reverse, pk_set, using=None, **kwargs):
+    if action == 'post_clear':
+        transaction.on_commit(tag_index.invalidate, using=using)
+    elif action in ('post_add', 'post_remove') and pk_set:
+        change = 1 if action == 'post_add' else -1
+        if reverse:
+            counts = {instance.pk: change * len(pk_set)}
+        else:
+            counts = dict.fromkeys(pk_set, change)
+        transaction.on_commit(partial(tag_index.adjust, counts), using=using)
+
+
+@receiver(post_save, sender=Tag)
+def index_saved_tag(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        # A copy: the instance may change again, or be deleted, before the commit.
+        saved = Tag(pk=instance.pk, name=instance.name, slug=instance.slug)
+        transaction.on_commit(partial(tag_index.tag_saved, saved), using=using)
+
+
+@receiver(post_delete, sender=Tag)
+def unindex_deleted_tag(sender, instance, using=None, **kwargs):
+    transaction.on_commit(partial(tag_index.tag_deleted, instance.pk), using=using)
+
+
+@receiver(post_delete, sender=Post)
+def recount_tags_of_deleted_post(sender, instance, using=None, **kwargs):
+    # Its tag links went without an m2m signal.
+    transaction.on_commit(tag_index.invalidate, using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+def reindex_posts_of_renamed_taxonomy(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    # Renaming a category or tag touches every post in it: leave that to the worker.
+    relation = 'category' if sender is Category else 'tags'
+    search.index_posts_of.enqueue(relation, instance.pk, key=f'search:{relation}:{instance.pk}')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Comment)
+def invalidate_cached_responses(sender, using=None, **kwargs):
+    # After commit: a reader between the bump and the commit would cache the
+    # old rows under the new generation.
+    transaction.on_commit(partial(response_cache.invalidate, sender), using=using)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+@receiver(m2m_changed, sender=Post.likes.through)
+def invalidate_cached_post_responses(sender, action, using=None, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(partial(response_cache.invalidate, Post), using=using)
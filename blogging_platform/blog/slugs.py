@@ -0,0 +1,160 @@
+"""
+Unique slug allocation.
+
+Slugs are unique per table. A base that is already taken gets the next free
+numeric suffix (``python``, ``python-2``, ``python-3``...), found with one
+indexed range query over ``<base>-*`` rather than by probing candidates one
+``exists()`` at a time.
+
+Another writer can take the chosen slug between that query and the insert.
+``save_with_unique_slug`` therefore inserts in a savepoint and, when the
+unique constraint rejects the slug, allocates again. Each retry jumps a
+random distance past the highest suffix, so writers racing for the same base
+spread out instead of colliding on the same next number again.
+
+A base too long to take a suffix within the field's ``max_length`` is
+numbered from a shorter stem, the same for every number (``<stem>-2``,
+``<stem>-3``...), so the lookups above find the numbered slugs it gets.
+"""
+import random
+import re
+from collections import Counter
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Length
+from django.utils.text import slugify
+
+# Bases per range query when looking for used slug suffixes.
+SLUG_QUERY_BATCH = 200
+
+# Inserts attempted before a slug collision is raised to the caller.
+SAVE_ATTEMPTS = 8
+
+# Characters kept for "-N" after the stem of a base near the length limit.
+SUFFIX_WIDTH = 7
+
+
+def _max_length(model, field):
+    return model._meta.get_field(field).max_length
+
+
+def _base(model, field, base):
+    return (base or model._meta.model_name)[:_max_length(model, field)]
+
+
+def _suffix_range(field, base):
+    # A range rather than startswith: SQLite's LIKE can't use the index.
+    return Q(**{f'{field}__gte': f'{base}-', f'{field}__lt': f'{base}.'})
+
+
+def _suffix_number(slug, base):
+    prefix, _, number = slug.rpartition('-')
+    return int(number) if prefix == base and number.isdigit() else None
+
+
+def _stem(base, max_length):
+    """The part of ``base`` its numbered slugs start with."""
+    return base[:max_length - SUFFIX_WIDTH]
+
+
+def _with_suffix(stem, number):
+    return f'{stem}-{number}'
+
+
+def _suffixed_slugs(model, field, bases):
+    """Slugs of the form ``<base>-<anything>`` for each base, with few indexed queries."""
+    found = []
+    bases = sorted(bases)
+    for start in range(0, len(bases), SLUG_QUERY_BATCH):
+        condition = Q()
+        for base in bases[start:start + SLUG_QUERY_BATCH]:
+            condition |= _suffix_range(field, base)
+        found.extend(model._default_manager.filter(condition).values_list(field, flat=True))
+    return found
+
+
+def allocate_slugs(model, bases, field='slug', reserved=()):
+    """
+    Return a unique, unused slug for each base in ``bases`` (in order),
+    appending ``-2``, ``-3``... to bases already taken in the table, in
+    ``reserved`` or earlier in the list. Costs one ``IN`` query, plus one
+    range query per batch of taken bases.
+    """
+    max_length = _max_length(model, field)
+    bases = [_base(model, field, base) for base in bases]
+    if not bases:
+        return []
+    taken = set(model._default_manager.filter(**{f'{field}__in': set(bases)}).values_list(field, flat=True))
+    taken.update(reserved)
+
+    counts = Counter(bases)
+    collided = {base for base, count in counts.items() if count > 1 or base in taken}
+    next_suffix = {_stem(base, max_length): 2 for base in collided}
+    for slug in _suffixed_slugs(model, field, next_suffix):
+        stem, _, number = slug.rpartition('-')
+        if stem in next_suffix and number.isdigit():
+            next_suffix[stem] = max(next_suffix[stem], int(number) + 1)
+        taken.add(slug)
+
+    slugs = []
+    for base in bases:
+        if base not in taken:
+            taken.add(base)
+            slugs.append(base)
+            continue
+        stem = _stem(base, max_length)
+        while True:
+            slug = _with_suffix(stem, next_suffix[stem])
+            next_suffix[stem] += 1
+            if slug not in taken:
+                break
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def next_slug(model, base, field='slug', exclude_pk=None, spread=0):
+    """
+    A free slug for ``base``: the base itself, or the next number after the
+    highest ``stem-N`` in use. One query, which reads a single row: numbered
+    slugs sort before the base, and numeric suffixes by length, then value.
+    ``spread`` skips a random number of suffixes, up to that many, past the
+    highest.
+    """
+    base = _base(model, field, base)
+    stem = _stem(base, _max_length(model, field))
+    numbered = _suffix_range(field, stem) & Q(**{f'{field}__regex': rf'^{re.escape(stem)}-[0-9]+$'})
+    queryset = model._default_manager.filter(Q(**{field: base}) | numbered)
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    is_base = Case(When(**{field: base}, then=Value(1)), default=Value(0), output_field=IntegerField())
+    highest = (queryset.order_by(is_base, Length(field).desc(), f'-{field}')
+               .values_list(field, flat=True).first())
+    if highest is None:
+        return base
+    number = (_suffix_number(highest, stem) if highest != base else None) or 1
+    return _with_suffix(stem, number + 1 + random.randint(0, spread))
+
+
+def save_with_unique_slug(instance, source, save, field='slug'):
+    """
+    Fill an empty ``field`` with a unique slug of ``source``, then call
+    ``save()``, retrying with a new slug if a concurrent insert took it.
+    """
+    if getattr(instance, field):
+        return save()
+    model = type(instance)
+    base = slugify(source)
+    using = router.db_for_write(model, instance=instance)
+    for attempt in range(SAVE_ATTEMPTS):
+        slug = next_slug(model, base, field, exclude_pk=instance.pk, spread=2 ** attempt - 1)
+        setattr(instance, field, slug)
+        try:
+            with transaction.atomic(using=using):
+                return save()
+        except IntegrityError:
+            setattr(instance, field, '')
+            lost_race = model._default_manager.using(using).filter(**{field: slug}).exists()
+            if not lost_race or attempt + 1 == SAVE_ATTEMPTS:
+                raise
@@ -0,0 +1,76 @@
+"""
+Resolving tag names and setting a post's tags with a fixed number of queries.
+
+``resolve_tags`` looks all names up in one ``IN`` query and bulk-creates the
+missing tags; ``bulk_create`` sends no ``post_save``, so it invalidates the
+cached tag responses itself. ``set_post_tags`` writes only the difference between a post's
+current and wanted tags: one ``DELETE`` for the removed links and one
+``INSERT`` for the added ones. Both write the through table directly, so
+``set_post_tags`` sends the ``m2m_changed`` signals ``add``/``remove`` would,
+keeping the search index and the response cache in step (see blog.signals).
+"""
+from django.db import router, transaction
+from django.db.models.signals import m2m_changed
+from django.utils.text import slugify
+
+from .cache import response_cache
+from .models import Post, Tag
+from .slugs import allocate_slugs
+
+
+def parse_tag_names(value):
+    """Tag names from a comma-separated string or a list, stripped and deduplicated."""
+    if isinstance(value, str):
+        value = value.split(',')
+    return list(dict.fromkeys(name.strip() for name in value if name.strip()))
+
+
+def resolve_tags(names):
+    """Return ``{name: tag id}`` for ``names``, creating the missing tags."""
+    names = set(names)
+    if not names:
+        return {}
+    ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'pk'))
+    missing = sorted(names - set(ids))
+    if missing:
+        slugs = allocate_slugs(Tag, [slugify(name) for name in missing])
+        created = Tag.objects.bulk_create([Tag(name=name, slug=slug) for name, slug in zip(missing, slugs)])
+        ids.update((tag.name, tag.pk) for tag in created)
+        response_cache.invalidate(Tag)
+    return ids
+
+
+def set_post_tags(post, tag_ids, existing=None):
+    """
+    Make ``tag_ids`` the post's tags. ``existing`` is the post's current tag
+    ids when the caller knows them (e.g. ``()`` for a post just created),
+    which saves reading them.
+    """
+    through = Post.tags.through
+    wanted = set(tag_ids)
+    if existing is None:
+        existing = through.objects.filter(post_id=post.pk).values_list('tag_id', flat=True)
+    existing = set(existing)
+    removed, added = existing - wanted, wanted - existing
+    if not removed and not added:
+        return
+
+    using = router.db_for_write(through, instance=post)
+    with transaction.atomic(using=using):
+        for action, pk_set in (('remove', removed), ('add', added)):
+            if not pk_set:
+                continue
+            signal_kwargs = {
+                'sender': through, 'instance': post, 'reverse': False,
+                'model': Tag, 'pk_set': pk_set, 'using': using,
+            }
+            m2m_changed.send(action=f'pre_{action}', **signal_kwargs)
+            if action == 'remove':
+                through.objects.using(using).filter(post_id=post.pk, tag_id__in=pk_set).delete()
+            else:
+                through.objects.using(using).bulk_create(
+                    [through(post_id=post.pk, tag_id=tag_id) for tag_id in sorted(pk_set)]
+                )
+            m2m_changed.send(action=f'post_{action}', **signal_kwargs)
+    # Drop tags prefetched before the change.
+    getattr(post, '_prefetched_objects_cache', {}).pop('tags', None)
@@ -0,0 +1,218 @@
+"""
+A task queue kept in the database, for work that doesn't have to happen
+inside the request that causes it.
+
+``@task`` registers a function and ``fn.enqueue(*args, key=..., delay=...)``
+stores a call of it in ``blog_task``. The row is written in the caller's
+transaction, so a task exists only if the change that asked for it commits.
+``manage.py run_worker`` claims due tasks, runs them and deletes them when
+they succeed.
+
+- Retries: a task that raises runs again after ``RETRY_DELAY`` seconds,
+  doubling each time, until it has been tried ``max_attempts`` times. It is
+  then kept with status ``failed`` and its traceback.
+- Idempotency keys: at most one queued task exists per key, and enqueueing a
+  key that is already queued does nothing, so repeated requests for the same
+  work (e.g. reindexing one post) collapse into one run. Once a task starts,
+  its key is free again: the work it reads may have changed since.
+- A task's database writes commit together with the deletion of its row, so
+  a task that fails, or whose worker dies, leaves no partial writes behind.
+  Tasks claimed longer than ``LEASE`` seconds ago are taken to have lost
+  their worker and are retried.
+
+Arguments must be JSON-serializable. With ``EAGER`` set, ``enqueue`` runs the
+task immediately instead, for development without a worker.
+"""
+import functools
+import logging
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task_options():
+    config = getattr(settings, 'BLOG_TASKS', {})
+    return {
+        'eager': config.get('EAGER', False),
+        'max_attempts': config.get('MAX_ATTEMPTS', 5),
+        'retry_delay': config.get('RETRY_DELAY', 10),
+        'lease': config.get('LEASE', 300),
+        'poll_interval': config.get('POLL_INTERVAL', 1),
+    }
+
+
+class TaskFunction:
+    """A function registered with ``@task``. Calling it runs it directly."""
+
+    def __init__(self, func, name, max_attempts=None):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, key=None, delay=0, **kwargs):
+        """Queue a call with these arguments, to run ``delay`` seconds from now or later."""
+        if task_options()['eager']:
+            try:
+                self.func(*args, **kwargs)
+            except Exception:
+                logger.exception("Task %s failed", self.name)
+            return
+        enqueue(self.name, args, kwargs, key=key, delay=delay, max_attempts=self.max_attempts)
+
+
+def task(func=None, *, name=None, max_attempts=None):
+    """Register ``func`` as a task, under its dotted path unless ``name`` is given."""
+    if func is None:
+        return functools.partial(task, name=name, max_attempts=max_attempts)
+    name = name or f'{func.__module__}.{func.__qualname__}'
+    _registry[name] = TaskFunction(func, name, max_attempts)
+    return _registry[name]
+
+
+def get_task(name):
+    # Tasks register on import; the worker may not have imported the module yet.
+    if name not in _registry:
+        import_string(name)
+    return _registry[name]
+
+
+def enqueue(name, args=(), kwargs=None, key=None, delay=0, max_attempts=None):
+    from .models import Task
+
+    # An insert that a queued task with the same key turns into a no-op.
+    Task.objects.bulk_create([Task(
+        name=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        key=key,
+        max_attempts=max_attempts or task_options()['max_attempts'],
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )], ignore_conflicts=True)
+
+
+class LeaseExpired(Exception):
+    pass
+
+
+class Worker:
+    """
+    Claims due tasks in batches and runs them one at a time. Several workers
+    can share a queue: each claims tasks with a token of its own, and a task
+    is run by the worker whose claim took effect.
+    """
+
+    def __init__(self, batch_size=10, lease=None, retry_delay=None, poll_interval=None):
+        options = task_options()
+        self.batch_size = batch_size
+        self.lease = options['lease'] if lease is None else lease
+        self.retry_delay = options['retry_delay'] if retry_delay is None else retry_delay
+        self.poll_interval = options['poll_interval'] if poll_interval is None else poll_interval
+        self.stopping = False
+        self.completed = 0
+        self.failed = 0
+
+    def claim(self):
+        from .models import Task
+
+        now = timezone.now()
+        due = list(
+            Task.objects.filter(status=Task.QUEUED, run_after__lte=now)
+            .order_by('run_after', 'pk').values_list('pk', flat=True)[:self.batch_size]
+        )
+        if not due:
+            return []
+        token = uuid.uuid4().hex
+        Task.objects.filter(pk__in=due, status=Task.QUEUED).update(
+            status=Task.RUNNING, claimed_by=token, claimed_at=now, attempts=F('attempts') + 1,
+        )
+        return list(Task.objects.filter(pk__in=due, claimed_by=token).order_by('run_after', 'pk'))
+
+    def execute(self, task):
+        """Run a claimed task and return whether it succeeded."""
+        from .models import Task
+
+        try:
+            function = get_task(task.name)
+            with transaction.atomic():
+                function(*task.args, **task.kwargs)
+                if not Task.objects.filter(pk=task.pk, claimed_by=task.claimed_by).delete()[0]:
+                    raise LeaseExpired
+        except LeaseExpired:
+            # Another worker has retried it meanwhile; its run counts.
+            logger.warning("Task %s (%s) outlived its lease; its writes were rolled back", task.pk, task.name)
+            return False
+        except Exception:
+            logger.exception("Task %s (%s) failed on attempt %d", task.pk, task.name, task.attempts)
+            self.release(task, traceback.format_exc())
+            self.failed += 1
+            return False
+        self.completed += 1
+        return True
+
+    def release(self, task, error):
+        """Schedule a retry of a claimed task, or mark it failed when out of attempts."""
+        from .models import Task
+
+        if task.attempts >= task.max_attempts:
+            changes = {'status': Task.FAILED}
+        else:
+            delay = self.retry_delay * 2 ** (task.attempts - 1)
+            changes = {'status': Task.QUEUED, 'run_after': timezone.now() + timedelta(seconds=delay)}
+        claimed = Task.objects.filter(pk=task.pk, claimed_by=task.claimed_by)
+        try:
+            with transaction.atomic():
+                claimed.update(last_error=error, claimed_by='', claimed_at=None, **changes)
+        except IntegrityError:
+            # A newer call with the same key is queued and will do the work.
+            claimed.delete()
+
+    def requeue_expired(self):
+        from .models import Task
+
+        cutoff = timezone.now() - timedelta(seconds=self.lease)
+        expired = list(Task.objects.filter(status=Task.RUNNING, claimed_at__lt=cutoff))
+        for task in expired:
+            logger.warning("Task %s (%s) lost its worker; retrying", task.pk, task.name)
+            self.release(task, f"Worker lease of {self.lease}s expired")
+        return len(expired)
+
+    def run_pending(self):
+        """Run tasks until none is due and return how many ran."""
+        ran = 0
+        while not self.stopping:
+            tasks = self.claim()
+            if not tasks:
+                break
+            for task in tasks:
+                self.execute(task)
+            ran += len(tasks)
+        return ran
+
+    def run(self):
+        """Run tasks as they fall due until ``stop()`` is called."""
+        last_requeue = None
+        while not self.stopping:
+            if last_requeue is None or time.monotonic() - last_requeue >= self.lease:
+                self.requeue_expired()
+                last_requeue = time.monotonic()
+            if not self.run_pending():
+                time.sleep(self.poll_interval)
+            close_old_connections()
+
+    def stop(self):
+        self.stopping = True
@@ -0,0 +1,115 @@
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import AsyncClient, override_settings
+from rest_framework.test import APITestCase
+
+from accounts.tokens import token_store
+
+from .counters import view_counter
+from .models import Category, Comment, Post, Tag
+from .views import CommentViewSet, PostViewSet
+
+
+@override_settings(ROOT_URLCONF='blogging_platform.urls_asgi')
+class AsyncReadTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(view_counter.flush)
+        self.async_client = AsyncClient()
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.category = Category.objects.create(name='Async')
+        self.tag = Tag.objects.create(name='asgi')
+        self.post = Post.objects.create(title='Async post', content='Body', author=self.author,
+                                        category=self.category, status='published')
+        self.post.tags.add(self.tag)
+        self.comment = Comment.objects.create(post=self.post, author=self.author, content='Top')
+        Comment.objects.create(post=self.post, author=self.author, content='Reply', parent=self.comment)
+        cache.clear()
+
+    async def sync_json(self, url, **params):
+        return await sync_to_async(self.get_sync_json)(url, params)
+
+    def get_sync_json(self, url, params):
+        with override_settings(ROOT_URLCONF='blogging_platform.urls'):
+            response = self.client.get(url, params)
+        cache.clear()
+        return response.json()
+
+    async def test_reads_match_the_sync_views(self):
+        urls = [
+            '/api/posts/',
+            '/api/categories/',
+            f'/api/categories/{self.category.slug}/',
+            '/api/tags/',
+            f'/api/tags/{self.tag.slug}/',
+            '/api/comments/',
+            f'/api/comments/{self.comment.pk}/',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                expected = await self.sync_json(url)
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), expected)
+
+        expected = await self.sync_json('/api/posts/', fields='title,comments', author=self.author.pk)
+        response = await self.async_client.get('/api/posts/', {'fields': 'title,comments', 'author': self.author.pk})
+        self.assertEqual(response.json(), expected)
+        self.assertEqual(response.json()['results'][0]['comments'][0]['replies'][0]['content'], 'Reply')
+
+    async def test_reads_do_not_use_the_sync_actions(self):
+        with mock.patch.object(PostViewSet, 'list', side_effect=AssertionError), \
+                mock.patch.object(PostViewSet, 'retrieve', side_effect=AssertionError), \
+                mock.patch.object(CommentViewSet, 'list', side_effect=AssertionError):
+            self.assertEqual((await self.async_client.get('/api/posts/')).status_code, 200)
+            self.assertEqual((await self.async_client.get(f'/api/posts/{self.post.slug}/')).status_code, 200)
+            self.assertEqual((await self.async_client.get('/api/comments/')).status_code, 200)
+
+    async def test_detail_counts_views_and_revalidates(self):
+        first = await self.async_client.get(f'/api/posts/{self.post.slug}/')
+        self.assertEqual(first.json()['views'], 1)
+        self.assertEqual(first.json()['comments'][0]['replies'][0]['content'], 'Reply')
+
+        second = await self.async_client.get(f'/api/posts/{self.post.slug}/', headers={'If-None-Match': first['ETag']})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(view_counter.pending(self.post.pk), 2)
+
+        missing = await self.async_client.get('/api/posts/no-such-post/')
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_list_shares_the_response_cache(self):
+        await self.async_client.get('/api/posts/')
+        response = await self.async_client.get('/api/posts/')
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    async def test_token_authenticated_reads(self):
+        key = await sync_to_async(token_store.issue)(self.author)
+
+        response = await self.async_client.get('/api/posts/', headers={'Authorization': f'Token {key}'})
+        self.assertEqual(response.status_code, 200)
+
+        # As on the sync path, a stale token doesn't block reads.
+        response = await self.async_client.get('/api/posts/', headers={'Authorization': 'Token not-a-token'})
+        self.assertEqual(response.status_code, 200)
+
+    async def test_other_requests_go_to_the_sync_views(self):
+        # Extra actions aren't captured by the detail route.
+        response = await self.async_client.get('/api/posts/drafts/')
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.get('/api/posts/', {'page': 1})
+        self.assertEqual(response.json()['count'], 1)
+
+        response = await self.async_client.get('/api/posts/', headers={'Accept': 'text/html'})
+        self.assertIn('text/html', response['Content-Type'])
+
+        await self.async_client.aforce_login(self.author)
+        response = await self.async_client.post('/api/comments/', json.dumps({'post': self.post.pk, 'content': 'New'}),
+                                                content_type='application/json')
+        self.assertEqual(response.status_code, 201)
@@ -0,0 +1,118 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from .bulk import import_posts
+from .counters import AUTHOR_STAT_FIELDS, apply_view_counts, recount_author_stats
+from .models import AuthorStats, Post
+
+
+class AuthorStatsTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.reader = User.objects.create_user(username='reader', password='password123')
+
+    def create_post(self, status='published', **kwargs):
+        return Post.objects.create(title='Post', content='Body', author=self.author, status=status, **kwargs)
+
+    def stats(self):
+        row = AuthorStats.objects.filter(pk=self.author.pk).values(*AUTHOR_STAT_FIELDS).first()
+        return row and dict(row)
+
+    def assertMatchesRecount(self):
+        maintained = self.stats()
+        recount_author_stats([self.author.pk])
+        self.assertEqual(maintained, self.stats())
+
+    def test_dashboard_is_built_on_first_read_then_one_row(self):
+        self.create_post(views=10)
+        self.create_post(status='draft')
+        self.client.force_authenticate(self.author)
+
+        response = self.client.get('/api/posts/dashboard/')
+
+        self.assertEqual(response.data, {
+            'author': 'author', 'post_count': 2, 'published_count': 1, 'draft_count': 1,
+            'view_count': 10, 'like_count': 0, 'comment_count': 0,
+        })
+        with self.assertNumQueries(1):
+            self.client.get('/api/posts/dashboard/')
+
+    def test_events_update_the_totals_incrementally(self):
+        self.client.force_authenticate(self.author)
+        self.client.get('/api/posts/dashboard/')
+        post = self.create_post(status='draft')
+
+        post = Post.objects.get(pk=post.pk)
+        post.status = 'published'
+        post.save()
+        self.assertEqual((self.stats()['published_count'], self.stats()['draft_count']), (1, 0))
+
+        self.client.force_authenticate(self.reader)
+        self.client.post(f'/api/posts/{post.slug}/like/')
+        comment = self.client.post('/api/comments/', {'post': post.pk, 'content': 'Top'}).data
+        self.client.post(f"/api/comments/{comment['id']}/reply/", {'content': 'Reply'})
+        self.client.post('/api/comments/', {'post': post.pk, 'content': 'Another'})
+        apply_view_counts({str(post.pk): 7})
+        self.assertEqual(self.stats()['comment_count'], 3)
+        self.assertMatchesRecount()
+
+        # Deleting a comment takes its replies with it.
+        self.client.delete(f"/api/comments/{comment['id']}/")
+        self.assertEqual(self.stats()['comment_count'], 1)
+        self.assertMatchesRecount()
+
+        Post.objects.get(pk=post.pk).delete()
+        self.assertEqual(self.stats(), dict.fromkeys(AUTHOR_STAT_FIELDS, 0))
+
+    def test_moving_a_post_to_another_author(self):
+        post = self.create_post(views=5)
+        recount_author_stats([self.author.pk, self.reader.pk])
+
+        post = Post.objects.get(pk=post.pk)
+        post.author = self.reader
+        post.save()
+
+        self.assertEqual(self.stats()['view_count'], 0)
+        self.assertEqual(AuthorStats.objects.get(pk=self.reader.pk).view_count, 5)
+
+    def test_drafts_take_their_count_from_the_stats(self):
+        for _ in range(3):
+            self.create_post(status='draft')
+        self.create_post()
+        self.client.force_authenticate(self.author)
+        self.client.get('/api/posts/dashboard/')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/posts/drafts/', {'page_size': 2})
+
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql']])
+
+    def test_bulk_import_counts_new_posts(self):
+        recount_author_stats([self.author.pk])
+
+        import_posts([{'title': 'One', 'content': 'Body', 'status': 'published'},
+                      {'title': 'Two', 'content': 'Body'}], author=self.author)
+
+        self.assertEqual((self.stats()['post_count'], self.stats()['published_count']), (2, 1))
+
+    def test_recount_command_rebuilds_the_totals(self):
+        self.create_post()
+        recount_author_stats()
+        Post.objects.all().delete()
+        AuthorStats.objects.filter(pk=self.author.pk).update(post_count=9)
+        out = StringIO()
+
+        call_command('recount_post_counters', stdout=out)
+
+        self.assertEqual(self.stats()['post_count'], 0)
+        self.assertIn('totals of 0 authors', out.getvalue())
@@ -0,0 +1,120 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.test import APITestCase
+
+from .autocomplete import INDEX_GENERATION, TagIndex, tag_index
+from .bulk import import_posts
+from .cache import response_cache
+from .models import Post, Tag
+from .tags import resolve_tags, set_post_tags
+
+
+class TagAutocompleteTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        tag_index.invalidate()
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.tags = {name: Tag.objects.create(name=name) for name in ('Django', 'django-orm', 'docker', 'python')}
+        for uses, name in enumerate(['docker', 'Django', 'django-orm']):
+            for _ in range(uses + 1):
+                self.create_post(name)
+
+    def create_post(self, *tags):
+        post = Post.objects.create(title='Post', content='Body', author=self.author, status='published')
+        post.tags.add(*(self.tags[name] for name in tags))
+        return post
+
+    def complete(self, q, **params):
+        response = self.client.get('/api/tags/autocomplete/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(tag['name'], tag['post_count']) for tag in response.data]
+
+    def test_completions_are_ranked_by_use(self):
+        self.assertEqual(self.complete('d'), [('django-orm', 3), ('Django', 2), ('docker', 1)])
+        self.assertEqual(self.complete('DJ'), [('django-orm', 3), ('Django', 2)])
+        self.assertEqual(self.complete('d', limit=1), [('django-orm', 3)])
+        self.assertEqual(self.complete(''), [('django-orm', 3), ('Django', 2), ('docker', 1), ('python', 0)])
+        self.assertEqual(self.complete('x'), [])
+
+        with self.assertNumQueries(0):
+            self.complete('djan')
+
+    def test_signals_keep_the_index_current(self):
+        self.complete('d')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post = self.create_post('docker', 'python')
+            post.tags.add(self.tags['Django'])
+            for _ in range(3):
+                self.tags['docker'].posts.add(self.create_post())
+        self.assertEqual(self.complete('do'), [('docker', 5)])
+
+        self.tags['python'].name = 'Docs'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tags['python'].save()
+        self.assertEqual(self.complete('do'), [('docker', 5), ('Docs', 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.tags.remove(self.tags['python'])
+            self.tags['docker'].delete()
+        self.assertEqual(self.complete('do'), [('Docs', 0)])
+
+        # Tags created in bulk, without signals.
+        with self.captureOnCommitCallbacks(execute=True):
+            set_post_tags(post, resolve_tags(['dotnet']).values())
+        self.assertEqual(self.complete('do'), [('dotnet', 1), ('Docs', 0)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        self.assertEqual(self.complete('do'), [('Docs', 0), ('dotnet', 0)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_posts([{'title': 'Imported', 'content': 'Body', 'tags': ['dotnet', 'dojo']}], author=self.author)
+        self.assertEqual(self.complete('do'), [('dojo', 1), ('dotnet', 1), ('Docs', 0)])
+
+    def test_rolled_back_writes_leave_the_index_alone(self):
+        self.complete('d')
+        generation = response_cache.generations([INDEX_GENERATION])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.create_post('docker')
+                Tag.objects.create(name='dotnet')
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+
+        self.assertEqual(response_cache.generations([INDEX_GENERATION]), generation)
+        self.assertEqual(self.complete('do'), [('docker', 1)])
+
+    def test_memoized_lists_follow_rank_changes(self):
+        with mock.patch.object(tag_index, 'max_results', 2):
+            tag_index.invalidate()
+            self.assertEqual(self.complete('d'), [('django-orm', 3), ('Django', 2)])
+
+            # Falling out of a full list: the next best isn't known, so it is recomputed.
+            with self.captureOnCommitCallbacks(execute=True):
+                for post in Post.objects.filter(tags=self.tags['django-orm'])[:2]:
+                    post.tags.remove(self.tags['django-orm'])
+            self.assertEqual(self.complete('d'), [('Django', 2), ('django-orm', 1)])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                for _ in range(3):
+                    self.create_post('docker')
+            self.assertEqual(self.complete('d'), [('docker', 4), ('Django', 2)])
+            self.assertEqual(self.complete('do'), [('docker', 4)])
+
+    def test_other_processes_reload_when_the_index_changes(self):
+        other = TagIndex(refresh_interval=0)
+        self.assertEqual(other.complete('py'), [{'id': self.tags['python'].pk, 'name': 'python',
+                                                 'slug': 'python', 'post_count': 0}])
+
+        # A change made in this process replaces the shared generation.
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='pytest')
+        self.assertNotEqual(response_cache.generations([INDEX_GENERATION])[0], other._generation)
+
+        self.assertEqual([tag['name'] for tag in other.complete('py')], ['pytest', 'python'])
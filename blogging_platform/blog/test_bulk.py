@@ -0,0 +1,229 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from rest_framework.test import APITestCase
+
+from . import bulk
+from .bulk import allocate_slugs, import_posts
+from .cache import response_cache
+from .models import Category, Post, Tag
+
+
+def ndjson(*rows):
+    return ''.join(json.dumps(row) + '\n' for row in rows)
+
+
+class BulkImportTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='writer', password='password123')
+
+    def post_bulk(self, body, content_type='application/x-ndjson'):
+        self.client.force_authenticate(self.author)
+        return self.client.generic('POST', '/api/posts/bulk/', body, content_type=content_type)
+
+    def test_imports_posts_tags_and_categories(self):
+        Tag.objects.create(name='django')
+        response = self.post_bulk(ndjson(
+            {'title': 'First post', 'content': 'word ' * 400, 'tags': ['django', 'orm'], 'category': 'News'},
+            {'title': 'Second post', 'content': 'Body', 'tags': 'orm, sql', 'status': 'published'},
+        ))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'created': 2, 'failed': 0, 'errors': []})
+        first = Post.objects.get(slug='first-post')
+        self.assertEqual(first.author, self.author)
+        self.assertEqual(first.category.name, 'News')
+        self.assertEqual(first.read_time, 2)
+        self.assertEqual(sorted(first.tags.values_list('name', flat=True)), ['django', 'orm'])
+        self.assertEqual(Tag.objects.count(), 3)
+        self.assertEqual(Post.objects.get(slug='second-post').status, 'published')
+
+    def test_query_count_does_not_grow_with_rows(self):
+        rows = [{'title': f'Post {n}', 'content': 'Body', 'tags': [f'tag{n}'], 'category': 'News'}
+                for n in range(50)]
+        with self.assertNumQueries(15):  # includes one UPDATE of the author's stats
+            report = import_posts(rows, author=self.author)
+
+        self.assertEqual(report.created, 50)
+        self.assertEqual(Post.tags.through.objects.count(), 50)
+
+    def test_reports_row_errors_with_line_numbers(self):
+        response = self.post_bulk(ndjson(
+            {'title': 'Fine', 'content': 'Body'},
+            {'title': 'No content'},
+        ) + 'not json\n' + ndjson({'title': 'Bad status', 'content': 'Body', 'status': 'archived'}))
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['failed'], 3)
+        errors = {error['line']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(sorted(errors), [2, 3, 4])
+        self.assertIn('content', errors[2])
+        self.assertIn('non_field_errors', errors[3])
+        self.assertIn('status', errors[4])
+
+    def test_all_rows_failing_is_a_bad_request(self):
+        response = self.post_bulk(ndjson({'content': 'No title'}))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Post.objects.count(), 0)
+
+    def test_accepts_a_json_array(self):
+        response = self.post_bulk(json.dumps([{'title': 'From JSON', 'content': 'Body'}]), 'application/json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Post.objects.filter(slug='from-json').exists())
+
+    def test_requires_authentication(self):
+        response = self.client.generic('POST', '/api/posts/bulk/', ndjson({'title': 'T', 'content': 'C'}),
+                                       content_type='application/x-ndjson')
+
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_duplicate_titles_get_unique_slugs(self):
+        Post.objects.create(title='Same', content='Body', author=self.author)
+        Post.objects.create(title='Same', slug='same-3', content='Body', author=self.author)
+
+        report = import_posts([{'title': 'Same', 'content': 'Body'}] * 3, author=self.author)
+
+        self.assertEqual(report.created, 3)
+        self.assertEqual(
+            sorted(Post.objects.values_list('slug', flat=True)),
+            ['same', 'same-3', 'same-4', 'same-5', 'same-6'],
+        )
+
+    def test_taken_explicit_slug_is_an_error(self):
+        Post.objects.create(title='Existing', content='Body', author=self.author)
+
+        report = import_posts([
+            {'title': 'One', 'content': 'Body', 'slug': 'existing'},
+            {'title': 'Two', 'content': 'Body', 'slug': 'fresh'},
+            {'title': 'Three', 'content': 'Body', 'slug': 'fresh'},
+        ], author=self.author)
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual([error['line'] for error in report.errors], [1, 3])
+
+    def test_retry_after_a_lost_race_reports_each_row_once(self):
+        Post.objects.create(title='Existing', content='Body', author=self.author)
+        bulk_create = Post.objects.bulk_create
+        calls = []
+
+        def lose_first_race(posts, *args, **kwargs):
+            calls.append(len(posts))
+            if len(calls) == 1:
+                raise IntegrityError('UNIQUE constraint failed: blog_post.slug')
+            return bulk_create(posts, *args, **kwargs)
+
+        with mock.patch.object(Post.objects, 'bulk_create', side_effect=lose_first_race):
+            report = import_posts([
+                {'title': 'One', 'content': 'Body', 'slug': 'existing'},
+                {'title': 'Two', 'content': 'Body', 'author': 'nobody'},
+                {'title': 'Three', 'content': 'Body'},
+                {'title': 'Four', 'content': 'Body'},
+            ], author=self.author, use_row_authors=True)
+
+        self.assertEqual(calls, [2, 1, 1])
+        self.assertEqual((report.created, report.failed), (2, 2))
+        self.assertEqual([error['line'] for error in report.errors], [2, 1])
+
+    def test_long_titles_already_in_use_get_free_slugs(self):
+        title = 'A long title about ' + 'x' * 49
+        Post.objects.create(title=title, content='Body', author=self.author)
+        Post.objects.create(title=title, content='Body', author=self.author)
+
+        for _ in range(2):
+            report = import_posts([{'title': title, 'content': 'Body'}] * 3, author=self.author)
+            self.assertEqual((report.created, report.failed), (3, 0))
+
+        self.assertEqual(len(set(Post.objects.values_list('slug', flat=True))), 8)
+
+    def test_committed_chunks_are_indexed_when_a_later_chunk_fails(self):
+        generation = response_cache.generations([Post])
+        new_post = bulk._new_post
+
+        def fail_on_second_chunk(values, **fields):
+            if values['title'] == 'Broken':
+                raise RuntimeError('disk full')
+            return new_post(values, **fields)
+
+        with self.captureOnCommitCallbacks(execute=True), \
+                mock.patch.object(bulk, '_new_post', side_effect=fail_on_second_chunk):
+            with self.assertRaises(RuntimeError):
+                import_posts([{'title': 'Vacuum tuning', 'content': 'Body', 'tags': ['postgres']},
+                              {'title': 'Broken', 'content': 'Body'}], author=self.author, chunk_size=1)
+
+        self.assertNotEqual(response_cache.generations([Post]), generation)
+        response = self.client.get('/api/posts/', {'search': 'postgres'})
+        self.assertEqual([post['slug'] for post in response.data['results']], ['vacuum-tuning'])
+
+    def test_keeps_explicit_published_date(self):
+        import_posts([{'title': 'Old', 'content': 'Body', 'published_date': '2020-01-02T03:04:05Z'}],
+                     author=self.author)
+
+        self.assertEqual(Post.objects.get().published_date, datetime(2020, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc))
+
+    def test_imported_posts_are_searchable(self):
+        import_posts([{'title': 'Vacuum tuning', 'content': 'Body', 'tags': ['postgres']}], author=self.author)
+
+        response = self.client.get('/api/posts/', {'search': 'postgres'})
+
+        self.assertEqual([post['slug'] for post in response.data['results']], ['vacuum-tuning'])
+
+    def test_allocate_slugs(self):
+        Tag.objects.create(name='a', slug='python')
+        Tag.objects.create(name='b', slug='python-2')
+
+        self.assertEqual(allocate_slugs(Tag, ['python', 'python', 'go']), ['python-3', 'python-4', 'go'])
+
+
+class BulkExportTests(APITestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='writer', password='password123')
+        self.other = User.objects.create_user(username='other', password='password123')
+        category = Category.objects.create(name='News')
+        post = Post.objects.create(title='Mine', content='Body', author=self.author, category=category)
+        post.tags.add(Tag.objects.create(name='django'))
+        Post.objects.create(title='Theirs', content='Body', author=self.other, status='published')
+
+    def test_users_export_their_own_posts(self):
+        self.client.force_authenticate(self.author)
+        response = self.client.get('/api/posts/export/')
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['title'], 'Mine')
+        self.assertEqual(rows[0]['category'], 'news')
+        self.assertEqual(rows[0]['tags'], ['django'])
+
+    def test_commands_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'posts.ndjson')
+            call_command('export_posts', output=path, stderr=StringIO())
+            Post.objects.all().delete()
+
+            out = StringIO()
+            call_command('import_posts', path, stdout=out)
+
+        self.assertIn('Imported 2 posts (0 failed)', out.getvalue())
+        mine = Post.objects.get(slug='mine')
+        self.assertEqual(mine.author, self.author)
+        self.assertEqual(mine.category.name, 'News')
+        self.assertEqual(list(mine.tags.values_list('name', flat=True)), ['django'])
+        self.assertEqual(Post.objects.get(slug='theirs').author, self.other)
+
+    def test_import_command_rejects_unknown_author(self):
+        with self.assertRaises(CommandError):
+            call_command('import_posts', '-', author='nobody', stdout=StringIO())
@@ -0,0 +1,88 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from .cache import response_cache
+from .models import Category, Comment, Post, Tag
+
+
+class ResponseCacheTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        response_cache.reset_stats()
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.post = Post.objects.create(title='Cached', content='Body', author=self.author, status='published')
+
+    def test_anonymous_list_is_served_from_cache(self):
+        first = self.client.get('/api/posts/')
+        # Only the conditional-request probe reaches the database.
+        with self.assertNumQueries(1):
+            second = self.client.get('/api/posts/')
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.data, second.data)
+
+    def test_query_parameter_order_does_not_matter(self):
+        self.client.get('/api/posts/', {'status': 'published', 'ordering': 'title'})
+        response = self.client.get('/api/posts/?ordering=title&status=published')
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        self.client.force_authenticate(self.author)
+        self.client.get('/api/posts/')
+        response = self.client.get('/api/posts/')
+
+        self.assertNotIn('X-Cache', response)
+
+    def test_model_changes_invalidate_dependent_endpoints(self):
+        self.client.get('/api/posts/')
+        self.client.get('/api/tags/')
+        self.client.get('/api/categories/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(post=self.post, author=self.author, content='New')
+
+        self.assertEqual(self.client.get('/api/posts/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/api/tags/')['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='fresh')
+        self.assertEqual(self.client.get('/api/tags/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/api/categories/')['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Fresh')
+        response = self.client.get('/api/categories/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_invalidation_waits_for_the_commit(self):
+        generation = response_cache.generations([Comment])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(post=self.post, author=self.author, content='New')
+            # A reader now would still see the old rows: they must not be cached as new.
+            self.assertEqual(response_cache.generations([Comment]), generation)
+
+        self.assertNotEqual(response_cache.generations([Comment]), generation)
+
+    def test_likes_invalidate_post_listings(self):
+        self.client.get('/api/posts/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.likes.add(self.author)
+
+        self.assertEqual(self.client.get('/api/posts/')['X-Cache'], 'MISS')
+
+    def test_stats_endpoint_reports_hits_and_misses(self):
+        self.client.get('/api/posts/')
+        self.client.get('/api/posts/')
+        admin = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client.force_authenticate(admin)
+
+        response = self.client.get('/api/cache/stats/')
+
+        self.assertEqual(response.data['endpoints']['PostViewSet.list'], {'hits': 1, 'misses': 1})
+        self.assertEqual(response.data['hit_rate'], 0.5)
@@ -0,0 +1,75 @@
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .counters import view_counter
+from .models import Comment, Post
+
+
+class CommentTreeTests(APITestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.post = Post.objects.create(title='Threaded', content='Body', author=self.author, status='published')
+        self.addCleanup(view_counter.flush)
+
+    def comment(self, content, parent=None, post=None):
+        return Comment.objects.create(post=post or self.post, author=self.author,
+                                      parent=parent, content=content)
+
+    def build_chain(self, depth):
+        parent = None
+        for level in range(depth):
+            parent = self.comment(f'Level {level}', parent=parent)
+
+    def depth_of(self, comment):
+        return max((1 + self.depth_of(reply) for reply in comment['replies']), default=0)
+
+    def test_post_embeds_arbitrarily_deep_threads(self):
+        self.build_chain(5)
+
+        response = self.client.get(f'/api/posts/{self.post.slug}/')
+
+        roots = response.data['comments']
+        self.assertEqual(len(roots), 1)
+        self.assertEqual(self.depth_of(roots[0]), 4)
+
+    def test_max_depth_and_per_level_limit(self):
+        self.build_chain(5)
+        root = Comment.objects.get(parent=None)
+        for i in range(3):
+            self.comment(f'Sibling {i}', parent=root)
+        # Keep the chain among the newest replies so the limit doesn't cut it off.
+        Comment.objects.filter(parent=root, content='Level 1').update(created_date=timezone.now())
+
+        response = self.client.get(f'/api/posts/{self.post.slug}/',
+                                   {'max_depth': 2, 'per_level_limit': 2})
+
+        root = response.data['comments'][0]
+        self.assertEqual(len(root['replies']), 2)
+        self.assertEqual(root['reply_count'], 4)
+        self.assertEqual(self.depth_of(root), 2)
+
+    def test_comment_listing_loads_all_threads_in_one_query(self):
+        for i in range(5):
+            root = self.comment(f'Root {i}')
+            reply = self.comment('Reply', parent=root)
+            self.comment('Nested', parent=reply)
+
+        # count, top-level comments (+ authors), threads
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/comments/', {'post': self.post.pk})
+
+        self.assertEqual(len(response.data['results']), 5)
+        for root in response.data['results']:
+            self.assertEqual(root['replies'][0]['replies'][0]['content'], 'Nested')
+
+    def test_post_listing_keeps_threads_with_their_posts(self):
+        other = Post.objects.create(title='Other', content='Body', author=self.author, status='published')
+        self.comment('On threaded')
+        self.comment('On other', post=other)
+
+        response = self.client.get('/api/posts/', {'expand': 'comments'})
+
+        comments = {post['id']: [c['content'] for c in post['comments']] for post in response.data['results']}
+        self.assertEqual(comments, {self.post.pk: ['On threaded'], other.pk: ['On other']})
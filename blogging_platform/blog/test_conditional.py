@@ -0,0 +1,101 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from .counters import view_counter
+from .models import Category, Comment, Post, Tag
+
+
+class ConditionalRequestTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(view_counter.flush)
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.post = Post.objects.create(title='Conditional', content='Body', author=self.author, status='published')
+        self.url = f'/api/posts/{self.post.slug}/'
+
+    def test_detail_revalidates_without_serializing(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+
+        with self.assertNumQueries(2):  # the probe, and the view count lookup
+            second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(view_counter.pending(self.post.pk), 2)
+
+    def test_detail_etag_is_weak(self):
+        # The body's view count includes views not yet written, which the ETag doesn't cover.
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+
+        self.assertTrue(first['ETag'].startswith('W/'))
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertNotEqual(second.data['views'], first.data['views'])
+
+    def test_if_modified_since(self):
+        first = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_produce_a_new_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(post=self.post, author=self.author, content='First!')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        Post.objects.filter(pk=self.post.pk).update(like_count=5)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_query_parameters_are_part_of_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, {'fields': 'title'}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_revalidates_with_one_probe(self):
+        etag = self.client.get('/api/posts/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Post.objects.create(title='Another', content='Body', author=self.author, status='published')
+        response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_view_count_flush_changes_the_list_etag(self):
+        etag = self.client.get('/api/posts/')['ETag']
+        self.client.get(self.url)
+        view_counter.flush()
+
+        response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        # The cached list goes with the ETag, so it shows the flushed views.
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['views'], 1)
+
+    def test_taxonomy_revalidates_without_queries(self):
+        category = Category.objects.create(name='News')
+        for url in ('/api/categories/', f'/api/categories/{category.slug}/', '/api/tags/'):
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+        etag = self.client.get('/api/tags/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='fresh')
+        self.assertEqual(self.client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_missing_post_is_still_a_404(self):
+        response = self.client.get('/api/posts/missing/', HTTP_IF_NONE_MATCH='"anything"')
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,119 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from . import content
+from .models import Post, Task
+from .tasks import Worker
+
+
+class ContentDerivativeTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='writer', password='password123')
+
+    def create_post(self, body, **kwargs):
+        kwargs.setdefault('status', 'published')
+        return Post.objects.create(title='Post', content=body, author=self.author, **kwargs)
+
+    def test_derives_plain_text_and_counts_on_create(self):
+        post = self.create_post('<p>Hello&nbsp;<b>bold</b>\n\n world &amp; more</p>')
+
+        self.assertEqual(post.plain_text, 'Hello bold world & more')
+        self.assertEqual(post.word_count, 5)
+        self.assertEqual(post.read_time, 1)
+        self.assertEqual(post.excerpt, 'Hello bold world & more')
+
+    def test_read_time_follows_edits(self):
+        post = self.create_post('word ' * 100)
+
+        post.content = 'word ' * 1000
+        post.save()
+
+        post.refresh_from_db()
+        self.assertEqual((post.word_count, post.read_time), (1000, 5))
+
+    def test_generated_excerpt_is_regenerated_but_written_one_is_kept(self):
+        generated = self.create_post('First version')
+        written = self.create_post('First version', excerpt='By hand')
+
+        for post in (generated, written):
+            post = Post.objects.get(pk=post.pk)
+            post.content = 'Second version'
+            post.save()
+
+        self.assertEqual(Post.objects.get(pk=generated.pk).excerpt, 'Second version')
+        self.assertEqual(Post.objects.get(pk=written.pk).excerpt, 'By hand')
+
+    def test_excerpt_is_truncated(self):
+        post = self.create_post(' '.join(f'w{n}' for n in range(100)))
+
+        self.assertEqual(len(post.excerpt.split()), 40)
+        self.assertTrue(post.excerpt.endswith('…'))
+
+    def test_unchanged_content_is_not_reprocessed(self):
+        post = Post.objects.get(pk=self.create_post('Body').pk)
+
+        post.title = 'Renamed'
+        with self.settings(BLOG_CONTENT={'WORDS_PER_MINUTE': 0}):
+            post.save()  # a division by zero if read_time were recomputed
+
+        self.assertEqual(Post.objects.get(pk=post.pk).title, 'Renamed')
+
+    def test_update_fields_include_derived_fields(self):
+        post = self.create_post('One two')
+
+        post.content = 'One two three'
+        post.save(update_fields=['content'])
+        post.title = 'Not saved'
+        post.save(update_fields=['views'])
+
+        stored = Post.objects.get(pk=post.pk)
+        self.assertEqual((stored.word_count, stored.plain_text), (3, 'One two three'))
+        self.assertEqual(stored.title, 'Post')
+
+    @override_settings(BLOG_CONTENT={'BACKGROUND_THRESHOLD': 50}, BLOG_TASKS={'EAGER': False})
+    def test_large_bodies_are_finished_by_a_task(self):
+        body = '<p>' + 'word ' * 30 + '</p>'
+        post = self.create_post(body)
+
+        self.assertEqual(post.plain_text, '')
+        self.assertEqual(post.excerpt, ' '.join(['word'] * 30))
+        self.assertEqual(list(Task.objects.values_list('key', flat=True)), [f'content:{post.pk}'])
+
+        Worker().run_pending()
+
+        post.refresh_from_db()
+        self.assertEqual(post.plain_text, ' '.join(['word'] * 30))
+        self.assertEqual(post.word_count, 30)
+        response = self.client.get('/api/posts/', {'search': 'word'})
+        self.assertEqual([result['id'] for result in response.data['results']], [post.pk])
+
+    def test_update_post_uses_the_stored_content(self):
+        post = self.create_post('Old body')
+        Post.objects.filter(pk=post.pk).update(content='<em>Newer</em> body')
+
+        content.update_post(post.pk)
+
+        post.refresh_from_db()
+        self.assertEqual(post.plain_text, 'Newer body')
+
+    def test_search_ignores_markup(self):
+        post = self.create_post('<a href="https://example.com/markup">searchable</a> text')
+
+        def search(query):
+            response = self.client.get('/api/posts/', {'search': query})
+            return [result['id'] for result in response.data['results']]
+
+        self.assertEqual(search('searchable'), [post.pk])
+        self.assertEqual(search('href'), [])
+
+    def test_api_exposes_word_count(self):
+        self.client.force_authenticate(self.author)
+
+        response = self.client.post('/api/posts/', {'title': 'New', 'content': 'Three words here', 'word_count': 99})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['word_count'], 3)
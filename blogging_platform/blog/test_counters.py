@@ -0,0 +1,84 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+
+from .cache import response_cache
+from .counters import toggle_like
+from .models import Comment, Post
+
+
+class PostCounterTests(APITestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.reader = User.objects.create_user(username='reader', password='password123')
+        self.post = Post.objects.create(title='Counted', content='Body', author=self.author, status='published')
+
+    def test_like_toggles_like_count(self):
+        self.client.force_authenticate(self.reader)
+
+        self.client.post(f'/api/posts/{self.post.slug}/like/')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+
+        self.client.post(f'/api/posts/{self.post.slug}/like/')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+
+    def test_like_invalidates_cached_posts(self):
+        self.client.force_authenticate(self.reader)
+        generation = response_cache.generations([Post])
+
+        response = self.client.post(f'/api/posts/{self.post.slug}/like/')
+
+        self.assertEqual(response.data, {'status': 'liked'})
+        self.assertNotEqual(response_cache.generations([Post]), generation)
+
+    def test_like_inserted_concurrently_is_not_counted_again(self):
+        # Another request adds the like between this one's delete and insert.
+        self.post.likes.add(self.reader)
+        through = Post.likes.through
+        missed = mock.Mock(**{'delete.return_value': (0, {})})
+
+        with mock.patch.object(through.objects, 'filter', return_value=missed):
+            liked = toggle_like(self.post, self.reader)
+
+        self.assertTrue(liked)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)  # the other request's add did its own counting
+        self.assertEqual(through.objects.filter(post=self.post).count(), 1)
+
+    def test_comment_create_reply_and_delete_maintain_comment_count(self):
+        self.client.force_authenticate(self.reader)
+
+        response = self.client.post('/api/comments/', {'post': self.post.pk, 'content': 'First'})
+        self.assertEqual(response.status_code, 201)
+        comment_id = response.data['id']
+        self.client.post(f'/api/comments/{comment_id}/reply/', {'content': 'Reply'})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+
+        self.client.delete(f'/api/comments/{comment_id}/')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+
+    def test_ordering_by_like_count(self):
+        popular = Post.objects.create(title='Popular', content='Body', author=self.author,
+                                      status='published', like_count=5)
+
+        response = self.client.get('/api/posts/', {'ordering': '-like_count'})
+
+        self.assertEqual(response.data['results'][0]['id'], popular.pk)
+
+    def test_recount_command_repairs_drift(self):
+        self.post.likes.add(self.reader)
+        Comment.objects.create(post=self.post, author=self.reader, content='Untracked')
+        Post.objects.filter(pk=self.post.pk).update(comment_count=7)
+
+        call_command('recount_post_counters', batch_size=1, stdout=StringIO())
+
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.comment_count), (1, 1))
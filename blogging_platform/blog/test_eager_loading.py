@@ -0,0 +1,70 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from .counters import recount_post_counters, view_counter
+from .models import Category, Comment, Post, Tag
+
+
+class PostListQueryCountTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.reader = User.objects.create_user(username='reader', password='password123')
+        self.category = Category.objects.create(name='Python')
+        self.tags = [Tag.objects.create(name=name) for name in ('django', 'orm', 'drf')]
+
+    def create_posts(self, count):
+        for i in range(Post.objects.count(), Post.objects.count() + count):
+            post = Post.objects.create(
+                title=f'Post {i}', content='word ' * 400, author=self.author,
+                category=self.category, status='published',
+            )
+            post.tags.set(self.tags)
+            post.likes.add(self.reader)
+            comment = Comment.objects.create(post=post, author=self.reader, content='Nice')
+            Comment.objects.create(post=post, author=self.author, parent=comment, content='Thanks')
+        recount_post_counters()
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/posts/', {'expand': 'comments,author_detail'})
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        self.create_posts(2)
+        small_page_queries, _ = self.count_list_queries()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_posts(8)
+        full_page_queries, response = self.count_list_queries()
+
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(small_page_queries, full_page_queries)
+        # ETag probe, count, posts (+ author, category), tags, comment threads
+        self.assertEqual(full_page_queries, 5)
+
+    def test_list_payload_uses_prefetched_data(self):
+        self.create_posts(1)
+        _, response = self.count_list_queries()
+
+        post = response.data['results'][0]
+        self.assertEqual(post['author'], 'author')
+        self.assertEqual(post['category_detail']['name'], 'Python')
+        self.assertEqual(sorted(tag['name'] for tag in post['tags_detail']), ['django', 'drf', 'orm'])
+        self.assertEqual(post['like_count'], 1)
+        top_level = [comment for comment in post['comments'] if comment['parent'] is None]
+        self.assertEqual(top_level[0]['replies'][0]['content'], 'Thanks')
+
+    def test_retrieve_query_count_is_fixed(self):
+        self.create_posts(1)
+        post = Post.objects.get()
+
+        with self.assertNumQueries(4):  # ETag probe, post, tags, comments
+            response = self.client.get(f'/api/posts/{post.slug}/')
+        self.assertEqual(response.status_code, 200)
+        view_counter.flush()
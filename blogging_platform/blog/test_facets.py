@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from .models import Category, Post, Tag
+from .search import get_search_backend
+
+
+class FacetTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.news = Category.objects.create(name='News')
+        self.guides = Category.objects.create(name='Guides')
+        self.django = Tag.objects.create(name='django')
+        self.python = Tag.objects.create(name='python')
+        for title, category, tags, status, read_time in [
+            ('Release notes', self.news, [self.django, self.python], 'published', 2),
+            ('Django tips', self.guides, [self.django], 'published', 12),
+            ('Python draft', self.guides, [self.python], 'draft', 30),
+            ('Untagged', None, [], 'published', 7),
+        ]:
+            post = Post.objects.create(title=title, content='Body', author=self.author, category=category,
+                                       status=status)
+            post.tags.set(tags)
+            Post.objects.filter(pk=post.pk).update(read_time=read_time)
+        cache.clear()
+
+    def counts(self, facet, key, data):
+        return {entry[key]: entry['count'] for entry in data[facet]}
+
+    def test_counts_every_facet_in_three_queries(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/posts/facets/')
+
+        data = response.data
+        self.assertEqual(data['count'], 4)
+        self.assertEqual(self.counts('status', 'value', data), {'draft': 1, 'published': 3})
+        self.assertEqual(self.counts('categories', 'slug', data), {'guides': 2, 'news': 1})
+        self.assertEqual(self.counts('tags', 'name', data), {'django': 2, 'python': 2})
+        self.assertEqual(data['read_time'], [
+            {'min_read_time': 0, 'max_read_time': 4, 'count': 1},
+            {'min_read_time': 5, 'max_read_time': 9, 'count': 1},
+            {'min_read_time': 10, 'max_read_time': 19, 'count': 1},
+            {'min_read_time': 20, 'max_read_time': None, 'count': 1},
+        ])
+
+    def test_counts_follow_the_list_filters(self):
+        data = self.client.get('/api/posts/facets/', {'tags': 'django', 'status': 'published'}).data
+
+        self.assertEqual(data['count'], 2)
+        # A post matched through one of its tags still counts for all of them, once.
+        self.assertEqual(self.counts('tags', 'name', data), {'django': 2, 'python': 1})
+        self.assertEqual(self.counts('categories', 'slug', data), {'guides': 1, 'news': 1})
+
+        listed = self.client.get('/api/posts/', {'category': self.guides.pk, 'max_read_time': 20})
+        data = self.client.get('/api/posts/facets/', {'category': self.guides.pk, 'max_read_time': 20}).data
+        self.assertEqual(data['count'], len(listed.data['results']))
+
+    def test_search_results_have_facets(self):
+        get_search_backend().index_posts(Post.objects.values_list('pk', flat=True))
+
+        data = self.client.get('/api/posts/facets/', {'search': 'django'}).data
+
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(self.counts('status', 'value', data), {'draft': 0, 'published': 2})
+
+    def test_responses_are_cached_until_posts_change(self):
+        self.client.get('/api/posts/facets/')
+        self.assertEqual(self.client.get('/api/posts/facets/')['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.get(title='Untagged').tags.add(self.django)
+
+        data = self.client.get('/api/posts/facets/').data
+        self.assertEqual(self.counts('tags', 'name', data)['django'], 3)
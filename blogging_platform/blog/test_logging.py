@@ -0,0 +1,66 @@
+import io
+import logging
+
+from django.test import SimpleTestCase, TestCase
+
+from .log import NonBlockingHandler, RequestIdFilter, SamplingFilter, StructuredFormatter, request_id_var
+
+
+def make_record(name='blog.views', level=logging.INFO, msg='hello %s', args=('world',)):
+    return logging.makeLogRecord({'name': name, 'levelno': level, 'levelname': logging.getLevelName(level),
+                                  'msg': msg, 'args': args})
+
+
+class SamplingFilterTests(SimpleTestCase):
+
+    def test_rates_apply_to_child_loggers(self):
+        sampling = SamplingFilter({'blog': 0.5, 'blog.requests': 0})
+
+        self.assertEqual(sampling.rate_for('blog.views'), 0.5)
+        self.assertEqual(sampling.rate_for('blog.requests.slow'), 0)
+        self.assertEqual(sampling.rate_for('django'), 1.0)
+
+    def test_warnings_are_never_sampled_out(self):
+        sampling = SamplingFilter({'blog': 0})
+
+        self.assertFalse(sampling.filter(make_record()))
+        self.assertTrue(sampling.filter(make_record(level=logging.WARNING)))
+
+
+class NonBlockingHandlerTests(SimpleTestCase):
+
+    def test_records_are_written_by_the_listener(self):
+        stream = io.StringIO()
+        handler = NonBlockingHandler(stream)
+        handler.addFilter(RequestIdFilter())
+        handler.setFormatter(StructuredFormatter())
+
+        token = request_id_var.set('abc123')
+        try:
+            handler.handle(make_record())
+        finally:
+            request_id_var.reset(token)
+        handler.close()
+
+        self.assertIn('"message": "hello world"', stream.getvalue())
+        self.assertIn('"request_id": "abc123"', stream.getvalue())
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = NonBlockingHandler(io.StringIO(), queue_size=1)
+        handler.listener.stop()  # nothing drains the queue
+        handler.handle(make_record())
+        handler.handle(make_record())
+
+        self.assertEqual(handler.dropped, 1)
+        handler.listener.start()
+        handler.close()
+
+
+class RequestIdMiddlewareTests(TestCase):
+
+    def test_request_id_is_echoed_or_generated(self):
+        response = self.client.get('/api/tags/', HTTP_X_REQUEST_ID='edge-42')
+        self.assertEqual(response['X-Request-ID'], 'edge-42')
+
+        response = self.client.get('/api/tags/', HTTP_X_REQUEST_ID='not valid!')
+        self.assertRegex(response['X-Request-ID'], r'^[0-9a-f]{32}$')
@@ -0,0 +1,52 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from .counters import view_counter
+from .metrics import metrics
+from .models import Post
+
+
+class PerformanceMiddlewareTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.addCleanup(view_counter.flush)
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.post = Post.objects.create(title='Measured', content='Body', author=self.author, status='published')
+
+    def test_server_timing_header(self):
+        response = self.client.get(f'/api/posts/{self.post.slug}/')
+
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+$',
+        )
+
+    def test_metrics_are_labelled_by_view_and_action(self):
+        self.client.get('/api/posts/')
+        self.client.get(f'/api/posts/{self.post.slug}/')
+
+        admin = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/metrics/')
+        body = response.content.decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('blog_request_duration_seconds_count{view="PostViewSet.list"} 1', body)
+        self.assertIn('blog_db_queries_bucket{view="PostViewSet.retrieve",le="+Inf"} 1', body)
+        self.assertIn('blog_serializer_duration_seconds_sum{view="PostViewSet.retrieve"}', body)
+        self.assertIn('# TYPE blog_response_size_bytes histogram', body)
+
+    def test_metrics_require_staff(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+    @override_settings(BLOG_PERFORMANCE={'QUERY_BUDGET': 1})
+    def test_requests_over_the_query_budget_are_flagged(self):
+        with self.assertLogs('blog.performance', 'WARNING'):
+            response = self.client.get(f'/api/posts/{self.post.slug}/')
+
+        self.assertRegex(response['X-Query-Budget-Exceeded'], r'^\d+/1$')
+        self.assertIn('blog_query_budget_exceeded_total{view="PostViewSet.retrieve"} 1', metrics.render())
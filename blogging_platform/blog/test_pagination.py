@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import Comment, Post
+
+
+class KeysetPaginationTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='password123')
+        now = timezone.now()
+        self.posts = []
+        for i in range(25):
+            post = Post.objects.create(title=f'Post {i:02}', content='Body', author=self.author,
+                                       status='published', views=i % 3)
+            # Pairs of posts share a timestamp so the id tiebreaker matters.
+            Post.objects.filter(pk=post.pk).update(published_date=now - timedelta(minutes=i // 2))
+            self.posts.append(post)
+
+    def walk(self, url, params=None):
+        ids, pages = [], 0
+        response = self.client.get(url, params or {})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item['id'] for item in response.data['results'])
+            pages += 1
+            if not response.data['next']:
+                return ids, pages, response
+            response = self.client.get(response.data['next'])
+
+    def test_walks_every_post_once_in_order(self):
+        ids, pages, _ = self.walk('/api/posts/')
+
+        expected = list(
+            Post.objects.order_by('-published_date', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_cursor_follows_client_ordering(self):
+        ids, _, _ = self.walk('/api/posts/', {'ordering': 'views', 'page_size': 4})
+
+        expected = list(Post.objects.order_by('views', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_the_prior_page(self):
+        first = self.client.get('/api/posts/')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertIsNone(first.data['previous'])
+
+    def test_count_can_be_skipped(self):
+        with self.assertNumQueries(3):  # ETag probe, posts, tags
+            response = self.client.get('/api/posts/', {'count': 'false'})
+
+        self.assertNotIn('count', response.data)
+        self.assertEqual(self.client.get('/api/posts/').data['count'], 25)
+
+    def test_invalid_or_foreign_cursor_is_rejected(self):
+        next_url = self.client.get('/api/posts/', {'ordering': 'title'}).data['next']
+        cursor = next_url.split('cursor=')[1].split('&')[0]
+
+        self.assertEqual(self.client.get('/api/posts/', {'cursor': 'garbage'}).status_code, 404)
+        self.assertEqual(self.client.get('/api/posts/', {'cursor': cursor}).status_code, 404)
+
+    def test_page_numbers_still_work(self):
+        response = self.client.get('/api/posts/', {'page': 2})
+
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_drafts_and_comments_are_keyset_paginated(self):
+        Post.objects.update(status='draft')
+        post = self.posts[0]
+        for i in range(12):
+            Comment.objects.create(post=post, author=self.author, content=f'Comment {i}')
+        self.client.force_authenticate(self.author)
+
+        draft_ids, draft_pages, _ = self.walk('/api/posts/drafts/', {'count': 'false'})
+        comment_ids, comment_pages, _ = self.walk('/api/comments/', {'post': post.pk})
+
+        self.assertEqual(len(set(draft_ids)), 25)
+        self.assertEqual(draft_pages, 3)
+        self.assertEqual(comment_ids, list(
+            Comment.objects.order_by('-created_date', '-id').values_list('id', flat=True)
+        ))
+        self.assertEqual(comment_pages, 2)
@@ -0,0 +1,121 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from .bulk import import_posts
+from .models import Category, Post, RelatedPost, Tag
+from .related import rebuild_related_posts, similarity
+from .tags import set_post_tags
+from .tasks import Worker
+
+
+@override_settings(BLOG_TASKS={'EAGER': True},
+                   BLOG_RELATED={'MAX_RELATED': 2, 'CATEGORY_WEIGHT': 0.25, 'CATEGORY_CANDIDATES': 50})
+class RelatedPostsTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.tags = {name: Tag.objects.create(name=name) for name in ('django', 'orm', 'python', 'css')}
+
+    def create_post(self, title, tags=(), **kwargs):
+        post = Post.objects.create(title=title, content='Body', author=self.author, status='published', **kwargs)
+        set_post_tags(post, [self.tags[name].pk for name in tags], existing=())
+        return post
+
+    def related(self, post):
+        return list(RelatedPost.objects.filter(post=post).order_by('-score', '-related_id').values_list('related__title', flat=True))
+
+    def test_similarity_is_tag_jaccard_plus_category(self):
+        self.assertEqual(similarity(2, 2, 2, False, 0.25), 1)
+        self.assertAlmostEqual(similarity(2, 3, 1, True, 0.25), 0.25 + 1 / 4)
+        self.assertEqual(similarity(0, 0, 0, False, 0.25), 0)
+
+    def test_lists_follow_tag_changes(self):
+        first = self.create_post('First', ['django', 'orm'])
+        second = self.create_post('Second', ['django', 'orm'])
+        third = self.create_post('Third', ['django', 'python'])
+        self.create_post('Unrelated', ['css'])
+
+        self.assertEqual(self.related(first), ['Second', 'Third'])
+        # Ties go to the newer post.
+        self.assertEqual(self.related(third), ['Second', 'First'])
+
+        # Retagged through the API: Third now matches First exactly.
+        self.client.force_authenticate(self.author)
+        self.client.patch(f'/api/posts/{third.slug}/', {'tag_names': 'django,orm', 'tags': []}, format='json')
+
+        self.assertEqual(self.related(first), ['Third', 'Second'])
+        self.assertEqual(self.related(second), ['Third', 'First'])
+
+        set_post_tags(Post.objects.get(pk=third.pk), [self.tags['css'].pk])
+        self.assertEqual(self.related(first), ['Second'])
+        self.assertEqual(self.related(third), ['Unrelated'])
+
+    def test_full_lists_keep_the_best(self):
+        posts = [self.create_post(f'Post {n}', ['django']) for n in range(3)]
+        best = self.create_post('Best', ['django', 'orm'])
+        set_post_tags(Post.objects.get(pk=posts[0].pk), [self.tags['django'].pk, self.tags['orm'].pk])
+
+        self.assertEqual(RelatedPost.objects.filter(post=posts[1]).count(), 2)
+        self.assertEqual(self.related(best)[0], 'Post 0')
+        self.assertEqual(self.related(posts[0])[0], 'Best')
+
+    def test_category_and_status(self):
+        news = Category.objects.create(name='News')
+        first = self.create_post('First', category=news)
+        second = self.create_post('Second', category=news)
+        self.assertEqual(self.related(first), ['Second'])
+
+        second = Post.objects.get(pk=second.pk)
+        second.status = 'draft'
+        second.save()
+        self.assertEqual(self.related(first), [])
+
+    def test_endpoint_reads_the_list_in_one_query(self):
+        first = self.create_post('First', ['django', 'orm'])
+        self.create_post('Second', ['django', 'orm'])
+        self.create_post('Third', ['django'])
+        cache.clear()
+
+        with self.assertNumQueries(2):  # posts, then their tags
+            response = self.client.get(f'/api/posts/{first.slug}/related/')
+
+        self.assertEqual([post['title'] for post in response.data], ['Second', 'Third'])
+        response = self.client.get(f'/api/posts/{first.slug}/related/', {'limit': 1})
+        self.assertEqual([post['title'] for post in response.data], ['Second'])
+        self.assertEqual(self.client.get('/api/posts/missing/related/').status_code, 404)
+
+    @override_settings(BLOG_TASKS={'EAGER': False})
+    def test_cached_list_follows_the_worker(self):
+        first = self.create_post('First', ['django'])
+        self.client.get(f'/api/posts/{first.slug}/related/')
+        self.create_post('Second', ['django'])
+
+        # Read after the save, before the worker has rewritten the lists.
+        self.assertEqual(self.client.get(f'/api/posts/{first.slug}/related/').data, [])
+        with self.captureOnCommitCallbacks(execute=True):
+            Worker().run_pending()
+
+        response = self.client.get(f'/api/posts/{first.slug}/related/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([post['title'] for post in response.data], ['Second'])
+
+    def test_bulk_import_and_rebuild(self):
+        import_posts([{'title': 'One', 'content': 'Body', 'status': 'published', 'tags': ['django']},
+                      {'title': 'Two', 'content': 'Body', 'status': 'published', 'tags': ['django']}],
+                     author=self.author)
+        one = Post.objects.get(title='One')
+        self.assertEqual(self.related(one), ['Two'])
+
+        RelatedPost.objects.all().delete()
+        self.assertEqual(rebuild_related_posts(), 2)
+        self.assertEqual(self.related(one), ['Two'])
+
+        out = StringIO()
+        call_command('rebuild_related_posts', stdout=out)
+        self.assertIn('of 2 posts', out.getvalue())
@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.test import APITestCase
+
+from .models import Category, Post, Tag
+from .search import SQLiteSearchBackend, get_search_backend
+
+
+class PostSearchTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='writer', password='password123')
+        self.category = Category.objects.create(name='Databases')
+
+    def create_post(self, title, content, **kwargs):
+        kwargs.setdefault('status', 'published')
+        return Post.objects.create(title=title, content=content, author=self.author, **kwargs)
+
+    def search(self, query, **params):
+        response = self.client.get('/api/posts/', {'search': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_uses_native_backend(self):
+        if connection.vendor == 'sqlite':
+            self.assertIsInstance(get_search_backend(), SQLiteSearchBackend)
+            self.assertTrue(get_search_backend().is_installed())
+
+    def test_title_matches_rank_above_content_matches(self):
+        in_content = self.create_post('Tuning notes', 'Indexes make postgres queries fast.')
+        in_title = self.create_post('Postgres tuning', 'Notes about vacuum.')
+
+        results = self.search('postgres')
+
+        self.assertEqual([post['id'] for post in results], [in_title.pk, in_content.pk])
+        self.assertIn('<mark>', results[0]['search_snippet'])
+        self.assertGreater(results[0]['search_rank'], results[1]['search_rank'])
+
+    def test_matches_word_prefixes_and_requires_every_word(self):
+        post = self.create_post('Query planning', 'How the planner chooses indexes.')
+        self.create_post('Query caching', 'Nothing about plans here.')
+
+        self.assertEqual([p['id'] for p in self.search('plann index')], [post.pk])
+        self.assertEqual(self.search('!!!'), [])
+
+    def test_index_follows_tags_category_and_updates(self):
+        post = self.create_post('Untitled', 'Body text.')
+        post.tags.add(Tag.objects.create(name='sqlite'))
+        self.assertEqual([p['id'] for p in self.search('sqlite')], [post.pk])
+
+        post.category = self.category
+        post.save()
+        self.category.name = 'Storage engines'
+        self.category.save()
+        self.assertEqual([p['id'] for p in self.search('storage')], [post.pk])
+
+        post.title = 'Renamed'
+        post.save()
+        self.assertEqual([p['id'] for p in self.search('renamed')], [post.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        self.assertEqual(self.search('renamed'), [])
+
+    def test_explicit_ordering_overrides_relevance(self):
+        older = self.create_post('Alpha search', 'search')
+        newer = self.create_post('Beta', 'search search search')
+
+        results = self.search('search', ordering='title')
+
+        self.assertEqual([p['id'] for p in results], [older.pk, newer.pk])
+
+    def test_rebuild_command_reindexes_every_post(self):
+        post = self.create_post('Rebuilt', 'Body')
+        get_search_backend().remove_posts([post.pk])
+        self.assertEqual(self.search('rebuilt'), [])
+
+        call_command('rebuild_search_index', stdout=StringIO())
+
+        self.assertEqual([p['id'] for p in self.search('rebuilt')], [post.pk])
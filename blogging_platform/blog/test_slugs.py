@@ -0,0 +1,153 @@
+import threading
+from collections import deque
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connections
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.utils.text import slugify
+
+from . import slugs
+from .models import Category, Post, Tag
+
+
+class SlugAllocationTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='writer', password='password123')
+
+    def create_post(self, title='Same title', **kwargs):
+        return Post.objects.create(title=title, content='Body', author=self.author, **kwargs)
+
+    def test_same_titles_get_numbered_slugs(self):
+        posts = [self.create_post() for _ in range(3)]
+
+        self.assertEqual([post.slug for post in posts], ['same-title', 'same-title-2', 'same-title-3'])
+
+    def test_next_suffix_follows_the_highest_in_use(self):
+        self.create_post()
+        self.create_post(slug='same-title-7')
+        self.create_post(slug='same-title-tips')
+
+        self.assertEqual(self.create_post().slug, 'same-title-8')
+
+    def test_finds_the_slug_with_one_query(self):
+        for _ in range(5):
+            self.create_post()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(slugs.next_slug(Post, 'same-title'), 'same-title-6')
+
+    def test_categories_and_tags_share_the_allocator(self):
+        self.assertEqual([Category.objects.create(name='News').slug for _ in range(2)], ['news', 'news-2'])
+        self.assertEqual([Tag.objects.create(name='Python').slug for _ in range(2)], ['python', 'python-2'])
+
+    def test_long_titles_keep_the_suffix(self):
+        title = 'A long title about ' + 'x' * 49
+        max_length = Post._meta.get_field('slug').max_length
+        first = self.create_post(title=title)
+
+        # Each create finds its slug with one lookup, never colliding and retrying.
+        with mock.patch.object(slugs, 'next_slug', wraps=slugs.next_slug) as next_slug:
+            posts = [self.create_post(title=title) for _ in range(40)]
+        self.assertEqual(next_slug.call_count, 40)
+        with self.assertNumQueries(1):
+            self.assertTrue(slugs.next_slug(Post, slugify(title)).endswith('-42'))
+
+        self.assertEqual(len(first.slug), max_length)
+        self.assertEqual([post.slug.rpartition('-')[2] for post in posts], [str(n) for n in range(2, 42)])
+        self.assertTrue(all(len(post.slug) <= max_length for post in posts))
+
+    def test_allocates_after_long_numbered_slugs(self):
+        base = slugify('A long title about ' + 'x' * 49)
+        taken = [self.create_post(title=base).slug for _ in range(3)]
+
+        allocated = slugs.allocate_slugs(Post, [base] * 2)
+
+        self.assertEqual(len(set(allocated + taken)), 5)
+        self.assertEqual([slug.rpartition('-')[2] for slug in allocated], ['4', '5'])
+
+    def test_retries_when_a_concurrent_insert_takes_the_slug(self):
+        self.create_post()
+        stale = iter(['same-title', 'same-title-2'])
+        real_next_slug = slugs.next_slug
+
+        # The first lookup answers as if the row written above didn't exist yet.
+        with mock.patch.object(slugs, 'next_slug', side_effect=lambda *args, **kwargs: next(stale, None)
+                               or real_next_slug(*args, **kwargs)):
+            post = self.create_post()
+
+        self.assertEqual(post.slug, 'same-title-2')
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_other_integrity_errors_are_not_retried(self):
+        with mock.patch.object(slugs, 'next_slug', return_value='free') as next_slug:
+            with self.assertRaises(IntegrityError):
+                self.create_post(views=-1)
+
+        self.assertEqual(next_slug.call_count, 1)
+
+    def test_api_create_with_duplicate_title_succeeds(self):
+        self.client.force_login(self.author)
+        self.create_post()
+
+        response = self.client.post('/api/posts/', {'title': 'Same title', 'content': 'Body'})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['slug'], 'same-title-2')
+
+
+class ConcurrentSlugTests(TransactionTestCase):
+    threads = 8
+    posts_per_thread = 250
+
+    def test_racing_writers_converge_without_retry_storms(self):
+        # Each first lookup sees the table as it was `threads` inserts ago,
+        # as if that many writers were racing for the same title.
+        author = User.objects.create_user(username='writer', password='password123')
+        real_next_slug = slugs.next_slug
+        seen = deque(maxlen=self.threads)
+        lookups = []
+
+        def racing_next_slug(*args, spread=0, **kwargs):
+            slug = real_next_slug(*args, spread=spread, **kwargs)
+            seen.append(slug)
+            lookups.append(slug)
+            return seen[0] if spread == 0 else slug
+
+        count = self.threads * self.posts_per_thread // 2
+        with mock.patch.object(slugs, 'next_slug', side_effect=racing_next_slug):
+            for _ in range(count):
+                Post.objects.create(title='Hot topic', content='Body', author=author)
+
+        slugs_in_use = list(Post.objects.values_list('slug', flat=True))
+        self.assertEqual(len(set(slugs_in_use)), count)
+        self.assertLess(len(lookups), 2.5 * count)
+
+    @skipUnlessDBFeature('test_db_allows_multiple_connections')
+    def test_concurrent_same_titled_posts_get_unique_slugs(self):
+        author = User.objects.create_user(username='writer', password='password123')
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        def worker():
+            try:
+                barrier.wait()
+                for _ in range(self.posts_per_thread):
+                    Post.objects.create(title='Hot topic', content='Body', author=author)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=worker) for _ in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        slugs_in_use = list(Post.objects.values_list('slug', flat=True))
+        self.assertEqual(len(slugs_in_use), self.threads * self.posts_per_thread)
+        self.assertEqual(len(set(slugs_in_use)), len(slugs_in_use))
+        self.assertIn('hot-topic', slugs_in_use)
@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from .counters import view_counter
+from .models import Comment, Post
+
+
+class PostRepresentationTests(APITestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.post = Post.objects.create(title='Summary', content='A long body ' * 500, excerpt='Short',
+                                        author=self.author, status='published')
+        Comment.objects.create(post=self.post, author=self.author, content='Hello')
+        self.addCleanup(view_counter.flush)
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, ' '.join(query['sql'] for query in context.captured_queries)
+
+    def test_list_returns_summaries_without_body_or_comments(self):
+        response, sql = self.get('/api/posts/')
+
+        post = response.data['results'][0]
+        self.assertEqual(post['excerpt'], 'Short')
+        self.assertNotIn('content', post)
+        self.assertNotIn('comments', post)
+        self.assertNotIn('"blog_post"."content"', sql)
+        self.assertNotIn('blog_comment', sql)
+
+    def test_expand_adds_heavy_fields(self):
+        response, sql = self.get('/api/posts/', {'expand': 'content,comments'})
+
+        post = response.data['results'][0]
+        self.assertTrue(post['content'].startswith('A long body'))
+        self.assertEqual(post['comments'][0]['content'], 'Hello')
+
+    def test_fields_selects_a_subset(self):
+        response, sql = self.get('/api/posts/', {'fields': 'id,title'})
+
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title'})
+        self.assertNotIn('"blog_post"."excerpt"', sql)
+        self.assertNotIn('blog_tag', sql)
+
+    def test_detail_is_complete_and_accepts_fields(self):
+        response, _ = self.get(f'/api/posts/{self.post.slug}/')
+        self.assertIn('content', response.data)
+        self.assertEqual(len(response.data['comments']), 1)
+
+        response, sql = self.get(f'/api/posts/{self.post.slug}/', {'fields': 'title,views'})
+        self.assertEqual(response.data, {'title': 'Summary', 'views': 2})
+        self.assertNotIn('"blog_post"."content"', sql)
@@ -0,0 +1,105 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from .cache import response_cache
+from .models import Post, Tag
+from .tags import parse_tag_names, resolve_tags, set_post_tags
+
+
+class TagResolutionTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='writer', password='password123')
+        self.client.force_authenticate(self.author)
+
+    def test_parse_tag_names(self):
+        self.assertEqual(parse_tag_names(' django, orm,,django '), ['django', 'orm'])
+        self.assertEqual(parse_tag_names(['a', ' b ', '']), ['a', 'b'])
+
+    def test_resolve_tags_creates_missing_tags_in_one_insert(self):
+        existing = Tag.objects.create(name='django')
+        Tag.objects.create(name='Other', slug='orm')
+
+        with self.assertNumQueries(4):  # names, taken slugs, used suffixes, insert
+            ids = resolve_tags(['django', 'orm', 'sql'])
+
+        self.assertEqual(ids['django'], existing.pk)
+        self.assertEqual(Tag.objects.get(pk=ids['orm']).slug, 'orm-2')
+        self.assertEqual(Tag.objects.get(pk=ids['sql']).slug, 'sql')
+
+    def test_resolve_tags_invalidates_cached_tags_only_when_creating(self):
+        Tag.objects.create(name='django')
+        generation = response_cache.generations([Tag])
+
+        resolve_tags(['django'])
+        self.assertEqual(response_cache.generations([Tag]), generation)
+
+        resolve_tags(['django', 'orm'])
+        self.assertNotEqual(response_cache.generations([Tag]), generation)
+
+    def test_set_post_tags_writes_only_the_difference(self):
+        post = Post.objects.create(title='Post', content='Body', author=self.author)
+        keep, drop, add = (Tag.objects.create(name=name) for name in ('keep', 'drop', 'add'))
+        post.tags.set([keep, drop])
+
+        set_post_tags(post, [keep.pk, add.pk])
+
+        self.assertEqual(sorted(post.tags.values_list('name', flat=True)), ['add', 'keep'])
+        # Nothing changed: only the current tags are read.
+        with self.assertNumQueries(1):
+            set_post_tags(post, [keep.pk, add.pk])
+
+    def test_set_post_tags_reindexes_the_post(self):
+        post = Post.objects.create(title='Post', content='Body', author=self.author, status='published')
+        set_post_tags(post, resolve_tags(['kubernetes']).values(), existing=())
+
+        response = self.client.get('/api/posts/', {'search': 'kubernetes'})
+
+        self.assertEqual([result['id'] for result in response.data['results']], [post.pk])
+
+    def create_tagged_post(self, title, tag_count):
+        names = ', '.join(f'{title}-tag{n}' for n in range(tag_count))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/posts/', {'title': title, 'content': 'Body', 'tag_names': names})
+        self.assertEqual(response.status_code, 201)
+        return len(queries)
+
+    def test_create_query_count_does_not_depend_on_tag_count(self):
+        one_tag = self.create_tagged_post('one', 1)
+        twenty_tags = self.create_tagged_post('twenty', 20)
+
+        self.assertEqual(one_tag, twenty_tags)
+        self.assertEqual(Post.objects.get(slug='twenty').tags.count(), 20)
+
+    def test_update_replaces_tags(self):
+        post = Post.objects.create(title='Post', content='Body', author=self.author)
+        post.tags.set([Tag.objects.create(name='old'), Tag.objects.create(name='kept')])
+
+        response = self.client.patch(f'/api/posts/{post.slug}/', {'tag_names': 'kept, new'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(post.tags.values_list('name', flat=True)), ['kept', 'new'])
+        self.assertEqual(Tag.objects.count(), 3)
+
+    def test_update_combines_tags_and_tag_names(self):
+        post = Post.objects.create(title='Post', content='Body', author=self.author)
+        first = Tag.objects.create(name='first')
+
+        response = self.client.patch(
+            f'/api/posts/{post.slug}/', {'tags': [first.pk], 'tag_names': 'second'}, format='json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(post.tags.values_list('name', flat=True)), ['first', 'second'])
+
+    def test_update_without_tags_leaves_them(self):
+        post = Post.objects.create(title='Post', content='Body', author=self.author)
+        post.tags.set([Tag.objects.create(name='stay')])
+
+        self.client.patch(f'/api/posts/{post.slug}/', {'title': 'Renamed'})
+
+        self.assertEqual(list(post.tags.values_list('name', flat=True)), ['stay'])
@@ -0,0 +1,171 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .counters import ViewCounter
+from .models import Category, Post, Tag, Task
+from .tasks import Worker, task
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def create_tag_then_fail(name):
+    Tag.objects.create(name=name)
+    raise RuntimeError("boom")
+
+
+@override_settings(BLOG_TASKS={'EAGER': False, 'RETRY_DELAY': 10})
+class TaskQueueTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+        self.worker = Worker()
+
+    def test_enqueued_tasks_run_in_the_worker_and_are_removed(self):
+        record.enqueue('a')
+        record.enqueue('b')
+        self.assertEqual(calls, [])
+
+        self.assertEqual(self.worker.run_pending(), 2)
+
+        self.assertEqual(calls, ['a', 'b'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_calling_a_task_runs_it_directly(self):
+        record('now')
+
+        self.assertEqual(calls, ['now'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_a_queued_key_absorbs_later_enqueues(self):
+        record.enqueue('first', key='same')
+        record.enqueue('second', key='same')
+        self.assertEqual(Task.objects.count(), 1)
+
+        # Once a task starts, its key can be queued again.
+        claimed = self.worker.claim()
+        record.enqueue('third', key='same')
+        self.worker.execute(claimed[0])
+        self.worker.run_pending()
+
+        self.assertEqual(calls, ['first', 'third'])
+
+    def test_delayed_tasks_wait(self):
+        record.enqueue('later', delay=60)
+
+        self.assertEqual(self.worker.run_pending(), 0)
+        Task.objects.update(run_after=timezone.now())
+        self.assertEqual(self.worker.run_pending(), 1)
+
+    def test_failures_are_retried_with_backoff_then_kept(self):
+        create_tag_then_fail.enqueue('rolled-back')
+
+        self.worker.run_pending()
+
+        queued = Task.objects.get()
+        self.assertEqual((queued.status, queued.attempts), (Task.QUEUED, 1))
+        self.assertGreater(queued.run_after, timezone.now() + timedelta(seconds=5))
+        self.assertIn('RuntimeError: boom', queued.last_error)
+        # The task's own writes were rolled back with it.
+        self.assertFalse(Tag.objects.exists())
+
+        Task.objects.update(run_after=timezone.now())
+        self.worker.run_pending()
+
+        failed = Task.objects.get()
+        self.assertEqual((failed.status, failed.attempts), (Task.FAILED, 2))
+        self.assertEqual(self.worker.run_pending(), 0)
+
+    def test_retry_yields_to_a_queued_task_with_the_same_key(self):
+        create_tag_then_fail.enqueue('x', key='tag')
+        claimed = self.worker.claim()
+        create_tag_then_fail.enqueue('y', key='tag')
+
+        self.worker.execute(claimed[0])
+
+        self.assertEqual(list(Task.objects.values_list('args', flat=True)), [['y']])
+
+    def test_tasks_of_a_dead_worker_are_retried(self):
+        record.enqueue('orphaned')
+        self.worker.claim()
+        self.assertEqual(self.worker.run_pending(), 0)
+
+        Task.objects.update(claimed_at=timezone.now() - timedelta(seconds=self.worker.lease + 1))
+        self.assertEqual(self.worker.requeue_expired(), 1)
+        Task.objects.update(run_after=timezone.now())
+
+        self.worker.run_pending()
+        self.assertEqual(calls, ['orphaned'])
+
+    def test_a_task_retried_elsewhere_does_not_commit_twice(self):
+        record.enqueue('once')
+        claimed = self.worker.claim()[0]
+        Task.objects.update(claimed_by='another-worker')
+
+        self.assertFalse(self.worker.execute(claimed))
+        self.assertTrue(Task.objects.exists())
+
+    @override_settings(BLOG_TASKS={'EAGER': True})
+    def test_eager_mode_runs_at_once(self):
+        record.enqueue('inline')
+
+        self.assertEqual(calls, ['inline'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_run_worker_command(self):
+        record.enqueue('from the command')
+        out = StringIO()
+
+        call_command('run_worker', once=True, stdout=out)
+
+        self.assertEqual(calls, ['from the command'])
+        self.assertIn('1 succeeded', out.getvalue())
+
+
+@override_settings(BLOG_TASKS={'EAGER': False})
+class DeferredWorkTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='writer', password='password123')
+
+    def test_view_flushes_triggered_by_requests_are_queued(self):
+        post = Post.objects.create(title='Viewed', content='Body', author=self.author)
+        counter = ViewCounter(flush_interval=60, max_pending=1)
+
+        with self.assertNumQueries(1):  # the task insert; no UPDATE of the post
+            counter.increment(post.pk)
+        post.refresh_from_db()
+        self.assertEqual(post.views, 0)
+
+        Worker().run_pending()
+
+        post.refresh_from_db()
+        self.assertEqual(post.views, 1)
+
+    def test_renaming_a_category_reindexes_its_posts_in_the_worker(self):
+        category = Category.objects.create(name='Databases')
+        post = Post.objects.create(title='Post', content='Body', author=self.author,
+                                   category=category, status='published')
+
+        category.name = 'Storage'
+        category.save()
+        category.save()
+
+        # Besides the related-posts update queued by creating the post.
+        self.assertEqual(Task.objects.filter(name='blog.search.index_posts_of').count(), 1)
+        Worker().run_pending()
+        response = self.client.get('/api/posts/', {'search': 'storage'})
+        self.assertEqual([result['id'] for result in response.data['results']], [post.pk])
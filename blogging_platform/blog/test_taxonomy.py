@@ -0,0 +1,86 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from .models import Category, Post, Tag
+
+
+class TaxonomyListTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.tags = [Tag.objects.create(name=name) for name in ('Django', 'django-orm', 'docker', 'python')]
+        self.categories = [Category.objects.create(name=name) for name in ('Guides', 'News')]
+        for uses, tag in enumerate(self.tags):
+            for _ in range(uses):
+                post = Post.objects.create(title='Post', content='Body', author=self.author,
+                                           category=self.categories[uses % 2])
+                post.tags.add(tag)
+        cache.clear()
+
+    def walk(self, url, **params):
+        """Every row of a listing, following next links."""
+        rows = []
+        response = self.client.get(url, {'page_size': 2, **params})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            rows.extend((row['name'], row['post_count']) for row in response.data['results'])
+            if not response.data['next']:
+                return rows
+            response = self.client.get(response.data['next'])
+
+    def test_lists_are_paginated_with_post_counts(self):
+        self.assertEqual(self.walk('/api/tags/'), [('Django', 0), ('django-orm', 1), ('docker', 2), ('python', 3)])
+        self.assertEqual(self.walk('/api/categories/'), [('Guides', 2), ('News', 4)])
+        self.assertEqual(self.client.get('/api/tags/')['X-Cache'], 'MISS')
+
+    def test_ordering_by_popularity(self):
+        self.assertEqual(self.walk('/api/tags/', ordering='-post_count'),
+                         [('python', 3), ('docker', 2), ('django-orm', 1), ('Django', 0)])
+        self.assertEqual(self.walk('/api/categories/', ordering='-post_count'), [('News', 4), ('Guides', 2)])
+
+    def test_name_prefix_filter(self):
+        self.assertEqual(self.walk('/api/tags/', prefix='DJ'), [('Django', 0), ('django-orm', 1)])
+        self.assertEqual(self.walk('/api/categories/', prefix='n'), [('News', 4)])
+
+    def test_each_page_is_one_aggregate_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/tags/', {'ordering': '-post_count', 'count': 'false'})
+        self.assertEqual(len(response.data['results']), 4)
+
+    def test_counts_follow_post_changes(self):
+        self.client.get('/api/tags/')
+        post = Post.objects.create(title='New', content='Body', author=self.author)
+        post.tags.add(self.tags[0])
+
+        response = self.client.get('/api/tags/', {'prefix': 'Django'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['post_count'], 1)
+
+    def test_invalid_cursor_is_a_404(self):
+        for url in ('/api/tags/', '/api/categories/'):
+            response = self.client.get(url, {'cursor': 'garbage'})
+            self.assertEqual(response.status_code, 404)
+
+    def test_detail_and_writes(self):
+        response = self.client.get(f'/api/categories/{self.categories[1].slug}/')
+        self.assertEqual(response.data['post_count'], 4)
+
+        response = self.client.post('/api/tags/', {'name': 'rust'})
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('post_count', response.data)
+
+    @override_settings(ROOT_URLCONF='blogging_platform.urls_asgi')
+    async def test_async_lists_are_paginated(self):
+        response = await self.async_client.get('/api/tags/', {'ordering': '-post_count', 'page_size': 1})
+
+        self.assertEqual([row['name'] for row in response.json()['results']], ['python'])
+        self.assertIsNotNone(response.json()['next'])
+
+    @override_settings(ROOT_URLCONF='blogging_platform.urls_asgi')
+    async def test_async_invalid_cursor_is_a_404(self):
+        response = await self.async_client.get('/api/categories/', {'cursor': 'garbage'})
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import Category, Post, PostTrend, Tag, TrendingEntry
+from .trending import add_activity, current_score, refresh
+
+HOUR = 3600
+
+
+class TrendingScoreTests(APITestCase):
+
+    def test_stored_scores_decay_without_being_rewritten(self):
+        now = timezone.now()
+        score = add_activity(None, 8, now.timestamp(), HOUR)
+
+        self.assertAlmostEqual(current_score(score, HOUR, now), 8)
+        self.assertAlmostEqual(current_score(score, HOUR, now + timedelta(hours=2)), 2)
+
+        score = add_activity(score, 2, (now + timedelta(hours=2)).timestamp(), HOUR)
+        self.assertAlmostEqual(current_score(score, HOUR, now + timedelta(hours=3)), 2)
+        self.assertEqual(add_activity(score, 0, now.timestamp(), HOUR), score)
+
+    def test_recent_activity_outranks_older_activity(self):
+        now = timezone.now().timestamp()
+        old = add_activity(None, 100, now - 10 * HOUR, HOUR)
+        recent = add_activity(None, 1, now, HOUR)
+
+        self.assertGreater(recent, old)
+
+
+@override_settings(BLOG_TRENDING={'HALF_LIFE': HOUR, 'WEIGHTS': {'views': 1, 'likes': 0, 'comments': 0},
+                                  'PUBLISHED': 1})
+class TrendingRefreshTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='password123')
+        self.category = Category.objects.create(name='News')
+        self.tag = Tag.objects.create(name='python')
+        self.posts = [
+            Post.objects.create(title=f'Post {n}', content='Body', author=self.author, status='published')
+            for n in range(3)
+        ]
+        self.posts[0].category = self.category
+        self.posts[0].save()
+        self.posts[1].tags.add(self.tag)
+        Post.objects.update(published_date=timezone.now() - timedelta(days=1))
+
+    def ranked(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [post['title'] for post in response.data]
+
+    def add_views(self, post, views):
+        Post.objects.filter(pk=post.pk).update(views=views)
+
+    def test_lists_rank_by_recent_activity(self):
+        refresh()
+        later = timezone.now() + timedelta(hours=1)
+        self.add_views(self.posts[2], 50)
+        self.add_views(self.posts[1], 10)
+        refresh(now=later)
+
+        self.assertEqual(self.ranked('/api/posts/trending/')[:2], ['Post 2', 'Post 1'])
+        self.assertEqual(self.ranked('/api/posts/trending/', category=self.category.slug), ['Post 0'])
+        self.assertEqual(self.ranked('/api/posts/trending/', tag=self.tag.slug), ['Post 1'])
+        self.assertEqual(self.ranked('/api/posts/trending/', limit=1), ['Post 2'])
+        self.assertEqual(self.client.get('/api/posts/trending/', {'tag': 'missing'}).status_code, 404)
+        self.assertEqual(self.client.get('/api/posts/trending/', {'limit': 'x'}).status_code, 400)
+
+    def test_old_lifetime_counters_do_not_flood_the_list(self):
+        self.add_views(self.posts[0], 1000)
+        refresh()
+        self.add_views(self.posts[1], 5)
+        refresh(now=timezone.now() + timedelta(minutes=1))
+
+        self.assertEqual(self.ranked('/api/posts/trending/')[0], 'Post 1')
+
+    def test_refresh_only_rewrites_posts_with_new_activity(self):
+        self.assertEqual(refresh(), 3)
+        self.assertEqual(refresh(now=timezone.now() + timedelta(minutes=1)), 0)
+
+        self.add_views(self.posts[1], 3)
+        self.assertEqual(refresh(now=timezone.now() + timedelta(minutes=2)), 1)
+        self.assertEqual(PostTrend.objects.get(pk=self.posts[1].pk).views_seen, 3)
+
+    def test_changed_and_unpublished_posts_move_between_lists(self):
+        refresh()
+        post = Post.objects.get(pk=self.posts[2].pk)
+        post.category = self.category
+        post.save()
+        draft = Post.objects.get(pk=self.posts[0].pk)
+        draft.status = 'draft'
+        draft.save()
+
+        # Unpublished posts leave the lists before the next refresh.
+        self.assertNotIn('Post 0', self.ranked('/api/posts/trending/'))
+
+        refresh(now=timezone.now() + timedelta(minutes=1))
+
+        self.assertEqual(self.ranked('/api/posts/trending/', category=self.category.slug), ['Post 2'])
+        self.assertFalse(TrendingEntry.objects.filter(post=draft).exists())
+
+    def test_list_is_one_query_and_cached_until_refreshed(self):
+        refresh()
+        with self.assertNumQueries(2):  # posts, then their tags
+            self.client.get('/api/posts/trending/')
+        self.assertEqual(self.client.get('/api/posts/trending/')['X-Cache'], 'HIT')
+
+        self.add_views(self.posts[2], 50)
+        refresh(now=timezone.now() + timedelta(hours=1))
+        self.assertEqual(self.ranked('/api/posts/trending/')[0], 'Post 2')
+
+    def test_command_refreshes_the_scores(self):
+        out = StringIO()
+
+        call_command('refresh_trending', '--full', stdout=out)
+
+        self.assertIn('Rescored 3 posts', out.getvalue())
+        self.assertEqual(TrendingEntry.objects.filter(scope=TrendingEntry.ALL).count(), 3)
@@ -0,0 +1,102 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from .counters import ViewCounter, view_counter
+from .models import Post
+from .tasks import Worker
+
+
+class ViewCounterTests(TestCase):
+
+    def setUp(self):
+        author = User.objects.create_user(username='author', password='password123')
+        self.first = Post.objects.create(title='First', content='Body', author=author)
+        self.second = Post.objects.create(title='Second', content='Body', author=author)
+
+    def test_increments_are_buffered_until_flush(self):
+        counter = ViewCounter(flush_interval=60)
+        counter.increment(self.first.pk)
+        counter.increment(self.first.pk)
+        counter.increment(self.second.pk)
+
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views, 0)
+        self.assertEqual(counter.pending(self.first.pk), 2)
+
+        # One UPDATE per distinct increment, then the authors' lookup and
+        # totals, in a savepoint.
+        with self.assertNumQueries(6):
+            self.assertEqual(counter.flush(), 3)
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.views, self.second.views), (2, 1))
+        self.assertEqual(counter.pending(self.first.pk), 0)
+
+    def test_flushes_early_when_too_many_posts_are_pending(self):
+        counter = ViewCounter(flush_interval=60, max_pending=2)
+        counter.increment(self.first.pk)
+        counter.increment(self.second.pk)
+
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views, 1)
+
+    def test_flush_does_not_touch_other_columns(self):
+        updated_date = self.first.updated_date
+        counter = ViewCounter(flush_interval=60)
+        counter.increment(self.first.pk)
+        counter.flush()
+
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.updated_date, updated_date)
+
+
+class PostRetrieveViewCountTests(APITestCase):
+
+    def setUp(self):
+        author = User.objects.create_user(username='author', password='password123')
+        self.post = Post.objects.create(title='Counted', content='Body', author=author, status='published')
+        self.addCleanup(view_counter.flush)
+        self.addCleanup(cache.clear)
+
+    def test_retrieve_does_not_write_the_post(self):
+        with self.assertNumQueries(4):  # ETag probe, post, tags, comments
+            response = self.client.get(f'/api/posts/{self.post.slug}/')
+        self.assertEqual(response.data['views'], 1)
+
+        response = self.client.get(f'/api/posts/{self.post.slug}/')
+        self.assertEqual(response.data['views'], 2)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+
+    @override_settings(BLOG_TASKS={'EAGER': False})
+    def test_views_shown_never_decrease_while_a_flush_is_queued(self):
+        url = f'/api/posts/{self.post.slug}/'
+        with mock.patch.object(view_counter, 'flush_interval', 0):  # every view hands its count to the queue
+            shown = [self.client.get(url).data['views'] for _ in range(4)]
+            self.assertEqual(shown, [1, 2, 3, 4])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Worker().run_pending()
+            self.post.refresh_from_db()
+            self.assertEqual(self.post.views, 4)
+            self.assertEqual(view_counter.pending(self.post.pk), 0)
+
+            self.assertEqual(self.client.get(url).data['views'], 5)
+            with self.captureOnCommitCallbacks(execute=True):
+                Worker().run_pending()
+            self.assertEqual(view_counter.pending(self.post.pk), 0)
+
+    def test_flush_command_writes_buffered_views(self):
+        self.client.get(f'/api/posts/{self.post.slug}/')
+        call_command('flush_view_counts', stdout=StringIO())
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 1)
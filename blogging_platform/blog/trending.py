@@ -0,0 +1,171 @@
+"""
+Trending posts: a score per published post that grows with its views,
+likes and comments and halves every ``HALF_LIFE`` seconds without them.
+
+``refresh()`` (run by ``manage.py refresh_trending``, e.g. every few
+minutes) adds the activity since the last refresh to each post's score:
+the growth of its counters, weighted by ``WEIGHTS``. A post seen for the
+first time is credited ``PUBLISHED`` plus its lifetime counters as of its
+publication date, so old posts don't flood the lists when scoring starts.
+Counters that went down (unlikes, deleted comments) add nothing.
+
+Decaying every score on every refresh would rewrite every row. Instead a
+score is stored as ``log2(sum of weight * 2 ** (t / HALF_LIFE))`` over its
+activity at times ``t``: activity adds to it, nothing has to decay it, and
+ordering by the stored value is ordering by the decayed score at any
+moment. ``current_score`` converts it back.
+
+Only posts whose counters moved or that were saved since the last refresh
+are rescored and written, each into ``TrendingEntry`` rows for the
+all-posts list, its category and each of its tags, so every list is read
+as a top-K range of one index.
+"""
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from .cache import response_cache
+
+# Any fixed origin keeps the stored exponents small.
+EPOCH = 1_577_836_800  # 2020-01-01T00:00:00Z
+
+TRENDING_GENERATION = 'blog.trending'
+
+REFRESH_BATCH = 1000
+
+
+def trending_options():
+    config = getattr(settings, 'BLOG_TRENDING', {})
+    weights = {'views': 1, 'likes': 5, 'comments': 10, **config.get('WEIGHTS', {})}
+    return {
+        'half_life': config.get('HALF_LIFE', 24 * 3600),
+        'weights': weights,
+        'published': config.get('PUBLISHED', 10),
+        'max_limit': config.get('MAX_LIMIT', 100),
+    }
+
+
+def add_activity(score, weight, at, half_life):
+    """Add ``weight`` of activity at timestamp ``at`` to a stored score (None for none yet)."""
+    if weight <= 0:
+        return score
+    term = math.log2(weight) + (at - EPOCH) / half_life
+    if score is None:
+        return term
+    high, low = max(score, term), min(score, term)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def current_score(score, half_life=None, now=None):
+    """The decayed activity a stored score stands for at ``now``."""
+    half_life = half_life or trending_options()['half_life']
+    now = (now or timezone.now()).timestamp()
+    return 2 ** (score - (now - EPOCH) / half_life)
+
+
+def _activity(weights, views, likes, comments):
+    return (weights['views'] * max(views, 0) + weights['likes'] * max(likes, 0)
+            + weights['comments'] * max(comments, 0))
+
+
+def _stale_posts(since):
+    from .models import Post
+
+    published = Post.objects.filter(status='published')
+    if since is None:
+        return published
+    return published.filter(
+        Q(trend__isnull=True)
+        | ~Q(views=F('trend__views_seen'))
+        | ~Q(like_count=F('trend__likes_seen'))
+        | ~Q(comment_count=F('trend__comments_seen'))
+        | Q(updated_date__gte=since)
+    )
+
+
+def refresh(full=False, now=None):
+    """
+    Rescore the posts with new activity (every published post with ``full``)
+    and rewrite their trending entries. Returns the number of posts scored.
+    """
+    from .models import Post, PostTrend, TrendingEntry
+
+    options = trending_options()
+    half_life, weights = options['half_life'], options['weights']
+    now = now or timezone.now()
+    since = None if full else PostTrend.objects.aggregate(last=Max('refreshed_at'))['last']
+
+    # Posts unpublished since the last refresh leave every list.
+    unpublished = TrendingEntry.objects.exclude(post__status='published')
+    if since is not None:
+        unpublished = unpublished.filter(post__updated_date__gte=since)
+    unpublished.delete()
+    if full:
+        PostTrend.objects.exclude(post__status='published').delete()
+
+    rows = _stale_posts(since).values_list(
+        'pk', 'published_date', 'category_id', 'views', 'like_count', 'comment_count',
+        'trend__score', 'trend__views_seen', 'trend__likes_seen', 'trend__comments_seen',
+    ).order_by('pk')
+    scored = 0
+    batch = []
+    for row in rows.iterator(chunk_size=REFRESH_BATCH):
+        batch.append(row)
+        if len(batch) >= REFRESH_BATCH:
+            scored += _write_batch(batch, now, half_life, weights, options['published'])
+            batch = []
+    if batch:
+        scored += _write_batch(batch, now, half_life, weights, options['published'])
+
+    response_cache.invalidate(TRENDING_GENERATION)
+    return scored
+
+
+def _write_batch(batch, now, half_life, weights, published_weight):
+    from .models import Post, PostTrend, TrendingEntry
+
+    post_ids = [row[0] for row in batch]
+    tags = defaultdict(list)
+    for post_id, tag_id in Post.tags.through.objects.filter(post__in=post_ids).values_list('post_id', 'tag_id'):
+        tags[post_id].append(tag_id)
+
+    trends, entries = [], []
+    for (post_id, published, category_id, views, likes, comments,
+         score, views_seen, likes_seen, comments_seen) in batch:
+        if score is None:
+            at = published.timestamp()
+            score = add_activity(None, published_weight, at, half_life)
+            score = add_activity(score, _activity(weights, views, likes, comments), at, half_life)
+        else:
+            activity = _activity(weights, views - views_seen, likes - likes_seen, comments - comments_seen)
+            score = add_activity(score, activity, now.timestamp(), half_life)
+        trends.append(PostTrend(post_id=post_id, score=score, views_seen=views, likes_seen=likes,
+                                comments_seen=comments, refreshed_at=now))
+        entries.append(TrendingEntry(scope=TrendingEntry.ALL, post_id=post_id, score=score))
+        if category_id is not None:
+            entries.append(TrendingEntry(scope=TrendingEntry.CATEGORY, scope_id=category_id,
+                                         post_id=post_id, score=score))
+        entries.extend(TrendingEntry(scope=TrendingEntry.TAG, scope_id=tag_id, post_id=post_id, score=score)
+                       for tag_id in tags[post_id])
+
+    with transaction.atomic():
+        PostTrend.objects.bulk_create(
+            trends, update_conflicts=True, unique_fields=['post'],
+            update_fields=['score', 'views_seen', 'likes_seen', 'comments_seen', 'refreshed_at'],
+        )
+        # A post's category or tags may have changed, so its entries are replaced.
+        TrendingEntry.objects.filter(post__in=post_ids).delete()
+        TrendingEntry.objects.bulk_create(entries)
+    return len(batch)
+
+
+def trending_posts(queryset, scope, scope_id=0, limit=10):
+    """The top ``limit`` posts of a trending list, from ``queryset``, highest score first."""
+    # Posts unpublished since the last refresh still have entries until the next one.
+    return queryset.filter(
+        status='published', trending_entries__scope=scope, trending_entries__scope_id=scope_id,
+    ).order_by('-trending_entries__score')[:limit]
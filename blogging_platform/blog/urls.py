@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PostViewSet, CategoryViewSet, TagViewSet, CommentViewSet
+from .views import PostViewSet, CategoryViewSet, TagViewSet, CommentViewSet, cache_stats, metrics
 
 router = DefaultRouter()
 router.register(r'posts', PostViewSet)
@@ -10,5 +10,7 @@ router.register(r'comments', CommentViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('cache/stats/', cache_stats, name='cache-stats'),
+    path('metrics/', metrics, name='metrics'),
     path('api-auth/', include('rest_framework.urls')),
 ]
@@ -1,42 +1,142 @@
 from django.shortcuts import render, get_object_or_404
 from rest_framework import viewsets, filters, status
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, AllowAny
-from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, AllowAny, IsAdminUser
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.parsers import JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Post, Category, Tag, Comment
-from .serializers import PostSerializer, CategorySerializer, TagSerializer, CommentSerializer
-from django.http import HttpResponse
+from .models import Post, Category, Tag, Comment, TrendingEntry
+from .serializers import (AuthorStatsSerializer, PostSerializer, PostSummarySerializer, CategorySerializer,
+                          TagSerializer, CommentSerializer)
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from .permissions import IsAuthorOrReadOnly
-from .filters import PostFilter
+from .filters import CategoryFilter, PostFilter, PostOrderingFilter, TagFilter
+from .pagination import CommentPagination, PostPagination, TaxonomyPagination
+from .async_views import AsyncReadMixin
+from .comment_tree import aload_post_comment_trees, aload_reply_trees, comment_tree_options
+from .parsers import NDJSONParser
+from .bulk import export_posts, import_posts
+from .cache import cached_response, response_cache
+from .metrics import metrics as performance_metrics
+from .conditional import conditional
+from .counters import VIEWS_GENERATION, adjust_post_counters, get_author_stats, toggle_like, view_counter
+from .trending import TRENDING_GENERATION, trending_options, trending_posts
+from .related import RELATED_GENERATION, related_options, related_posts
+from .facets import post_facets
+from .autocomplete import autocomplete_options, tag_index
+from django.db import transaction
+from django.db.models import Count, Max
 from django.utils.text import slugify
 import logging
 
 logger = logging.getLogger(__name__)
 
-class PostViewSet(viewsets.ModelViewSet):
+
+def generation_validators(models, last_modified=None):
+    """ETag parts and Last-Modified for data that changes only with ``models``."""
+    generations = response_cache.generations(models)
+    times = [response_cache.generation_time(token) for token in generations]
+    if last_modified is not None:
+        times.append(last_modified.timestamp())
+    times = [t for t in times if t is not None]
+    return generations, max(times) if times else None
+
+def query_limit(request, max_limit, default=10):
+    """``?limit=``, clamped to 1..``max_limit``."""
+    try:
+        return min(max(int(request.query_params.get('limit', default)), 1), max_limit)
+    except ValueError:
+        raise ValidationError({'limit': 'Must be an integer.'})
+
+class PostViewSet(AsyncReadMixin, viewsets.ModelViewSet):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, PostOrderingFilter]
     filterset_class = PostFilter
-    search_fields = ['title', 'content', 'author__username', 'category__name', 'tags__name']
-    ordering_fields = ['published_date', 'created_date', 'title', 'views', 'read_time']
+    pagination_class = PostPagination
+    ordering_fields = ['published_date', 'created_date', 'title', 'views', 'read_time',
+                       'like_count', 'comment_count']
     ordering = ['-published_date']
     lookup_field = 'slug'
+
+    # Columns the view itself reads, whatever fields the client asked for.
+    required_columns = ['slug', 'author', 'status', 'published_date', 'views']
+
+    def get_serializer_class(self):
+        if self.action in ('list', 'drafts', 'trending', 'related'):
+            return PostSummarySerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve', 'drafts', 'trending', 'related'):
+            queryset = self.get_serializer().setup_eager_loading(
+                queryset, extra_columns=self.required_columns + self.ordering_fields
+            )
+        return queryset
+
+    @staticmethod
+    def detail_probe(slug):
+        # Counters change without touching updated_date, so they are part of the probe.
+        return Post.objects.filter(slug=slug).values_list(
+            'pk', 'updated_date', 'views', 'like_count', 'comment_count'
+        )
+
+    # Everything the list's ETag and its cached responses depend on: signals
+    # bump the models' generations and view count flushes VIEWS_GENERATION.
+    list_dependencies = (Post, Comment, Tag, Category, VIEWS_GENERATION)
+
+    @staticmethod
+    def detail_etag(row):
+        if row is None:
+            return None
+        generations, last_modified = generation_validators([Post, Comment, Tag, Category], row[1])
+        return [*row, *generations], last_modified
+
+    def detail_validators(self, request, slug=None, **kwargs):
+        return self.detail_etag(self.detail_probe(slug).first())
+
+    async def adetail_validators(self, request, slug=None, **kwargs):
+        return self.detail_etag(await self.detail_probe(slug).afirst())
+
+    @classmethod
+    def list_etag(cls, last_updated):
+        # Deletes and counter updates don't move max(updated_date); the generations cover them.
+        generations, last_modified = generation_validators(cls.list_dependencies, last_updated)
+        return [last_updated, *generations], last_modified
+
+    def list_validators(self, request, *args, **kwargs):
+        return self.list_etag(self.filter_queryset(Post.objects.all()).aggregate(
+            last_updated=Max('updated_date')
+        )['last_updated'])
+
+    async def alist_validators(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(Post.objects.all())
+        return self.list_etag((await queryset.aaggregate(last_updated=Max('updated_date')))['last_updated'])
+
+    def count_view(self, request, slug=None, **kwargs):
+        post_id = Post.objects.filter(slug=slug).values_list('pk', flat=True).first()
+        if post_id is not None:
+            view_counter.increment(post_id)
+
+    async def acount_view(self, request, slug=None, **kwargs):
+        post_id = await Post.objects.filter(slug=slug).values_list('pk', flat=True).afirst()
+        if post_id is not None:
+            await view_counter.aincrement(post_id)
+
+    async def aload_comment_trees(self, posts):
+        # Serializers would load the trees with the sync ORM.
+        if 'comments' in self.get_serializer().fields:
+            await aload_post_comment_trees(posts, **comment_tree_options(self.request))
     
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
     
     def create(self, request, *args, **kwargs):
-        logger.info(f"Processing create request from: {request.user}")
-        logger.info(f"Request method: {request.method}")
-        logger.info(f"Content type: {request.content_type}")
-        logger.info(f"Request data: {request.data}")
-        logger.info(f"Request data type: {type(request.data)}")
-
         if not request.user.is_authenticated:
-            logger.warning(f"Unauthenticated request")
+            logger.warning("Unauthenticated post create request")
             return Response({
                 'error': 'Authentication required. Please log in again.'
             }, status=status.HTTP_401_UNAUTHORIZED)
@@ -47,30 +147,37 @@ class PostViewSet(viewsets.ModelViewSet):
             
             if serializer.is_valid():
                 serializer.save(author=request.user)
-                logger.info(f"Post created successfully by {request.user.username}")
+                logger.info("Post %s created by user %s", serializer.instance.pk, request.user.pk)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             else:
-                logger.warning(f"Serializer validation errors: {serializer.errors}")
+                logger.info("Post create rejected: invalid fields %s", sorted(serializer.errors))
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
                 
         except Exception as e:
-            logger.exception(f"Error creating post: {str(e)}")
+            logger.exception("Error creating post")
             return Response({
                 'error': f'Failed to create post: {str(e)}',
                 'exception_type': str(type(e).__name__)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    # Weak: the body adds this worker's buffered views, which the probe can't see.
+    @conditional('detail_validators', on_not_modified='count_view', weak=True)
     def retrieve(self, request, *args, **kwargs):
         try:
             instance = self.get_object()
-            instance.views += 1
-            instance.save()
+            view_counter.increment(instance.pk)
+            # Reflect views still buffered in this worker without writing the row.
+            instance.views += view_counter.pending(instance.pk)
             serializer = self.get_serializer(instance)
             return Response(serializer.data)
-        except Exception as e:
-            logger.error(f"Error retrieving post: {str(e)}")
+        except Http404:
+            raise
+        except Exception:
+            logger.exception("Error retrieving post")
             return Response({"error": "Failed to retrieve post"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @conditional('list_validators')
+    @cached_response(*list_dependencies)
     def list(self, request, *args, **kwargs):
         try:
             queryset = self.filter_queryset(self.get_queryset())
@@ -80,38 +187,80 @@ class PostViewSet(viewsets.ModelViewSet):
                 return self.get_paginated_response(serializer.data)
             serializer = self.get_serializer(queryset, many=True)
             return Response(serializer.data)
-        except Exception as e:
-            logger.error(f"Error listing posts: {str(e)}")
+        except APIException:
+            raise
+        except Exception:
+            logger.exception("Error listing posts")
+            return Response({"error": "Failed to retrieve posts"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @conditional('adetail_validators', on_not_modified='acount_view', weak=True)
+    async def aretrieve(self, request, *args, **kwargs):
+        try:
+            instance = await self.aget_object()
+            await view_counter.aincrement(instance.pk)
+            instance.views += view_counter.pending(instance.pk)
+            await self.aload_comment_trees([instance])
+            serializer = self.get_serializer(instance)
+            return Response(serializer.data)
+        except Http404:
+            raise
+        except Exception:
+            logger.exception("Error retrieving post")
+            return Response({"error": "Failed to retrieve post"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @conditional('alist_validators')
+    @cached_response(*list_dependencies)
+    async def alist(self, request, *args, **kwargs):
+        try:
+            queryset = await self.afilter_queryset(self.get_queryset())
+            page = await self.apaginate_queryset(queryset)
+            await self.aload_comment_trees(page)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        except APIException:
+            raise
+        except Exception:
+            logger.exception("Error listing posts")
             return Response({"error": "Failed to retrieve posts"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def like(self, request, slug=None):
         post = self.get_object()
-        user = request.user
-        
-        if post.likes.filter(id=user.id).exists():
-            post.likes.remove(user)
-            return Response({'status': 'unliked'}, status=status.HTTP_200_OK)
-        else:
-            post.likes.add(user)
-            return Response({'status': 'liked'}, status=status.HTTP_200_OK)
+        liked = toggle_like(post, request.user)
+        return Response({'status': 'liked' if liked else 'unliked'}, status=status.HTTP_200_OK)
     
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated],
+            parser_classes=[NDJSONParser, JSONParser])
+    def bulk(self, request):
+        rows = request.data
+        if isinstance(rows, dict):
+            rows = [rows]
+        report = import_posts(rows, author=request.user)
+        if not report.failed:
+            response_status = status.HTTP_201_CREATED
+        elif report.created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(report.as_dict(), status=response_status)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def export(self, request):
+        # Staff export every post, other users their own; the list filters apply.
+        posts = Post.objects.all() if request.user.is_staff else Post.objects.filter(author=request.user)
+        posts = DjangoFilterBackend().filter_queryset(request, posts, self)
+        return StreamingHttpResponse(export_posts(posts), content_type='application/x-ndjson')
+
     @action(detail=False, methods=['get'])
     def drafts(self, request):
         try:
-            logger.info(f"Drafts endpoint accessed. User authenticated: {request.user.is_authenticated}")
-
-            auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-            logger.info(f"Authorization header exists: {bool(auth_header)}, length: {len(auth_header) if auth_header else 0}")
-            
             if not request.user.is_authenticated:
-                logger.warning("User not authenticated for drafts endpoint")
                 return Response({'error': 'You must be authenticated'}, status=status.HTTP_401_UNAUTHORIZED)
 
-            logger.info(f"Fetching drafts for user: {request.user.username}")
-            posts = Post.objects.filter(author=request.user, status='draft')
-            logger.info(f"Found {posts.count()} drafts")
-            
+            posts = self.get_queryset().filter(author=request.user, status='draft')
+            # The author's stats row already counts their drafts.
+            self.paginated_count = get_author_stats(request.user).draft_count
+
             page = self.paginate_queryset(posts)
             if page is not None:
                 serializer = self.get_serializer(page, many=True)
@@ -119,75 +268,230 @@ class PostViewSet(viewsets.ModelViewSet):
             
             serializer = self.get_serializer(posts, many=True)
             return Response(serializer.data)
+        except APIException:
+            raise
         except Exception as e:
-            logger.error(f"Error in drafts endpoint: {str(e)}")
+            logger.exception("Error listing drafts")
             return Response(
                 {"error": f"Failed to retrieve drafts: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class CategoryViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    @cached_response(Post, Category, Tag, TRENDING_GENERATION)
+    def trending(self, request):
+        # ?category=<slug> and ?tag=<slug> select that category's or tag's list.
+        scope, scope_id = TrendingEntry.ALL, 0
+        for param, model, list_scope in (('category', Category, TrendingEntry.CATEGORY),
+                                          ('tag', Tag, TrendingEntry.TAG)):
+            slug = request.query_params.get(param)
+            if slug:
+                scope, scope_id = list_scope, get_object_or_404(model.objects.only('pk'), slug=slug).pk
+                break
+        limit = query_limit(request, trending_options()['max_limit'])
+        posts = trending_posts(self.get_queryset(), scope, scope_id, limit)
+        return Response(self.get_serializer(posts, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    @cached_response(Post, Category, Tag)
+    def facets(self, request):
+        # Takes the same filters as the list.
+        return Response(post_facets(self.filter_queryset(Post.objects.all())))
+
+    @action(detail=True, methods=['get'])
+    @cached_response(Post, Category, Tag, RELATED_GENERATION)
+    def related(self, request, slug=None):
+        limit = query_limit(request, related_options()['max_related'], default=5)
+        posts = list(related_posts(self.get_queryset(), slug, limit))
+        # An empty list may be a post with nothing related, or no post at all.
+        if not posts and not Post.objects.filter(slug=slug, status='published').exists():
+            raise Http404
+        return Response(self.get_serializer(posts, many=True).data)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def dashboard(self, request):
+        # One row read, however many posts the author has.
+        return Response(AuthorStatsSerializer(get_author_stats(request.user)).data)
+
+class CategoryViewSet(AsyncReadMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]  # Make categories publicly readable
     lookup_field = 'slug'
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = CategoryFilter
+    pagination_class = TaxonomyPagination
+    ordering_fields = ['name', 'post_count']
+    ordering = ['name']
+
+    def get_queryset(self):
+        # Post counts come with the categories, grouped in the same query.
+        return super().get_queryset().annotate(post_count=Count('posts'))
+
+    def validators(self, request, *args, **kwargs):
+        # Post counts change with posts and their categories.
+        return generation_validators([Category, Post])
+
+    async def avalidators(self, request, *args, **kwargs):
+        return self.validators(request, *args, **kwargs)  # cache reads only
     
+    @conditional('validators')
+    @cached_response(Category, Post)
     def list(self, request, *args, **kwargs):
         try:
             queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data)
-        except Exception as e:
-            logger.error(f"Error listing categories: {str(e)}")
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        except APIException:
+            raise
+        except Exception:
+            logger.exception("Error listing categories")
             return Response({"error": "Failed to retrieve categories"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
+    @conditional('validators')
     def retrieve(self, request, *args, **kwargs):
         try:
             instance = self.get_object()
             serializer = self.get_serializer(instance)
             return Response(serializer.data)
-        except Exception as e:
-            logger.error(f"Error retrieving category: {str(e)}")
+        except Http404:
+            raise
+        except Exception:
+            logger.exception("Error retrieving category")
             return Response({"error": "Failed to retrieve category"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class TagViewSet(viewsets.ModelViewSet):
+    @conditional('avalidators')
+    @cached_response(Category, Post)
+    async def alist(self, request, *args, **kwargs):
+        try:
+            queryset = await self.afilter_queryset(self.get_queryset())
+            page = await self.apaginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        except APIException:
+            raise
+        except Exception:
+            logger.exception("Error listing categories")
+            return Response({"error": "Failed to retrieve categories"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @conditional('avalidators')
+    async def aretrieve(self, request, *args, **kwargs):
+        try:
+            instance = await self.aget_object()
+            serializer = self.get_serializer(instance)
+            return Response(serializer.data)
+        except Http404:
+            raise
+        except Exception:
+            logger.exception("Error retrieving category")
+            return Response({"error": "Failed to retrieve category"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class TagViewSet(AsyncReadMixin, viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [AllowAny]  # Make tags publicly readable
     lookup_field = 'slug'
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = TagFilter
+    pagination_class = TaxonomyPagination
+    ordering_fields = ['name', 'post_count']
+    ordering = ['name']
+
+    def get_queryset(self):
+        # Post counts come with the tags, grouped in the same query.
+        return super().get_queryset().annotate(post_count=Count('posts'))
+
+    def validators(self, request, *args, **kwargs):
+        # Post counts change with posts and their tags.
+        return generation_validators([Tag, Post])
+
+    async def avalidators(self, request, *args, **kwargs):
+        return self.validators(request, *args, **kwargs)  # cache reads only
     
+    @conditional('validators')
+    @cached_response(Tag, Post)
     def list(self, request, *args, **kwargs):
         try:
             queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data)
-        except Exception as e:
-            logger.error(f"Error listing tags: {str(e)}")
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        except APIException:
+            raise
+        except Exception:
+            logger.exception("Error listing tags")
             return Response({"error": "Failed to retrieve tags"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
+    @conditional('validators')
     def retrieve(self, request, *args, **kwargs):
         try:
             instance = self.get_object()
             serializer = self.get_serializer(instance)
             return Response(serializer.data)
-        except Exception as e:
-            logger.error(f"Error retrieving tag: {str(e)}")
+        except Http404:
+            raise
+        except Exception:
+            logger.exception("Error retrieving tag")
+            return Response({"error": "Failed to retrieve tag"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        # Served from memory: no queries once the index is loaded.
+        limit = query_limit(request, autocomplete_options()['max_limit'])
+        return Response(tag_index.complete(request.query_params.get('q', '').strip(), limit))
+
+    @conditional('avalidators')
+    @cached_response(Tag, Post)
+    async def alist(self, request, *args, **kwargs):
+        try:
+            queryset = await self.afilter_queryset(self.get_queryset())
+            page = await self.apaginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        except APIException:
+            raise
+        except Exception:
+            logger.exception("Error listing tags")
+            return Response({"error": "Failed to retrieve tags"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @conditional('avalidators')
+    async def aretrieve(self, request, *args, **kwargs):
+        try:
+            instance = await self.aget_object()
+            serializer = self.get_serializer(instance)
+            return Response(serializer.data)
+        except Http404:
+            raise
+        except Exception:
+            logger.exception("Error retrieving tag")
             return Response({"error": "Failed to retrieve tag"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(AsyncReadMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.filter(parent=None)  # Only top-level comments
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+    pagination_class = CommentPagination
     
     def get_queryset(self):
         queryset = Comment.objects.filter(parent=None)
         post_id = self.request.query_params.get('post', None)
         if post_id is not None:
             queryset = queryset.filter(post_id=post_id)
+        if self.action in ('list', 'retrieve'):
+            queryset = self.get_serializer().setup_eager_loading(queryset)
         return queryset
     
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        with transaction.atomic():
+            comment = serializer.save(author=self.request.user)
+            adjust_post_counters(comment.post_id, comments=1)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            _, deleted = instance.delete()
+            # Replies go with their parent.
+            adjust_post_counters(instance.post_id, comments=-deleted.get(Comment._meta.label, 0))
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def reply(self, request, pk=None):
@@ -198,9 +502,33 @@ class CommentViewSet(viewsets.ModelViewSet):
         
         serializer = CommentSerializer(data=data, context={'request': request})
         if serializer.is_valid():
-            serializer.save(author=request.user)
+            self.perform_create(serializer)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        await aload_reply_trees(page, **comment_tree_options(request))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        await aload_reply_trees([instance], **comment_tree_options(request))
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    return Response(response_cache.stats())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    # Prometheus text format; scrape with a staff user's token.
+    return HttpResponse(performance_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 def home(request):
     return HttpResponse("Welcome to the Blogging Platform API!")
@@ -46,13 +46,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "blog.middleware.RequestIdMiddleware",
+    "blog.middleware.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "blog.middleware.AuthDebugMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -146,6 +147,101 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+# Caches: swap the backend (e.g. Redis or Memcached) to share cached
+# responses and view-counter flush requests between processes.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Cached responses of anonymous list endpoints, invalidated by model signals
+BLOG_RESPONSE_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,  # seconds
+    'KEY_PREFIX': 'blog:response',
+}
+
+# Per-request performance metrics (see blog.middleware.PerformanceMiddleware)
+BLOG_PERFORMANCE = {
+    'QUERY_BUDGET': 20,  # queries per request before it is logged and flagged; None disables
+    'SERVER_TIMING': True,  # send a Server-Timing header
+}
+
+# API tokens: lookups go through an in-process LRU, then the shared cache, then the DB
+ACCOUNTS_TOKEN_STORE = {
+    'TTL': 7 * 24 * 3600,  # token lifetime, seconds
+    'CACHE_ALIAS': 'default',
+    'CACHE_TTL': 300,  # seconds a token stays in the shared cache
+    'LOCAL_CACHE_SIZE': 10000,  # tokens kept in each worker's LRU
+    'LOCAL_TTL': 30,  # seconds a worker trusts its LRU before rechecking
+    'INVALID_TTL': 30,  # seconds an unknown token is remembered
+    'ROTATION_GRACE': 60,  # seconds a refreshed token keeps working
+}
+
+# Post view counting: views are buffered per worker and flushed in batches
+BLOG_VIEW_COUNTER = {
+    'FLUSH_INTERVAL': 10,  # seconds
+    'MAX_PENDING': 1000,  # distinct posts buffered before an early flush
+}
+
+# Comment threads: reply levels loaded below top-level comments and replies
+# shown per comment (None for no limit). Clients can pass ?max_depth= and
+# ?per_level_limit= to override.
+BLOG_COMMENT_TREE = {
+    'MAX_DEPTH': None,
+    'PER_LEVEL_LIMIT': None,
+}
+
+# Background tasks (see blog.tasks), run by `python manage.py run_worker`. EAGER
+# runs them inline instead, so development needs no worker.
+BLOG_TASKS = {
+    'EAGER': DEBUG,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 10,  # seconds before the first retry; doubles after each
+    'LEASE': 300,  # seconds a claimed task may run before it is retried
+    'POLL_INTERVAL': 1,  # seconds between checks of an empty queue
+}
+
+# Derived post fields (see blog.content): bodies longer than BACKGROUND_THRESHOLD
+# characters are stripped of markup after commit instead of during save()
+BLOG_CONTENT = {
+    'WORDS_PER_MINUTE': 200,
+    'EXCERPT_WORDS': 40,
+    'BACKGROUND_THRESHOLD': 100_000,  # characters
+}
+
+# Trending posts (see blog.trending), rescored by `python manage.py refresh_trending`
+# run every few minutes. Scores halve every HALF_LIFE seconds without activity.
+BLOG_TRENDING = {
+    'HALF_LIFE': 24 * 3600,  # seconds
+    'WEIGHTS': {'views': 1, 'likes': 5, 'comments': 10},  # per view, like and comment
+    'PUBLISHED': 10,  # credited to a post when it is published
+    'MAX_LIMIT': 100,  # largest ?limit= of /api/posts/trending/
+}
+
+# Related posts (see blog.related): tag overlap plus CATEGORY_WEIGHT for the same
+# category, kept up to date as posts are retagged; `python manage.py
+# rebuild_related_posts` recomputes every list.
+BLOG_RELATED = {
+    'MAX_RELATED': 20,  # posts kept per post; also the largest ?limit=
+    'CATEGORY_WEIGHT': 0.25,
+    'CATEGORY_CANDIDATES': 50,  # latest posts of the category considered besides shared tags
+}
+
+# Facet counts of /api/posts/facets/ (see blog.facets)
+BLOG_FACETS = {
+    'READ_TIME_BUCKETS': [5, 10, 20],  # minutes at which read-time buckets split
+    'MAX_TAGS': 50,  # most used tags listed
+}
+
+# Tag autocomplete (see blog.autocomplete): each worker keeps the tags in memory and
+# checks at most every REFRESH_INTERVAL seconds whether another process changed them
+BLOG_TAG_AUTOCOMPLETE = {
+    'REFRESH_INTERVAL': 30,  # seconds
+    'MAX_LIMIT': 50,  # largest ?limit=
+}
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # For development only
 
@@ -177,20 +273,37 @@ CORS_ALLOW_HEADERS = [
     'x-user-info',
 ]
 
-# Logging Configuration
+# Logging: records are sampled and tagged with the request id in the request
+# thread, then formatted and written by a background thread (see blog.log).
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {
+            '()': 'blog.log.RequestIdFilter',
+        },
+        'sampling': {
+            '()': 'blog.log.SamplingFilter',
+            # Fraction of records below WARNING kept per logger.
+            'rates': {
+                'blog.requests': 0.1,
+            },
+        },
+    },
     'formatters': {
         'verbose': {
-            'format': '{levelname} {asctime} {module} {message}',
+            'format': '{levelname} {asctime} {request_id} {name} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'blog.log.StructuredFormatter',
+        },
     },
     'handlers': {
         'console': {
-            'level': 'DEBUG',
-            'class': 'logging.StreamHandler',
+            'level': 'INFO',
+            'class': 'blog.log.NonBlockingHandler',
+            'filters': ['request_id', 'sampling'],
             'formatter': 'verbose',
         },
     },
@@ -202,8 +315,13 @@ LOGGING = {
         },
         'blog': {
             'handlers': ['console'],
-            'level': 'DEBUG',
-            'propagate': True,
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'accounts': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
         },
     },
 }
@@ -0,0 +1,17 @@
+"""
+Settings for serving the project over ASGI, e.g.
+
+    gunicorn blogging_platform.asgi -k uvicorn.workers.UvicornWorker -w 4
+
+Reads of posts, categories, tags and comments are answered by async views
+(see blog/async_views.py); everything else runs in Django's thread pool.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+ROOT_URLCONF = "blogging_platform.urls_asgi"
+
+# Each request's database work runs in a thread of its own, so a persistent
+# connection would be opened per thread and never reused.
+for database in DATABASES.values():  # noqa: F405
+    database["CONN_MAX_AGE"] = 0
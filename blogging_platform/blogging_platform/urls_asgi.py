@@ -0,0 +1,10 @@
+"""
+URL configuration for the ASGI profile: the same routes as ``urls``, with the
+API's read endpoints served by the async views in ``blog.async_views``.
+"""
+
+from blog.async_views import async_read_patterns
+
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = async_read_patterns(wsgi_urlpatterns)